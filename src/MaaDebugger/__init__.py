@@ -7,6 +7,9 @@ from nicegui.native.native_mode import find_open_port
 
 from .webpage import index_page
 from .webpage import reco_page  # noqa: F401
+from .webpage import profile_page  # noqa: F401
+from .webpage import metrics_page  # noqa: F401
+from .webpage import screenshot_page  # noqa: F401
 from .webpage.traceback_page import on_exception
 from .utils import update_checker
 from .maafw import maafw
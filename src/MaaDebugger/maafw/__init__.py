@@ -1,7 +1,24 @@
 import re
 import io
+import asyncio
+import time
+import atexit
+import tempfile
+from collections import deque
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from threading import Condition, Lock, RLock, Thread, Timer, current_thread
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from asyncify import asyncify
 from PIL import Image
@@ -22,15 +39,54 @@ from maa.library import Library
 from maa.event_sink import NotificationType
 import numpy as np
 
-from ..utils.img_tools import cvmat_to_image
-from .launch_graph import LaunchGraph, reduce_launch_graph, Scope, ScopeType
-from ..utils.img_tools import cvmat_to_image
+from ..utils.img_tools import Frame, cvmat_to_image, frame_digest
+from .launch_graph import (
+    GeneralStatus,
+    LaunchGraph,
+    reduce_launch_graph,
+    reduce_launch_graph_many,
+    RetentionPolicy,
+    Scope,
+    ScopeType,
+)
+from .journal import EventJournal, RESET_MSG
+from .events import Event, EventKind, EventLike, EventPhase, event_kind, to_msg
+from .event_queue import EventRingBuffer
+from .subscription import (
+    CoalescePolicy,
+    RateLimitedSubscription,
+    Subscriber,
+    SubscriberIndex,
+)
+from .async_events import EventStream, GraphEvent, OverflowPolicy
+from .profiler import NodeStats
+from .tracer import EventTracer, TraceLevel
+from .session import SessionRecorder, SessionReplayer
+from .live_view import LiveView
+from .frame_buffer import FrameRingBuffer
 from ..utils.arg_parser import ArgParser
-from .launch_graph import LaunchGraph, reduce_launch_graph, Scope, ScopeType
 
 debug_mode = ArgParser.get_debug()
 
 
+def _create_tracer() -> Optional[EventTracer]:
+    level = TraceLevel(ArgParser.get_trace())
+    if level == TraceLevel.OFF:
+        return None
+    path = ArgParser.get_trace_file() or (
+        Path.cwd() / "debug" / f"MaaDebugger-{time.strftime('%Y%m%d-%H%M%S')}.trace"
+    )
+    tracer = EventTracer(path, level)
+    tracer.start()
+    atexit.register(tracer.close)
+    print(f"Trace ({level}) located at {tracer.path}")
+    return tracer
+
+
+# EventSink 将事件写入追踪器的环形缓冲区，由后台线程写入追踪文件，未启用时为 None
+tracer = _create_tracer()
+
+
 class MyCustomController(CustomController):
     def __init__(self, img_path: Path):
         super().__init__()
@@ -68,9 +124,14 @@ class MaaFW:
     resource_event_sink: Optional[ResourceEventSink]
     tasker_event_sink: Optional[TaskerEventSink]
 
+    # 全局选项只需设置一次，多个会话各自创建 MaaFW 实例
+    _option_initialized: bool = False
+
     def __init__(self):
-        Toolkit.init_option("./")
-        Tasker.set_debug_mode(True)
+        if not MaaFW._option_initialized:
+            Toolkit.init_option("./")
+            Tasker.set_debug_mode(True)
+            MaaFW._option_initialized = True
 
         self.resource = None
         self.controller = None
@@ -82,7 +143,27 @@ class MaaFW:
         self.resource_event_sink = None
         self.tasker_event_sink = None
 
-        self.screenshotter = Screenshotter(self.screencap)
+        # 会话录制与回放，见 session.py
+        self.recorder: Optional[SessionRecorder] = None
+        self.replayer: Optional[SessionReplayer] = None
+
+        # 截图耗时，由 /metrics 导出
+        self.screencap_stats = NodeStats()
+        # 最近的截图，用于查看识别时的画面
+        frame_capacity = ArgParser.get_frame_buffer()
+        self.frames: Optional[FrameRingBuffer] = (
+            FrameRingBuffer(frame_capacity, roi=ArgParser.get_frame_buffer_roi())
+            if frame_capacity
+            else None
+        )
+        self.screenshotter = Screenshotter(
+            self.screencap, max_fps=ArgParser.get_screenshot_fps()
+        )
+        # 实时画面，任务运行时自动暂停，避免与任务的截图争用控制器
+        self.live_view = LiveView(
+            self.screencap_sync,
+            busy=lambda: self.tasker is not None and self.tasker.running,
+        )
 
     @property
     def version(self) -> str:
@@ -295,17 +376,23 @@ class MaaFW:
         self.tasker.post_stop().wait()
 
     @asyncify
-    def screencap(self, capture: bool = True) -> Optional[Image.Image]:
+    def screencap(self, capture: bool = True) -> Optional[np.ndarray]:
+        """截图，返回 BGR 格式的原始图像"""
+        return self.screencap_sync(capture)
+
+    def screencap_sync(self, capture: bool = True) -> Optional[np.ndarray]:
+        """screencap 的同步版本，供后台线程调用"""
         if not self.controller:
             return None
 
         if capture:
+            start = time.perf_counter_ns()
             self.controller.post_screencap().wait()
-        im = self.controller.cached_image
-        if im is None:
-            return None
-
-        return cvmat_to_image(im)
+            self.screencap_stats.add(time.perf_counter_ns() - start)
+        cvmat = self.controller.cached_image
+        if cvmat is not None and self.frames is not None:
+            self.frames.push(cvmat)
+        return cvmat
 
     @asyncify
     def click(self, x, y) -> bool:
@@ -320,9 +407,14 @@ class MaaFW:
     @asyncify
     def get_reco_detail(self, reco_id: int) -> Optional[RecognitionDetail]:
         if not self.tasker:
+            if self.replayer is not None:
+                return self.replayer.reco_details.get(reco_id)
             return None
 
-        return self.tasker.get_recognition_detail(reco_id)
+        detail = self.tasker.get_recognition_detail(reco_id)
+        if self.recorder is not None:
+            self.recorder.record_reco_detail(detail)
+        return detail
 
     @asyncify
     def clear_cache(self) -> bool:
@@ -346,11 +438,31 @@ class MaaFW:
             return {}
 
 
+# NotificationType -> 事件阶段，Unknown 等其他类型不产生事件
+_PHASES: Dict[NotificationType, EventPhase] = {
+    NotificationType.Starting: EventPhase.STARTING,
+    NotificationType.Succeeded: EventPhase.SUCCEEDED,
+    NotificationType.Failed: EventPhase.FAILED,
+}
+# 枚举成员的属性访问较慢，回调中使用预先取出的成员
+(
+    _TASK,
+    _PIPELINE_NODE,
+    _RECOGNITION_NODE,
+    _ACTION_NODE,
+    _NEXT_LIST,
+    _RECOGNITION,
+    _ACTION,
+) = EventKind
+
+
 class LaunchGraphTaskerEventSink(TaskerEventSink):
     """Tasker 级别事件处理，用于 Task.Starting/Succeeded/Failed"""
 
     def __init__(self, graph_manager: "LaunchGraphManager") -> None:
         self.graph_manager = graph_manager
+        # 收到的事件数，由 /metrics 导出
+        self.received = 0
 
     def on_tasker_task(
         self,
@@ -359,35 +471,40 @@ class LaunchGraphTaskerEventSink(TaskerEventSink):
         detail: Any,  # TaskerEventSink.TaskerTaskDetail
     ):
         """处理 Task 级别事件"""
-        msg_suffix = {
-            NotificationType.Starting: "Starting",
-            NotificationType.Succeeded: "Succeeded",
-            NotificationType.Failed: "Failed",
-        }.get(noti_type)
-
-        if msg_suffix:
-            self.graph_manager.dispatch(
-                {
-                    "msg": f"Task.{msg_suffix}",
-                    "entry": detail.entry,
-                    "task_id": detail.task_id,
-                    "uuid": detail.uuid,
-                }
+        self.received += 1
+        phase = _PHASES.get(noti_type)
+        if phase is not None:
+            event = Event(
+                _TASK,
+                phase,
+                ts=time.monotonic_ns(),
+                entry=detail.entry,
+                task_id=detail.task_id,
+                uuid=detail.uuid,
             )
+            if tracer is not None:
+                tracer.trace(event)
+            self.graph_manager.post(event)
 
 
 class LaunchGraphContextEventSink(ContextEventSink):
-    """状态机驱动的 EventSink，将所有事件转换为消息发送到状态机"""
+    """
+    状态机驱动的 EventSink，将所有事件转换为 Event 发送到状态机
+
+    每个事件的 ts 字段为收到事件时的单调时钟（纳秒），用于统计节点耗时。
+    回调线程上不输出日志，启用 --trace 时事件只写入追踪器的环形缓冲区。
+    """
 
     def __init__(self, graph_manager: "LaunchGraphManager") -> None:
         self.graph_manager = graph_manager
+        # 转换后提交的事件数，由 /metrics 导出
+        self.received = 0
 
-    def _get_msg_suffix(self, noti_type: NotificationType) -> Optional[str]:
-        return {
-            NotificationType.Starting: "Starting",
-            NotificationType.Succeeded: "Succeeded",
-            NotificationType.Failed: "Failed",
-        }.get(noti_type)
+    def _post(self, event: Event) -> None:
+        self.received += 1
+        if tracer is not None:
+            tracer.trace(event)
+        self.graph_manager.post(event)
 
     def on_node_pipeline_node(
         self,
@@ -396,17 +513,17 @@ class LaunchGraphContextEventSink(ContextEventSink):
         detail: Any,  # ContextEventSink.NodePipelineNodeDetail
     ):
         """处理 PipelineNode 事件"""
-        msg_suffix = self._get_msg_suffix(noti_type)
-        if msg_suffix:
-            msg = {
-                "msg": f"PipelineNode.{msg_suffix}",
-                "name": detail.name,
-                "node_id": detail.node_id,
-            }
-            if debug_mode:
-                print(f"[DEBUG EventSink] {msg}")
-                print(f"[DEBUG EventSink] {msg}")
-            self.graph_manager.dispatch(msg)
+        phase = _PHASES.get(noti_type)
+        if phase is not None:
+            self._post(
+                Event(
+                    _PIPELINE_NODE,
+                    phase,
+                    detail.name,
+                    time.monotonic_ns(),
+                    node_id=detail.node_id,
+                )
+            )
 
     def on_node_recognition_node(
         self,
@@ -415,17 +532,17 @@ class LaunchGraphContextEventSink(ContextEventSink):
         detail: Any,  # ContextEventSink.NodeRecognitionNodeDetail
     ):
         """处理 RecognitionNode 事件"""
-        msg_suffix = self._get_msg_suffix(noti_type)
-        if msg_suffix:
-            msg = {
-                "msg": f"RecognitionNode.{msg_suffix}",
-                "name": detail.name,
-                "node_id": detail.node_id,
-            }
-            print(f"[DEBUG EventSink] {msg}")
-            if debug_mode:
-                print(f"[DEBUG EventSink] {msg}")
-            self.graph_manager.dispatch(msg)
+        phase = _PHASES.get(noti_type)
+        if phase is not None:
+            self._post(
+                Event(
+                    _RECOGNITION_NODE,
+                    phase,
+                    detail.name,
+                    time.monotonic_ns(),
+                    node_id=detail.node_id,
+                )
+            )
 
     def on_node_action_node(
         self,
@@ -434,17 +551,17 @@ class LaunchGraphContextEventSink(ContextEventSink):
         detail: Any,  # ContextEventSink.NodeActionNodeDetail
     ):
         """处理 ActionNode 事件"""
-        msg_suffix = self._get_msg_suffix(noti_type)
-        if msg_suffix:
-            msg = {
-                "msg": f"ActionNode.{msg_suffix}",
-                "name": detail.name,
-                "node_id": detail.node_id,
-            }
-            print(f"[DEBUG EventSink] {msg}")
-            if debug_mode:
-                print(f"[DEBUG EventSink] {msg}")
-            self.graph_manager.dispatch(msg)
+        phase = _PHASES.get(noti_type)
+        if phase is not None:
+            self._post(
+                Event(
+                    _ACTION_NODE,
+                    phase,
+                    detail.name,
+                    time.monotonic_ns(),
+                    node_id=detail.node_id,
+                )
+            )
 
     def on_node_next_list(
         self,
@@ -453,17 +570,18 @@ class LaunchGraphContextEventSink(ContextEventSink):
         detail: Any,  # ContextEventSink.NodeNextListDetail
     ):
         """处理 NextList 事件"""
-        msg_suffix = self._get_msg_suffix(noti_type)
-        if msg_suffix:
-            msg = {
-                "msg": f"NextList.{msg_suffix}",
-                "name": detail.name,
-                "next_list": [attr.name for attr in detail.next_list],
-                "anchor_flags": [attr.anchor for attr in detail.next_list],
-            }
-            if debug_mode:
-                print(f"[DEBUG EventSink] {msg}")
-            self.graph_manager.dispatch(msg)
+        phase = _PHASES.get(noti_type)
+        if phase is not None:
+            self._post(
+                Event(
+                    _NEXT_LIST,
+                    phase,
+                    detail.name,
+                    time.monotonic_ns(),
+                    next_list=[attr.name for attr in detail.next_list],
+                    anchor_flags=[attr.anchor for attr in detail.next_list],
+                )
+            )
 
     def on_node_recognition(
         self,
@@ -472,16 +590,17 @@ class LaunchGraphContextEventSink(ContextEventSink):
         detail: Any,  # ContextEventSink.NodeRecognitionDetail
     ):
         """处理 Recognition 事件"""
-        msg_suffix = self._get_msg_suffix(noti_type)
-        if msg_suffix:
-            msg = {
-                "msg": f"Recognition.{msg_suffix}",
-                "name": detail.name,
-                "reco_id": detail.reco_id,
-            }
-            if debug_mode:
-                print(f"[DEBUG EventSink] {msg}")
-            self.graph_manager.dispatch(msg)
+        phase = _PHASES.get(noti_type)
+        if phase is not None:
+            self._post(
+                Event(
+                    _RECOGNITION,
+                    phase,
+                    detail.name,
+                    time.monotonic_ns(),
+                    reco_id=detail.reco_id,
+                )
+            )
 
     def on_node_action(
         self,
@@ -490,74 +609,458 @@ class LaunchGraphContextEventSink(ContextEventSink):
         detail: Any,  # ContextEventSink.NodeActionDetail
     ):
         """处理 Action 事件"""
-        msg_suffix = self._get_msg_suffix(noti_type)
-        if msg_suffix:
-            msg = {
-                "msg": f"Action.{msg_suffix}",
-                "name": detail.name,
-            }
-            if debug_mode:
-                print(f"[DEBUG EventSink] {msg}")
-            self.graph_manager.dispatch(msg)
+        phase = _PHASES.get(noti_type)
+        if phase is not None:
+            self._post(Event(_ACTION, phase, detail.name, time.monotonic_ns()))
+
+
+# 逐条消息的订阅回调：(graph, msg)
+MsgCallback = Callable[[LaunchGraph, Dict[str, Any]], None]
+# 批量订阅回调：(graph, msgs)
+BatchCallback = Callable[[LaunchGraph, List[Dict[str, Any]]], None]
 
 
 class LaunchGraphManager:
     """
     状态机管理器
     负责管理 LaunchGraph 的状态更新和订阅
+
+    订阅者按批接收消息：dispatch_many 一次应用一批消息并只通知一次。
+    设置 batch_window 后，dispatch 会先缓存消息，窗口结束时作为一批分发。
+
+    调用 start 后，EventSink 通过 post 只将消息放入 EventRingBuffer，
+    由独立的 reducer 线程批量应用并通知订阅者，MaaFramework 的回调线程不会执行 reducer 与订阅者。
     """
 
-    def __init__(self) -> None:
-        self._graph = LaunchGraph()
-        self._subscribers: List[Callable[[LaunchGraph, Dict[str, Any]], None]] = []
+    def __init__(
+        self,
+        journal: Optional[EventJournal] = None,
+        retention: Optional[RetentionPolicy] = None,
+        batch_window: float = 0.0,
+    ) -> None:
+        """
+        Args:
+            journal: 事件日志，设置后所有分发的消息都会被持久化
+            retention: 执行图的保留策略，未设置 spill_dir 时淘汰的任务写入事件日志目录或临时目录
+            batch_window: 批量分发的窗口（秒），0 表示每条消息立即分发
+        """
+        if retention is not None and retention.spill_dir is None:
+            if journal is not None:
+                retention.spill_dir = journal.directory / "spill"
+            else:
+                spill_dir = tempfile.TemporaryDirectory(prefix="MaaDebugger-spill-")
+                atexit.register(spill_dir.cleanup)
+                retention.spill_dir = Path(spill_dir.name)
+
+        self._retention = retention
+        self._graph = LaunchGraph(retention=retention)
+        self._subscribers = SubscriberIndex()
+        self._journal = journal
+
+        self.batch_window = batch_window
+        # 保护执行图与待分发消息，窗口计时器在独立线程中触发
+        self._lock = RLock()
+        self._pending: List[EventLike] = []
+        self._timer: Optional[Timer] = None
+
+        # reducer 线程
+        self._queue: Optional[EventRingBuffer] = None
+        self._reducer: Optional[Thread] = None
+        self._idle = Condition()
+        self._processed = 0
+        self._batch_stats = NodeStats()
+        self._reduce_stats = NodeStats()
+        # 每次订阅回调的耗时
+        self._callback_stats = NodeStats()
+        # 可能阻塞的订阅者在释放 _lock 后按分发顺序调用：(callback, graph, msgs)
+        self._deferred: Deque[
+            Tuple[BatchCallback, LaunchGraph, List[Dict[str, Any]]]
+        ] = deque()
+        self._deliver_lock = Lock()
 
     @property
     def graph(self) -> LaunchGraph:
         """获取当前状态图（只读）"""
         return self._graph
 
-    def reset(self) -> None:
-        """重置状态机"""
-        self._graph = LaunchGraph()
-        self._notify_subscribers({"msg": "Reset"})
+    @property
+    def journal(self) -> Optional[EventJournal]:
+        return self._journal
+
+    @property
+    def threaded(self) -> bool:
+        """是否由 reducer 线程处理 post 的消息"""
+        return self._reducer is not None and self._reducer.is_alive()
+
+    def start(self, capacity: int = 65536) -> None:
+        """
+        启动 reducer 线程
+
+        Args:
+            capacity: 环形缓冲区容量
+        """
+        if self.threaded:
+            return
+        self._queue = EventRingBuffer(capacity)
+        self._reducer = Thread(
+            target=self._run_reducer, name="LaunchGraphReducer", daemon=True
+        )
+        self._reducer.start()
+        atexit.register(self.stop)
+
+    def stop(self, timeout: Optional[float] = 5) -> None:
+        """关闭缓冲区，等待 reducer 线程处理完已放入的消息后退出"""
+        if self._queue is None or self._reducer is None:
+            return
+        self._queue.close()
+        self._reducer.join(timeout)
+
+    def post(self, msg: EventLike) -> None:
+        """
+        从 MaaFramework 回调线程提交消息
+
+        reducer 线程运行时只放入环形缓冲区，否则等同于 dispatch。
+        缓冲区在放入前被 stop 关闭时，先等待 reducer 线程处理完已放入的消息再 dispatch，
+        消息不会丢失，也不会先于之前 post 的消息被应用。
 
-    def dispatch(self, msg: Dict[str, Any]) -> None:
+        Args:
+            msg: Event 或消息字典（必须包含 "msg" 字段）
+        """
+        queue = self._queue
+        if queue is not None:
+            if queue.push(msg):
+                return
+            reducer = self._reducer
+            # 在 reducer 线程中（例如订阅者回调里）post 时无法等待自身，直接 dispatch
+            if reducer is not None and reducer is not current_thread():
+                reducer.join()
+        self.dispatch(msg)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待此前 post 的消息全部被 reducer 线程处理
+
+        Returns:
+            是否在超时前处理完毕
+        """
+        if self._queue is None:
+            return True
+        target = self._queue.pushed
+        with self._idle:
+            return self._idle.wait_for(
+                lambda: self._processed >= target or not self.threaded, timeout
+            )
+
+    def queue_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        reducer 线程的统计：队列深度、回调线程阻塞时间、批大小与 reducer 耗时
+
+        Returns:
+            未启动 reducer 线程时返回 None
+        """
+        if self._queue is None:
+            return None
+        stats = self._queue.stats()
+        batch, reduce = self._batch_stats, self._reduce_stats
+        stats["batches"] = batch.count
+        stats["batch_size"] = {"mean": batch.mean, "max": batch.max}
+        stats["reduce_ns"] = {
+            "mean": reduce.mean,
+            "p99": reduce.percentile(99),
+            "max": reduce.max,
+        }
+        return stats
+
+    def latency_stats(self) -> Dict[str, NodeStats]:
+        """reducer 每批的耗时与每次订阅回调的耗时（纳秒）"""
+        return {"reduce": self._reduce_stats, "callback": self._callback_stats}
+
+    def _run_reducer(self) -> None:
+        queue = self._queue
+        assert queue is not None
+        while True:
+            msgs = queue.drain(timeout=0.5)
+            if not msgs:
+                if queue.closed:
+                    break
+                continue
+            if self.batch_window > 0 and not queue.closed:
+                time.sleep(self.batch_window)
+                msgs += queue.drain(timeout=0)
+
+            start = time.perf_counter_ns()
+            try:
+                self.dispatch_many(msgs)
+            except Exception as e:
+                print(f"[LaunchGraphManager] Reducer error: {e}")
+            self._reduce_stats.add(time.perf_counter_ns() - start)
+            self._batch_stats.add(len(msgs))
+
+            with self._idle:
+                self._processed += len(msgs)
+                self._idle.notify_all()
+
+        with self._idle:
+            self._idle.notify_all()
+
+    def reset(self) -> None:
+        """重置状态机，窗口中或缓冲区中尚未分发的消息会先分发到旧的执行图"""
+        if self.threaded:
+            self.wait_idle()
+        with self._lock:
+            self._flush_locked()
+            self._graph = LaunchGraph(retention=self._retention)
+            if self._journal is not None:
+                self._journal.record(RESET_MSG, self._graph)
+            self._notify_subscribers([RESET_MSG], [None])
+        self._deliver_deferred()
+
+    def dispatch(self, msg: EventLike) -> None:
         """
         分发消息到状态机
 
         Args:
-            msg: 消息字典，必须包含 "msg" 字段
+            msg: Event 或消息字典（必须包含 "msg" 字段）
         """
-        self._graph = reduce_launch_graph(self._graph, msg)
-        self._notify_subscribers(msg)
+        if self.batch_window <= 0:
+            self.dispatch_many([msg])
+            return
+
+        with self._lock:
+            self._pending.append(msg)
+            if self._timer is None:
+                self._timer = Timer(self.batch_window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def dispatch_many(self, msgs: List[EventLike]) -> None:
+        """
+        批量分发消息到状态机，订阅者只被通知一次
+
+        事件日志与订阅者收到的始终是消息字典，Event 只在有消费者时才转换。
+
+        Args:
+            msgs: 按接收顺序排列的 Event 或消息字典
+        """
+        if not msgs:
+            return
+        with self._lock:
+            self._apply(msgs)
+        self._deliver_deferred()
+
+    def flush(self) -> None:
+        """立即分发窗口中缓存的消息"""
+        with self._lock:
+            self._flush_locked()
+        self._deliver_deferred()
+
+    def _flush_locked(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        msgs, self._pending = self._pending, []
+        if msgs:
+            self._apply(msgs)
+
+    def _apply(self, msgs: List[EventLike]) -> None:
+        """应用一批消息并通知订阅者，需持有 _lock"""
+        self._graph = reduce_launch_graph_many(self._graph, msgs)
+        if self._journal is None and not self._subscribers:
+            return
+        dicts = [to_msg(msg) for msg in msgs]
+        if self._journal is not None:
+            self._journal.record_many(dicts, self._graph)
+        if self._subscribers:
+            kinds = (
+                [event_kind(msg) for msg in msgs]
+                if self._subscribers.has_filters
+                else ()
+            )
+            self._notify_subscribers(dicts, kinds)
+
+    def graph_at(self, index: int) -> Optional[LaunchGraph]:
+        """
+        从事件日志重建应用前 index 条事件后的执行图
+
+        Args:
+            index: 事件序号
+
+        Returns:
+            重建的执行图，未启用事件日志时返回 None
+        """
+        if self._journal is None:
+            return None
+        return self._journal.graph_at(index)
 
     def subscribe(
-        self, callback: Callable[[LaunchGraph, Dict[str, Any]], None]
+        self,
+        callback: MsgCallback,
+        max_hz: Optional[float] = None,
+        coalesce: CoalescePolicy = CoalescePolicy.BATCH,
+        kinds: Optional[Iterable[EventKind]] = None,
+        names: Optional[Iterable[str]] = None,
     ) -> Callable[[], None]:
         """
-        订阅状态变化
+        逐条订阅状态变化
+
+        批量分发时回调对批内的每条消息各调用一次，graph 为应用整批消息后的执行图。
 
         Args:
             callback: 状态变化时调用的回调函数，接收 (graph, msg) 两个参数
+            max_hz: 同 subscribe_batch
+            coalesce: 同 subscribe_batch
+            kinds: 同 subscribe_batch
+            names: 同 subscribe_batch
 
         Returns:
             取消订阅的函数
         """
-        self._subscribers.append(callback)
+
+        def adapter(graph: LaunchGraph, msgs: List[Dict[str, Any]]) -> None:
+            for msg in msgs:
+                callback(graph, msg)
+
+        return self.subscribe_batch(adapter, max_hz, coalesce, kinds, names)
+
+    def subscribe_batch(
+        self,
+        callback: BatchCallback,
+        max_hz: Optional[float] = None,
+        coalesce: CoalescePolicy = CoalescePolicy.BATCH,
+        kinds: Optional[Iterable[EventKind]] = None,
+        names: Optional[Iterable[str]] = None,
+        blocking: bool = False,
+    ) -> Callable[[], None]:
+        """
+        按批订阅状态变化
+
+        Args:
+            callback: 每批消息应用后调用一次，接收 (graph, msgs) 两个参数
+            max_hz: 最大通知频率，设置后回调在独立线程中以不超过该频率被调用（不持有执行图的锁），
+                两次通知之间的消息按 coalesce 合并；None 表示每批消息同步通知
+            coalesce: 合并策略，BATCH 传递期间的所有消息，LATEST 只传递最新的一条
+            kinds: 只接收这些类型的消息，None 表示所有类型
+            names: 只接收这些节点名的消息（Task 消息没有节点名），None 表示不按节点名过滤；
+                Reset 消息总会发送给所有订阅者，过滤后没有消息的批不会通知
+            blocking: 回调可能等待其他线程（例如等待事件循环消费）时设为 True，
+                回调在释放执行图的锁之后按分发顺序调用，此时执行图可能已应用了之后的消息
+
+        Returns:
+            取消订阅的函数
+        """
+        if max_hz is None:
+            target = callback
+            subscription = None
+        else:
+            subscription = RateLimitedSubscription(
+                callback,
+                max_hz,
+                coalesce,
+                self._lock,
+                name=getattr(callback, "__name__", ""),
+            )
+            target = subscription.push
+        # 限频订阅本就在通知线程中、释放锁之后调用 callback
+        subscriber = Subscriber(target, kinds, names, blocking and subscription is None)
+        with self._lock:
+            self._subscribers.add(subscriber)
 
         def unsubscribe():
-            if callback in self._subscribers:
-                self._subscribers.remove(callback)
+            with self._lock:
+                self._subscribers.remove(subscriber)
+            if subscription is not None:
+                subscription.close()
 
         return unsubscribe
 
-    def _notify_subscribers(self, msg: Dict[str, Any]) -> None:
-        """通知所有订阅者"""
-        for callback in self._subscribers:
+    def events(
+        self,
+        maxsize: int = 1024,
+        overflow: OverflowPolicy = OverflowPolicy.COALESCE,
+        max_hz: Optional[float] = None,
+        kinds: Optional[Iterable[EventKind]] = None,
+        names: Optional[Iterable[str]] = None,
+    ) -> EventStream:
+        """
+        在事件循环中订阅状态变化，需在协程中调用
+
+        Usage:
+            async with manager.events() as stream:
+                async for event in stream:
+                    ...  # event.graph, event.msgs
+
+        Args:
+            maxsize: 队列中最多缓存的事件（批）数量
+            overflow: 队列已满时的处理策略
+            max_hz: 同 subscribe_batch，设置后事件按该频率合并后入队
+            kinds: 同 subscribe_batch
+            names: 同 subscribe_batch
+
+        Returns:
+            事件流，close 或退出 async with 时取消订阅
+        """
+        stream = EventStream(asyncio.get_running_loop(), maxsize, overflow)
+        stream.bind(
+            self.subscribe_batch(
+                stream.push,
+                max_hz,
+                kinds=kinds,
+                names=names,
+                blocking=overflow == OverflowPolicy.BLOCK,
+            )
+        )
+        return stream
+
+    def _notify_subscribers(
+        self,
+        msgs: List[Dict[str, Any]],
+        kinds: Sequence[Optional[EventKind]],
+    ) -> None:
+        """
+        通知关心这批消息的订阅者，需持有 _lock
+
+        可能阻塞的订阅者只放入 _deferred，由 _deliver_deferred 在释放锁之后调用。
+
+        Args:
+            msgs: 消息字典
+            kinds: 与 msgs 一一对应的事件类型，没有设置过滤条件的订阅者时可以为空
+        """
+        for subscriber, selected in self._subscribers.route(msgs, kinds):
+            if subscriber.deferred:
+                self._deferred.append((subscriber.callback, self._graph, selected))
+                continue
+            self._call_subscriber(subscriber.callback, self._graph, selected)
+
+    def _deliver_deferred(self) -> None:
+        """
+        调用 _deferred 中的订阅者，不能在持有 _lock 时调用
+
+        同一时间只有一个线程投递，其他线程放入的回调由它按顺序调用。
+        投递线程在订阅者返回前不会继续分发，由 reducer 线程投递时即对其施加背压。
+        """
+        while self._deferred:
+            if not self._deliver_lock.acquire(blocking=False):
+                # 正在投递的线程释放锁前会再次检查 _deferred
+                return
             try:
-                callback(self._graph, msg)
-            except Exception as e:
-                print(f"[LaunchGraphManager] Subscriber error: {e}")
+                while self._deferred:
+                    callback, graph, msgs = self._deferred.popleft()
+                    self._call_subscriber(callback, graph, msgs)
+            finally:
+                self._deliver_lock.release()
+
+    def _call_subscriber(
+        self,
+        callback: BatchCallback,
+        graph: LaunchGraph,
+        msgs: List[Dict[str, Any]],
+    ) -> None:
+        start = time.perf_counter_ns()
+        try:
+            callback(graph, msgs)
+        except Exception as e:
+            print(f"[LaunchGraphManager] Subscriber error: {e}")
+        self._callback_stats.add(time.perf_counter_ns() - start)
 
     def get_current_task(self) -> Optional[Scope]:
         """获取当前正在执行的任务"""
@@ -568,56 +1071,148 @@ class LaunchGraphManager:
     def get_all_recognitions(self) -> List[Dict[str, Any]]:
         """
         获取所有识别记录
-        遍历整个执行图，收集所有 Recognition 节点
-        """
-        results: List[Dict[str, Any]] = []
-
-        def traverse(scope: Scope, depth: int = 0):
-            if scope.type == ScopeType.RECO:
-                results.append(
-                    {
-                        "msg": scope.msg,
-                        "status": scope.status,
-                        "depth": depth,
-                    }
-                )
+        通过执行图的类型索引收集所有 Recognition 节点，按创建顺序排列
+        """
+        return [
+            {
+                "msg": scope.msg,
+                "status": scope.status,
+                "depth": scope.arena.levels[scope.id],
+            }
+            for scope in self._graph.find_scopes(type=ScopeType.RECO)
+        ]
+
+    def get_recognition(self, reco_id: int) -> Optional[Scope]:
+        """通过 reco_id 查找 Recognition"""
+        return self._graph.get_recognition(reco_id)
 
-            # 递归遍历所有子节点
-            for child in scope.childs:
-                traverse(child, depth + 1)
-            if scope.reco:
-                for reco in scope.reco:
-                    traverse(reco, depth + 1)
-            if scope.action:
-                traverse(scope.action, depth + 1)
-            if scope.reco_detail:
-                traverse(scope.reco_detail, depth + 1)
+    def find_scopes(
+        self,
+        name: Optional[str] = None,
+        type: Optional[ScopeType] = None,
+        status: Optional[GeneralStatus] = None,
+        task: Optional[Scope] = None,
+    ) -> List[Scope]:
+        """按节点名、类型、状态、所属任务查询作用域，见 LaunchGraph.find_scopes"""
+        return self._graph.find_scopes(name, type, status, task)
 
-        for task in self._graph.childs:
-            traverse(task)
+    def memory_usage(self) -> Dict[str, int]:
+        """执行图的内存占用统计，见 LaunchGraph.memory_usage"""
+        return self._graph.memory_usage()
 
-        return results
+    def hot_nodes(
+        self, type: Optional[ScopeType] = None, limit: Optional[int] = None
+    ) -> List[Tuple[str, str, NodeStats]]:
+        """按总耗时降序排列的节点，见 NodeProfiler.hot_nodes"""
+        return self._graph.profiler.hot_nodes(type, limit)
 
 
 class MyResourceEventSink(ResourceEventSink):
     def __init__(self, on_resource_loading: Callable) -> None:
-        self.on_resource_loading = on_resource_loading
+        self._on_resource_loading = on_resource_loading
+        # 收到的事件数，由 /metrics 导出
+        self.received = 0
+
+    def on_resource_loading(
+        self,
+        resource: Resource,
+        noti_type: NotificationType,
+        detail: Any,  # ResourceEventSink.ResourceLoadingDetail
+    ):
+        self.received += 1
+        self._on_resource_loading(resource, noti_type, detail)
 
 
 class Screenshotter:
-    source: Optional[Image.Image] = None
+    # 界面只推送缩小后的预览，高度约为显示高度的两倍，兼顾高分屏
+    PREVIEW_HEIGHT = 400
+    PREVIEW_FORMAT = "JPEG"
+
+    # 最新一帧原图，编码结果缓存在帧上，下载、放大查看与录制时才编码原图
+    frame: Optional[Frame] = None
+    # 界面显示的预览图 data URL
+    source: Optional[str] = None
+    # 每显示一帧加一，用于原图地址去缓存
+    frame_id: int = 0
     screencap_func: Callable
+    # 设置后每张截图都会写入会话文件
+    recorder: Optional[SessionRecorder] = None
 
-    def __init__(self, screencap_func: Callable):
+    def __init__(self, screencap_func: Callable, max_fps: float = 0):
+        """
+        Args:
+            screencap_func: 异步截图函数，返回 BGR 格式的原始图像
+            max_fps: request_refresh 触发刷新的最大频率，0 表示不限制
+        """
         self.screencap_func = screencap_func
+        self.max_fps = max_fps
+        # 与上一帧相同而跳过转换的次数
+        self.unchanged = 0
+        self._digest: Optional[int] = None
+        self._refresh_pending = False
+        self._refresher: Optional[asyncio.Task] = None
 
     def __del__(self):
+        self.frame = None
         self.source = None
 
     async def refresh(self, capture: bool = True):
-        im: Image.Image = await self.screencap_func(capture)
-        if im is not None:
-            self.source = im
+        cvmat: Optional[np.ndarray] = await self.screencap_func(capture)
+        if cvmat is not None:
+            # 转换与编码整帧耗时数十毫秒，不在事件循环中执行
+            await asyncio.to_thread(self._update, cvmat)
+
+    def request_refresh(self) -> None:
+        """
+        请求用控制器缓存的最新截图刷新界面，立即返回，必须在事件循环中调用
+
+        请求由后台任务按 max_fps 合并：刷新期间与间隔内的多次请求只触发一次刷新。
+        """
+        self._refresh_pending = True
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_running_loop().create_task(
+                self._run_refresher()
+            )
+
+    async def _run_refresher(self) -> None:
+        while self._refresh_pending:
+            self._refresh_pending = False
+            start = time.monotonic()
+            try:
+                await self.refresh(False)
+            except Exception as e:
+                print(f"[Screenshotter] Refresh error: {e}")
+            if self.max_fps > 0:
+                elapsed = time.monotonic() - start
+                await asyncio.sleep(max(1 / self.max_fps - elapsed, 0))
+
+    def to_frame_coords(self, x: float, y: float) -> Tuple[int, int]:
+        """将预览图上的坐标换算为原图坐标"""
+        frame = self.frame
+        if frame is None:
+            return int(x), int(y)
+        width, height = frame.size
+        preview_width, preview_height = frame.preview(self.PREVIEW_HEIGHT).size
+        return int(x * width / preview_width), int(y * height / preview_height)
+
+    def _update(self, cvmat: np.ndarray) -> None:
+        """截图没有变化时跳过转换、编码与推送"""
+        digest = frame_digest(cvmat)
+        if digest == self._digest:
+            self.unchanged += 1
+            return
+        self.show(cvmat_to_image(cvmat))
+        self._digest = digest
+
+    def show(self, image: Image.Image) -> None:
+        """显示一张截图，编码在调用线程中完成，可以在任意线程调用"""
+        self._digest = None
+        frame = Frame(image)
+        source = frame.preview(self.PREVIEW_HEIGHT).data_url(self.PREVIEW_FORMAT)
+        self.frame, self.source = frame, source
+        self.frame_id += 1
+        if self.recorder is not None:
+            self.recorder.record_screenshot(image, frame.encode("PNG"))
 
 
 maafw = MaaFW()
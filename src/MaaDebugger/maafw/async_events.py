@@ -0,0 +1,144 @@
+"""
+asyncio 风格的执行图事件订阅
+reducer 所在线程将事件放入每个订阅者的有界队列，并通过 call_soon_threadsafe 唤醒事件循环中的消费者
+"""
+
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from strenum import StrEnum
+
+from .launch_graph import LaunchGraph
+
+
+class OverflowPolicy(StrEnum):
+    """队列已满时如何处理新事件"""
+
+    # 生产者等待消费者腾出空间（对 reducer 线程施加背压）
+    BLOCK = "block"
+    # 丢弃最旧的事件
+    DROP_OLDEST = "drop_oldest"
+    # 将新消息合并到队尾的事件中，不丢失消息
+    COALESCE = "coalesce"
+
+
+@dataclass
+class GraphEvent:
+    """一批已应用到执行图的消息"""
+
+    graph: LaunchGraph
+    msgs: List[Dict[str, Any]]
+
+
+class EventStream:
+    """
+    单个订阅者的有界事件队列，通过 async for 消费
+
+    生产者可以位于任意线程。BLOCK 策略下，若生产者就是事件循环所在线程（同步 dispatch），
+    等待会造成死锁，此时事件仍会入队并计入 overflows。
+    LaunchGraphManager 在释放执行图的锁之后才向 BLOCK 策略的流投递，
+    生产者等待期间消费者仍可以访问 manager。
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        maxsize: int,
+        overflow: OverflowPolicy,
+    ) -> None:
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self.overflows = 0
+
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._queue: Deque[GraphEvent] = deque()
+        self._cond = threading.Condition()
+        self._wakeup = asyncio.Event()
+        self._signaled = False
+        self._closed = False
+        self._unsubscribe: Optional[Callable[[], None]] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def pending_messages(self) -> int:
+        """队列中尚未取出的消息数（__len__ 为批数）"""
+        with self._cond:
+            return sum(len(event.msgs) for event in self._queue)
+
+    def bind(self, unsubscribe: Callable[[], None]) -> None:
+        self._unsubscribe = unsubscribe
+
+    def push(self, graph: LaunchGraph, msgs: List[Dict[str, Any]]) -> None:
+        """批量回调，由 LaunchGraphManager 在分发线程中调用"""
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._queue) >= self.maxsize:
+                self.overflows += 1
+                if self.overflow == OverflowPolicy.COALESCE and self._queue:
+                    last = self._queue[-1]
+                    self._queue[-1] = GraphEvent(graph, last.msgs + msgs)
+                    self._signal()
+                    return
+                if self.overflow == OverflowPolicy.DROP_OLDEST:
+                    self.dropped += len(self._queue.popleft().msgs)
+                elif threading.get_ident() != self._loop_thread:
+                    self._cond.wait_for(
+                        lambda: len(self._queue) < self.maxsize or self._closed
+                    )
+                    if self._closed:
+                        return
+            self._queue.append(GraphEvent(graph, list(msgs)))
+            self._signal()
+
+    def _signal(self) -> None:
+        # 消费者被唤醒前只投递一次，避免大量回调堆积在事件循环中
+        if not self._signaled:
+            self._signaled = True
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                # 事件循环已关闭
+                self._closed = True
+
+    def close(self) -> None:
+        """取消订阅并结束迭代"""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass
+
+    def __aiter__(self) -> "EventStream":
+        return self
+
+    async def __anext__(self) -> GraphEvent:
+        while True:
+            with self._cond:
+                if self._queue:
+                    event = self._queue.popleft()
+                    self._cond.notify()
+                    return event
+                if self._closed:
+                    raise StopAsyncIteration
+                self._signaled = False
+                self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def __aenter__(self) -> "EventStream":
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        self.close()
@@ -0,0 +1,127 @@
+"""
+事件环形缓冲区
+MaaFramework 回调线程只将消息放入缓冲区，由独立的 reducer 线程取出后批量应用到执行图
+"""
+
+import time
+from threading import Condition, Lock
+from typing import Any, Dict, List, Optional
+
+from .profiler import NodeStats
+
+
+class EventRingBuffer:
+    """
+    固定容量、单锁的多生产者单消费者环形缓冲区
+
+    - push 只在锁内写入一个槽位，缓冲区从空变为非空时才唤醒消费者
+    - drain 一次取出所有待处理的消息
+    - 缓冲区满时 push 会等待消费者腾出空间（不能丢弃消息，否则执行图会错乱），
+      等待次数记录在 full_waits 中
+
+    push 的耗时（包括等待锁与等待空间）记录在 push_stats 中，
+    即回调线程因状态机而阻塞的时间。
+    """
+
+    def __init__(self, capacity: int = 65536) -> None:
+        self.capacity = capacity
+        self._slots: List[Optional[Any]] = [None] * capacity
+        self._head = 0
+        self._size = 0
+        self._closed = False
+
+        self._lock = Lock()
+        self._not_empty = Condition(self._lock)
+        self._not_full = Condition(self._lock)
+
+        self.pushed = 0
+        self.drained = 0
+        self.max_depth = 0
+        self.full_waits = 0
+        self.push_stats = NodeStats()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def push(self, item: Any) -> bool:
+        """
+        放入一条消息
+
+        Returns:
+            是否放入，缓冲区已关闭（包括等待空间期间被关闭）时返回 False
+        """
+        start = time.perf_counter_ns()
+        with self._lock:
+            while self._size == self.capacity and not self._closed:
+                self.full_waits += 1
+                self._not_full.wait()
+            if self._closed:
+                return False
+
+            self._slots[(self._head + self._size) % self.capacity] = item
+            self._size += 1
+            self.pushed += 1
+            if self._size > self.max_depth:
+                self.max_depth = self._size
+            if self._size == 1:
+                self._not_empty.notify()
+            self.push_stats.add(time.perf_counter_ns() - start)
+            return True
+
+    def drain(self, timeout: Optional[float] = None) -> List[Any]:
+        """
+        取出所有待处理的消息，缓冲区为空时等待
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            按放入顺序排列的消息，超时或已关闭且为空时返回空列表
+        """
+        with self._lock:
+            if not self._size and not self._closed:
+                self._not_empty.wait(timeout)
+
+            items: List[Any] = []
+            head, size, capacity = self._head, self._size, self.capacity
+            for i in range(size):
+                index = (head + i) % capacity
+                items.append(self._slots[index])
+                self._slots[index] = None
+            self._head = (head + size) % capacity
+            self._size = 0
+            self.drained += size
+            if size:
+                self._not_full.notify_all()
+            return items
+
+    def close(self) -> None:
+        """关闭缓冲区，唤醒所有等待的线程，已放入的消息仍可以被 drain 取出"""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """队列深度与回调阻塞时间的统计"""
+        with self._lock:
+            push = self.push_stats
+            return {
+                "depth": self._size,
+                "max_depth": self.max_depth,
+                "capacity": self.capacity,
+                "pushed": self.pushed,
+                "drained": self.drained,
+                "full_waits": self.full_waits,
+                "push_ns": {
+                    "count": push.count,
+                    "mean": push.mean,
+                    "p50": push.percentile(50),
+                    "p99": push.percentile(99),
+                    "max": push.max,
+                },
+            }
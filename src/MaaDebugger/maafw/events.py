@@ -0,0 +1,224 @@
+"""
+状态机事件记录
+EventSink 产生紧凑的 Event 对象，reducer 通过 (kind, phase) 查表分发，
+需要字典形式的外部消费者（订阅者、事件日志、序列化）通过 Event.to_msg 获得与原消息一致的字典
+"""
+
+import sys
+from enum import IntEnum
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+
+class EventKind(IntEnum):
+    TASK = 0
+    PIPELINE_NODE = 1
+    RECOGNITION_NODE = 2
+    ACTION_NODE = 3
+    NEXT_LIST = 4
+    RECOGNITION = 5
+    ACTION = 6
+
+
+class EventPhase(IntEnum):
+    STARTING = 0
+    SUCCEEDED = 1
+    FAILED = 2
+
+
+_KIND_PREFIXES = (
+    "Task",
+    "PipelineNode",
+    "RecognitionNode",
+    "ActionNode",
+    "NextList",
+    "Recognition",
+    "Action",
+)
+_PHASE_SUFFIXES = ("Starting", "Succeeded", "Failed")
+
+# MSG_TYPES[kind][phase] -> "PipelineNode.Starting" 等消息类型字符串
+MSG_TYPES: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(sys.intern(f"{prefix}.{suffix}") for suffix in _PHASE_SUFFIXES)
+    for prefix in _KIND_PREFIXES
+)
+
+# 消息类型字符串 -> (kind, phase)
+_PARSE: Dict[str, Tuple[EventKind, EventPhase]] = {
+    MSG_TYPES[kind][phase]: (kind, phase) for kind in EventKind for phase in EventPhase
+}
+
+# 与 to_msg 输出顺序一致的可选字段
+_FIELDS = (
+    "ts",
+    "entry",
+    "name",
+    "task_id",
+    "uuid",
+    "node_id",
+    "next_list",
+    "anchor_flags",
+    "reco_id",
+)
+_FIELD_SET = frozenset(_FIELDS)
+
+
+class Event:
+    """
+    一条状态机事件
+
+    节点名会被 intern，同名节点的事件共享同一个字符串对象。
+    提供 get / [] / in 等只读的字典接口，执行图内部可以像读取消息字典一样读取字段。
+    """
+
+    __slots__ = ("kind", "phase") + _FIELDS + ("extra",)
+
+    def __init__(
+        self,
+        kind: EventKind,
+        phase: EventPhase,
+        name: Optional[str] = None,
+        ts: Optional[int] = None,
+        *,
+        entry: Optional[str] = None,
+        task_id: Optional[int] = None,
+        uuid: Optional[str] = None,
+        node_id: Optional[int] = None,
+        next_list: Optional[List[str]] = None,
+        anchor_flags: Optional[List[bool]] = None,
+        reco_id: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.kind = kind
+        self.phase = phase
+        self.name = None if name is None else sys.intern(name)
+        self.ts = ts
+        self.entry = entry
+        self.task_id = task_id
+        self.uuid = uuid
+        self.node_id = node_id
+        self.next_list = next_list
+        self.anchor_flags = anchor_flags
+        self.reco_id = reco_id
+        # 不属于以上字段的键，保证 from_msg / to_msg 往返不丢失信息
+        self.extra = extra
+
+    @property
+    def msg_type(self) -> str:
+        """消息类型字符串，例如 "Recognition.Succeeded" """
+        return MSG_TYPES[self.kind][self.phase]
+
+    @classmethod
+    def from_msg(cls, msg: Dict[str, Any]) -> Optional["Event"]:
+        """
+        从消息字典构造
+
+        Returns:
+            未知的消息类型返回 None
+        """
+        parsed = _PARSE.get(msg.get("msg", ""))
+        if parsed is None:
+            return None
+        event = cls.__new__(cls)
+        event.kind, event.phase = parsed
+        extra = None
+        for field in _FIELDS:
+            setattr(event, field, None)
+        for key, value in msg.items():
+            if key in _FIELD_SET:
+                setattr(event, key, value)
+            elif key != "msg":
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        if isinstance(event.name, str):
+            event.name = sys.intern(event.name)
+        event.extra = extra
+        return event
+
+    def to_msg(self) -> Dict[str, Any]:
+        """转换为消息字典（兼容层），每次调用都会返回新的字典"""
+        msg: Dict[str, Any] = {"msg": MSG_TYPES[self.kind][self.phase]}
+        for field in _FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                msg[field] = value
+        if self.extra:
+            msg.update(self.extra)
+        return msg
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "msg":
+            return MSG_TYPES[self.kind][self.phase]
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING  # type: ignore[arg-type]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_msg())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Event):
+            return self.to_msg() == other.to_msg()
+        if isinstance(other, dict):
+            return self.to_msg() == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Event({self.to_msg()})"
+
+    def nbytes(self) -> int:
+        """估算占用的内存（节点名已 intern，不计入）"""
+        total = sys.getsizeof(self)
+        for value in (self.next_list, self.anchor_flags):
+            if value is not None:
+                total += sys.getsizeof(value)
+        if self.extra:
+            total += sys.getsizeof(self.extra)
+        return total
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state) -> None:
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+        if isinstance(self.name, str):
+            self.name = sys.intern(self.name)
+
+
+_MISSING = object()
+
+# reducer、事件日志等既可以接收 Event，也可以接收消息字典
+EventLike = Union[Event, Dict[str, Any]]
+
+
+def to_msg(event: EventLike) -> Dict[str, Any]:
+    """Event 转为消息字典，消息字典原样返回"""
+    return event.to_msg() if isinstance(event, Event) else event
+
+
+def parse_msg_type(msg_type: str) -> Optional[Tuple[EventKind, EventPhase]]:
+    """消息类型字符串（如 "PipelineNode.Starting"）对应的 (kind, phase)，未知类型返回 None"""
+    return _PARSE.get(msg_type)
+
+
+def event_kind(event: EventLike) -> Optional[EventKind]:
+    """事件类型，Reset 等未知类型的消息字典返回 None"""
+    if isinstance(event, Event):
+        return event.kind
+    parsed = _PARSE.get(event.get("msg", ""))
+    return None if parsed is None else parsed[0]
@@ -0,0 +1,250 @@
+"""
+截图环形缓冲区
+在预先分配的 numpy 数组中保存最近的若干帧截图及其时间戳，识别开始时记录的 reco_id 按时间关联到最近的一帧，
+打开识别详情时可以查看识别所用的画面，并向前后翻看缓冲区中的其他帧。
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.img_tools import Frame, cvmat_to_image, frame_digest
+
+# (x, y, width, height)
+Roi = Tuple[int, int, int, int]
+
+
+class FrameRingBuffer:
+    """
+    固定容量的截图环形缓冲区
+
+    帧的形状在第一次 push 时确定，此后写入只复制到预先分配的数组中，不再分配内存；
+    截图尺寸变化时重新分配并丢弃旧帧。设置 roi 时只保存该区域。
+    帧按写入顺序编号（从 1 开始），编号小于 newest - capacity + 1 的帧已被覆盖。
+    连续截到相同画面时只保存一帧，并记录第一次与最后一次看到它的时间。
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        roi: Optional[Roi] = None,
+        max_links: int = 4096,
+        max_decoded: int = 4,
+    ) -> None:
+        """
+        Args:
+            capacity: 最多保存的帧数
+            roi: 只保存截图中的这一区域，超出截图的部分被裁掉
+            max_links: 最多保存的 reco_id 关联数，超过时丢弃最早的
+            max_decoded: frame 最多缓存的帧数
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.roi = roi
+        self.max_links = max_links
+        self.max_decoded = max_decoded
+
+        self._lock = Lock()
+        self._block: Optional[np.ndarray] = None
+        # 每帧第一次与最后一次被截到的时间
+        self._ts = np.zeros(capacity, dtype=np.int64)
+        self._last_ts = np.zeros(capacity, dtype=np.int64)
+        self._seqs = np.zeros(capacity, dtype=np.int64)
+        self._newest = 0
+        # 当前数组中第一帧的编号，截图尺寸变化时更新
+        self._first = 1
+        self._digest: Optional[int] = None
+        # roi 与截图没有交集时只提示一次
+        self._warned_empty = False
+        # reco_id -> Recognition.Starting 的时间戳
+        self._links: "OrderedDict[int, int]" = OrderedDict()
+        # frame 转换过的帧：编号不会复用，帧在被覆盖前不会改变，因此按编号缓存
+        self._decode_lock = Lock()
+        self._decoded: "OrderedDict[int, Frame]" = OrderedDict()
+        self._out: Optional[np.ndarray] = None
+
+    @property
+    def newest(self) -> int:
+        """最新一帧的编号，没有帧时为 0"""
+        return self._newest
+
+    @property
+    def oldest(self) -> int:
+        """仍在缓冲区中的最早一帧的编号，没有帧时为 0"""
+        if self._newest == 0:
+            return 0
+        return max(self._newest - self.capacity + 1, self._first)
+
+    @property
+    def nbytes(self) -> int:
+        """预分配数组占用的内存"""
+        block = self._block
+        return 0 if block is None else block.nbytes
+
+    def __len__(self) -> int:
+        return self._newest - self.oldest + 1 if self._newest else 0
+
+    def _crop(self, cvmat: np.ndarray) -> np.ndarray:
+        """roi 与截图的交集，超出截图的部分被裁掉（负坐标不会从另一侧回绕），没有交集时为空数组"""
+        if self.roi is None:
+            return cvmat
+        x, y, width, height = self.roi
+        rows, cols = cvmat.shape[:2]
+        x0, y0 = min(max(x, 0), cols), min(max(y, 0), rows)
+        x1, y1 = min(max(x + width, x0), cols), min(max(y + height, y0), rows)
+        return cvmat[y0:y1, x0:x1]
+
+    def push(self, cvmat: np.ndarray, ts: Optional[int] = None) -> int:
+        """
+        写入一帧，与上一帧内容相同时不写入
+
+        Args:
+            cvmat: BGR 格式的截图
+            ts: 截图时的单调时钟（纳秒），默认为当前时间
+
+        Returns:
+            帧编号，内容相同或 roi 与截图没有交集（不写入）时为上一帧的编号
+        """
+        if ts is None:
+            ts = time.monotonic_ns()
+        image = self._crop(cvmat)
+        if image.size == 0:
+            if not self._warned_empty:
+                self._warned_empty = True
+                print(
+                    f"[FrameRingBuffer] ROI {self.roi} is outside the "
+                    f"{cvmat.shape[1]}x{cvmat.shape[0]} screenshot, frames are not kept"
+                )
+            return self._newest
+        digest = frame_digest(image)
+        with self._lock:
+            if digest == self._digest and self._newest:
+                # 仍是同一画面，只延长它的时间区间
+                self._last_ts[(self._newest - 1) % self.capacity] = ts
+                return self._newest
+            block = self._block
+            if block is None or block.shape[1:] != image.shape:
+                block = self._block = np.empty(
+                    (self.capacity, *image.shape), dtype=np.uint8
+                )
+                self._seqs[:] = 0
+                self._first = self._newest + 1
+            seq = self._newest + 1
+            slot = (seq - 1) % self.capacity
+            np.copyto(block[slot], image)
+            self._ts[slot] = ts
+            self._last_ts[slot] = ts
+            self._seqs[slot] = seq
+            self._newest = seq
+            self._digest = digest
+        return seq
+
+    def get(
+        self, seq: int, out: Optional[np.ndarray] = None
+    ) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        读取一帧
+
+        Args:
+            seq: 帧编号
+            out: 形状相同的数组，设置时复制到其中，翻看多帧时可以复用同一数组避免分配
+
+        Returns:
+            (第一次截到的时间戳, 图像)，帧已被覆盖时返回 None
+        """
+        with self._lock:
+            slot = (seq - 1) % self.capacity
+            if seq <= 0 or self._block is None or self._seqs[slot] != seq:
+                return None
+            if out is None:
+                out = self._block[slot].copy()
+            else:
+                np.copyto(out, self._block[slot])
+            return int(self._ts[slot]), out
+
+    def frame(self, seq: int) -> Optional[Frame]:
+        """
+        读取一帧并转换为 Frame，编码结果缓存在 Frame 上
+
+        最近读取的 max_decoded 帧会被缓存，翻看时同一帧只转换、编码一次。
+        读取时复制到复用的数组中，转换在缓冲区的锁之外进行，不阻塞 push。
+
+        Returns:
+            帧已被覆盖时返回 None
+        """
+        with self._decode_lock:
+            frame = self._decoded.get(seq)
+            if frame is not None:
+                if self.timestamp(seq) is None:
+                    del self._decoded[seq]
+                    return None
+                self._decoded.move_to_end(seq)
+                return frame
+
+            with self._lock:
+                slot = (seq - 1) % self.capacity
+                if seq <= 0 or self._block is None or self._seqs[slot] != seq:
+                    return None
+                image = self._block[slot]
+                out = self._out
+                if out is None or out.shape != image.shape:
+                    out = self._out = np.empty_like(image)
+                np.copyto(out, image)
+
+            converted = cvmat_to_image(out)
+            if converted.readonly:
+                # 单通道图像直接引用 out 的内存，复用前需要复制
+                converted = converted.copy()
+            frame = self._decoded[seq] = Frame(converted)
+            if len(self._decoded) > self.max_decoded:
+                self._decoded.popitem(last=False)
+            return frame
+
+    def timestamp(self, seq: int) -> Optional[int]:
+        """帧第一次被截到的时间戳，帧已被覆盖时返回 None"""
+        with self._lock:
+            slot = (seq - 1) % self.capacity
+            if seq <= 0 or self._seqs[slot] != seq:
+                return None
+            return int(self._ts[slot])
+
+    def nearest(self, ts: int) -> Optional[int]:
+        """
+        ts 时屏幕上的帧编号，缓冲区为空时返回 None
+
+        ts 落在某帧第一次与最后一次被截到的区间内时返回该帧，否则返回区间离 ts 最近的帧。
+        """
+        with self._lock:
+            valid = self._seqs > 0
+            if not valid.any():
+                return None
+            outside = np.maximum(self._ts - ts, ts - self._last_ts)
+            distance = np.where(valid, np.maximum(outside, 0), np.iinfo(np.int64).max)
+            return int(self._seqs[int(distance.argmin())])
+
+    def link(self, reco_id: int, ts: int) -> None:
+        """记录识别开始的时间，查询时再关联到最近的一帧（可能是之后截到的）"""
+        with self._lock:
+            self._links[reco_id] = ts
+            if len(self._links) > self.max_links:
+                self._links.popitem(last=False)
+
+    def reco_time(self, reco_id: int) -> Optional[int]:
+        """识别开始的时间戳，未记录时返回 None"""
+        with self._lock:
+            return self._links.get(reco_id)
+
+    def find_reco(self, reco_id: int) -> Optional[int]:
+        """识别开始时最近的一帧的编号，未记录或缓冲区为空时返回 None"""
+        ts = self.reco_time(reco_id)
+        if ts is None:
+            return None
+        return self.nearest(ts)
+
+    def seqs(self) -> List[int]:
+        """缓冲区中所有帧的编号，从旧到新"""
+        return list(range(self.oldest, self._newest + 1)) if self._newest else []
@@ -3,11 +3,31 @@ MaaFramework 任务执行状态机
 基于 TypeScript 版本的状态机实现，用于追踪和管理任务执行的完整生命周期
 """
 
+import json
+import pickle
+import sys
+import uuid
+from array import array
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, TypeVar, Union
+from pathlib import Path
+from typing import (
+    IO,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    List,
+    Dict,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 from strenum import StrEnum
 
 from ..utils.arg_parser import ArgParser
+from .profiler import NodeProfiler
+from .events import Event, EventKind, EventLike, EventPhase, to_msg
 
 debug_mode: bool = ArgParser.get_debug()
 
@@ -45,18 +65,529 @@ class ScopeType(StrEnum):
     ACTION = "act"
 
 
-@dataclass
+# ScopeType / GeneralStatus 在 ScopeArena 中以下标编码保存，
+# SCOPE_TYPES / STATUSES 用于将 arena.types / arena.statuses 中的编码还原
+SCOPE_TYPES: Tuple[ScopeType, ...] = tuple(ScopeType)
+_SCOPE_TYPE_CODES: Dict[ScopeType, int] = {t: i for i, t in enumerate(SCOPE_TYPES)}
+STATUSES: Tuple[GeneralStatus, ...] = tuple(GeneralStatus)
+_STATUS_CODES: Dict[GeneralStatus, int] = {s: i for i, s in enumerate(STATUSES)}
+
+# 空引用
+_NIL = -1
+
+
+def _msg_nbytes(msg: EventLike) -> int:
+    """估算消息占用的内存"""
+    if isinstance(msg, Event):
+        return msg.nbytes()
+    total = sys.getsizeof(msg)
+    for value in msg.values():
+        total += sys.getsizeof(value)
+        if isinstance(value, list):
+            total += sum(sys.getsizeof(v) for v in value)
+    return total
+
+
+_RECO_CODE = _SCOPE_TYPE_CODES[ScopeType.RECO]
+_RECO_NODE_CODE = _SCOPE_TYPE_CODES[ScopeType.RECO_NODE]
+_PIPELINE_CODE = _SCOPE_TYPE_CODES[ScopeType.PIPELINE_NODE]
+_RUNNING_CODE = _STATUS_CODES[GeneralStatus.RUNNING]
+
+
+class ScopeIndex:
+    """
+    ScopeArena 的二级索引，随 Scope 的创建和结束增量维护
+
+    - reco_ids: reco_id -> RECO 的 id
+    - names: 节点名 -> id 列表（按创建顺序）
+    - types: ScopeType 编码 -> id 列表
+    - finished: (节点名, ScopeType 编码, GeneralStatus 编码) -> 已结束的 id 列表
+    - running: 运行中的 id 集合
+    - finished_by_status: GeneralStatus 编码 -> 已结束的 id 列表
+
+    结束后的状态通常不会再改变，因此 finished 系列只追加；查询时会按当前状态过滤，
+    保证即使状态被重复设置也不会返回错误结果。
+    """
+
+    __slots__ = (
+        "reco_ids",
+        "names",
+        "types",
+        "finished",
+        "running",
+        "finished_by_status",
+    )
+
+    def __init__(self) -> None:
+        self.reco_ids: Dict[int, int] = {}
+        self.names: Dict[str, array] = {}
+        self.types: List[array] = [array("i") for _ in SCOPE_TYPES]
+        self.finished: Dict[Tuple[str, int, int], array] = {}
+        self.running: Set[int] = set()
+        self.finished_by_status: Dict[int, array] = {}
+
+    def on_create(
+        self, scope_id: int, type_code: int, status_code: int, msg: EventLike
+    ) -> None:
+        self.types[type_code].append(scope_id)
+
+        name = msg.get("name")
+        if isinstance(name, str):
+            self.names.setdefault(name, array("i")).append(scope_id)
+
+        reco_id = msg.get("reco_id")
+        if type_code == _RECO_CODE and isinstance(reco_id, int):
+            self.reco_ids[reco_id] = scope_id
+
+        self.on_status(scope_id, type_code, _NIL, status_code, msg)
+
+    def on_status(
+        self,
+        scope_id: int,
+        type_code: int,
+        old_code: int,
+        new_code: int,
+        msg: EventLike,
+    ) -> None:
+        if old_code == new_code:
+            return
+        if old_code == _RUNNING_CODE:
+            self.running.discard(scope_id)
+
+        if new_code == _RUNNING_CODE:
+            self.running.add(scope_id)
+            return
+
+        # 从一个结束状态变为另一个结束状态时（仅在异常消息流中出现），避免重复追加
+        refinished = old_code not in (_NIL, _RUNNING_CODE)
+
+        ids = self.finished_by_status.setdefault(new_code, array("i"))
+        if not (refinished and scope_id in ids):
+            ids.append(scope_id)
+
+        name = msg.get("name")
+        if isinstance(name, str):
+            ids = self.finished.setdefault((name, type_code, new_code), array("i"))
+            if not (refinished and scope_id in ids):
+                ids.append(scope_id)
+
+    def copy(self) -> "ScopeIndex":
+        """独立的副本，只复制容器与数组"""
+        index = ScopeIndex.__new__(ScopeIndex)
+        index.reco_ids = dict(self.reco_ids)
+        index.names = {name: ids[:] for name, ids in self.names.items()}
+        index.types = [ids[:] for ids in self.types]
+        index.finished = {key: ids[:] for key, ids in self.finished.items()}
+        index.running = set(self.running)
+        index.finished_by_status = {
+            code: ids[:] for code, ids in self.finished_by_status.items()
+        }
+        return index
+
+    def nbytes(self) -> int:
+        """估算占用的内存"""
+        arrays = [*self.names.values(), *self.types, *self.finished.values()]
+        arrays += self.finished_by_status.values()
+        total = sum(sys.getsizeof(a) for a in arrays)
+        total += sys.getsizeof(self.reco_ids) + sys.getsizeof(self.names)
+        total += sys.getsizeof(self.finished) + sys.getsizeof(self.running)
+        # reco_ids 中的键值对象
+        total += len(self.reco_ids) * 2 * sys.getsizeof(1 << 30)
+        return total
+
+
+class ScopeArena:
+    """
+    Scope 的紧凑存储（struct-of-arrays）
+
+    每个任务使用一个独立的 arena，任务自身的 id 为 0，因此淘汰任务时可以整体序列化并释放。
+    每个 Scope 是一个整数 id，各字段保存在平行数组中：
+    - types / statuses: ScopeType、GeneralStatus 的编码
+    - parents: 父节点 id
+    - msgs: 消息字典的引用
+    - first_child / last_child / next_sibling: 子节点链表（pipeline_node 为 reco，其余为 childs）
+    - slots: 单个子节点（pipeline_node、act_node 为 action，reco_node 为 reco_detail）
+    - versions: 创建或最后一次修改 msg/status 时的事件序号（clock）
+    - levels: 距所属任务的层数（任务为 0）
+    - starts / ends: 开始、结束消息的时间戳（msg["ts"]，单调时钟纳秒），未知为 0
+    - pipeline_depths: 从自身到任务路径上 PipelineNode 的数量（包含自身）
+    - root_pipelines: 路径上最顶层的 PipelineNode（可以是自身）
+    - pipelines: 最近的 PipelineNode 祖先（不包含自身）
+
+    Scope 的父节点在创建后不会改变，因此祖先相关的字段在创建时由父节点推导一次即可。
+    - detached: 是否已从执行图中脱离（action / reco_detail 被替换后，旧子树不再可达）
+
+    节点之间只以整数互相引用，不产生循环引用，也不需要 GC 追踪。
+    """
+
+    __slots__ = (
+        "types",
+        "statuses",
+        "parents",
+        "msgs",
+        "first_child",
+        "last_child",
+        "next_sibling",
+        "slots",
+        "versions",
+        "levels",
+        "detached",
+        "starts",
+        "ends",
+        "pipeline_depths",
+        "root_pipelines",
+        "pipelines",
+        "index",
+        "clock",
+        "msg_bytes",
+    )
+
+    def __init__(self) -> None:
+        self.types = array("b")
+        self.statuses = array("b")
+        self.parents = array("i")
+        self.msgs: List[EventLike] = []
+        self.first_child = array("i")
+        self.last_child = array("i")
+        self.next_sibling = array("i")
+        self.slots = array("i")
+        self.versions = array("q")
+        self.levels = array("i")
+        self.detached = array("b")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.pipeline_depths = array("i")
+        self.root_pipelines = array("i")
+        self.pipelines = array("i")
+        self.index = ScopeIndex()
+        # 当前事件序号，由 reducer 在处理每条消息前更新
+        self.clock = 0
+        # msgs 中消息字典的估算大小
+        self.msg_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def create(
+        self,
+        type: ScopeType,
+        msg: EventLike,
+        parent: Optional["Scope"] = None,
+        status: GeneralStatus = GeneralStatus.RUNNING,
+    ) -> "Scope":
+        """
+        分配一个新的 Scope
+
+        Args:
+            type: 作用域类型
+            msg: 消息（Event 或消息字典）
+            parent: 父节点，只记录引用，不会加入父节点的子节点中
+            status: 初始状态
+
+        Returns:
+            新 Scope 的视图
+        """
+        scope_id = len(self.types)
+        type_code = _SCOPE_TYPE_CODES[type]
+        status_code = _STATUS_CODES[status]
+        is_pipeline = type == ScopeType.PIPELINE_NODE
+        if parent is None:
+            level, detached = 0, 0
+            pipeline_depth = int(is_pipeline)
+            root_pipeline = scope_id if is_pipeline else _NIL
+            pipeline = _NIL
+        else:
+            pid = parent.id
+            level = self.levels[pid] + 1
+            detached = self.detached[pid]
+            pipeline_depth = self.pipeline_depths[pid] + is_pipeline
+            root_pipeline = self.root_pipelines[pid]
+            if root_pipeline == _NIL and is_pipeline:
+                root_pipeline = scope_id
+            pipeline = pid if self.types[pid] == _PIPELINE_CODE else self.pipelines[pid]
+
+        self.types.append(type_code)
+        self.statuses.append(status_code)
+        self.parents.append(_NIL if parent is None else parent.id)
+        self.msgs.append(msg)
+        self.first_child.append(_NIL)
+        self.last_child.append(_NIL)
+        self.next_sibling.append(_NIL)
+        self.slots.append(_NIL)
+        self.versions.append(self.clock)
+        self.levels.append(level)
+        self.detached.append(detached)
+        self.starts.append(msg.get("ts") or 0)
+        self.ends.append(0)
+        self.pipeline_depths.append(pipeline_depth)
+        self.root_pipelines.append(root_pipeline)
+        self.pipelines.append(pipeline)
+        self.msg_bytes += _msg_nbytes(msg)
+        self.index.on_create(scope_id, type_code, status_code, msg)
+        return Scope(self, scope_id)
+
+    def set_status(self, scope_id: int, status: GeneralStatus) -> None:
+        old_code = self.statuses[scope_id]
+        new_code = _STATUS_CODES[status]
+        self.statuses[scope_id] = new_code
+        self.versions[scope_id] = self.clock
+        self.index.on_status(
+            scope_id,
+            self.types[scope_id],
+            old_code,
+            new_code,
+            self.msgs[scope_id],
+        )
+
+    def set_msg(self, scope_id: int, msg: EventLike) -> None:
+        self.msg_bytes += _msg_nbytes(msg) - _msg_nbytes(self.msgs[scope_id])
+        self.msgs[scope_id] = msg
+        self.versions[scope_id] = self.clock
+
+    def finish(self, scope_id: int, msg: EventLike, status: GeneralStatus) -> int:
+        """
+        以结束消息更新 Scope 的 msg、状态与结束时间
+
+        Returns:
+            耗时（纳秒），开始或结束时间未知时返回 -1
+        """
+        self.set_msg(scope_id, msg)
+        self.set_status(scope_id, status)
+        end = msg.get("ts") or 0
+        self.ends[scope_id] = end
+        start = self.starts[scope_id]
+        return end - start if start and end else -1
+
+    def copy(self) -> "ScopeArena":
+        """
+        独立的副本
+
+        平行数组按内存整体复制，消息字典只复制引用（消息被替换而不会被原地修改）。
+        """
+        arena = ScopeArena.__new__(ScopeArena)
+        for name in ScopeArena.__slots__:
+            value = getattr(self, name)
+            setattr(
+                arena, name, value[:] if isinstance(value, (array, list)) else value
+            )
+        arena.index = self.index.copy()
+        return arena
+
+    def nbytes(self) -> int:
+        """估算占用的内存（数组、消息与索引）"""
+        arrays = (
+            self.types,
+            self.statuses,
+            self.parents,
+            self.first_child,
+            self.last_child,
+            self.next_sibling,
+            self.slots,
+            self.versions,
+            self.levels,
+            self.detached,
+            self.starts,
+            self.ends,
+            self.pipeline_depths,
+            self.root_pipelines,
+            self.pipelines,
+        )
+        total = sum(sys.getsizeof(a) for a in arrays)
+        total += sys.getsizeof(self.msgs) + self.msg_bytes
+        return total + self.index.nbytes()
+
+    def set_slot(self, scope_id: int, child_id: int) -> None:
+        """设置 action / reco_detail，被替换的旧子树标记为脱离"""
+        old = self.slots[scope_id]
+        self.slots[scope_id] = child_id
+        if old == _NIL or old == child_id:
+            return
+
+        stack = [old]
+        while stack:
+            current = stack.pop()
+            self.detached[current] = 1
+            child = self.first_child[current]
+            while child != _NIL:
+                stack.append(child)
+                child = self.next_sibling[child]
+            if self.slots[current] != _NIL:
+                stack.append(self.slots[current])
+
+    def view(self, scope_id: int) -> Optional["Scope"]:
+        """获取 id 对应的视图，空引用返回 None"""
+        return None if scope_id == _NIL else Scope(self, scope_id)
+
+    def iter_childs(self, scope_id: int) -> Iterator["Scope"]:
+        """按顺序遍历子节点链表"""
+        child = self.first_child[scope_id]
+        while child != _NIL:
+            yield Scope(self, child)
+            child = self.next_sibling[child]
+
+
 class Scope:
-    """通用作用域基类"""
+    """
+    通用作用域
+
+    ScopeArena 中某个 id 的轻量视图，字段的读写都直接落在 arena 上，
+    因此同一节点可以有多个视图，比较时请使用 == 而非 is。
+    childs / reco 每次访问都会返回新列表，修改列表不会影响执行图，添加子节点请使用 add_child。
+    """
+
+    __slots__ = ("arena", "id")
+
+    def __init__(self, arena: ScopeArena, scope_id: int) -> None:
+        self.arena = arena
+        self.id = scope_id
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, Scope)
+            and other.arena is self.arena
+            and other.id == self.id
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.arena), self.id))
+
+    def __repr__(self) -> str:
+        return f"Scope(id={self.id}, type={self.type}, status={self.status}, msg={self.msg})"
+
+    @property
+    def type(self) -> ScopeType:
+        return SCOPE_TYPES[self.arena.types[self.id]]
+
+    @property
+    def msg(self) -> MsgDict:
+        """消息字典，内部以 Event 存储时每次访问都会转换为新的字典"""
+        return to_msg(self.arena.msgs[self.id])
+
+    @msg.setter
+    def msg(self, value: EventLike) -> None:
+        self.arena.set_msg(self.id, value)
+
+    @property
+    def status(self) -> GeneralStatus:
+        return STATUSES[self.arena.statuses[self.id]]
+
+    @status.setter
+    def status(self, value: GeneralStatus) -> None:
+        self.arena.set_status(self.id, value)
+
+    @property
+    def started_ns(self) -> int:
+        """开始时间（单调时钟纳秒），未知为 0"""
+        return self.arena.starts[self.id]
+
+    @property
+    def ended_ns(self) -> int:
+        """结束时间（单调时钟纳秒），未结束或未知为 0"""
+        return self.arena.ends[self.id]
+
+    @property
+    def duration_ns(self) -> Optional[int]:
+        """耗时（纳秒），未结束或时间未知时为 None"""
+        start, end = self.started_ns, self.ended_ns
+        return end - start if start and end else None
+
+    def finish(self, msg: EventLike, status: GeneralStatus) -> int:
+        """以结束消息更新 msg、状态与结束时间，见 ScopeArena.finish"""
+        return self.arena.finish(self.id, msg, status)
+
+    @property
+    def parent(self) -> Optional["Scope"]:
+        """父节点引用"""
+        return self.arena.view(self.arena.parents[self.id])
+
+    @property
+    def childs(self) -> List["Scope"]:
+        if self.type == ScopeType.PIPELINE_NODE:
+            return []
+        return list(self.arena.iter_childs(self.id))
+
+    @property
+    def reco(self) -> Optional[List["Scope"]]:
+        """for pipeline_node"""
+        if self.type != ScopeType.PIPELINE_NODE:
+            return None
+        return list(self.arena.iter_childs(self.id))
+
+    @property
+    def action(self) -> Optional["Scope"]:
+        """for pipeline_node, act_node"""
+        if self.type not in (ScopeType.PIPELINE_NODE, ScopeType.ACTION_NODE):
+            return None
+        return self.arena.view(self.arena.slots[self.id])
+
+    @action.setter
+    def action(self, value: Optional["Scope"]) -> None:
+        self.arena.set_slot(self.id, _NIL if value is None else value.id)
+
+    @property
+    def reco_detail(self) -> Optional["Scope"]:
+        """for reco_node"""
+        if self.type != ScopeType.RECO_NODE:
+            return None
+        return self.arena.view(self.arena.slots[self.id])
+
+    @reco_detail.setter
+    def reco_detail(self, value: Optional["Scope"]) -> None:
+        self.arena.set_slot(self.id, _NIL if value is None else value.id)
+
+    @property
+    def last_child(self) -> Optional["Scope"]:
+        """childs（pipeline_node 为 reco）的最后一个元素，O(1)"""
+        return self.arena.view(self.arena.last_child[self.id])
+
+    def add_child(self, child: "Scope") -> None:
+        """追加子节点（pipeline_node 追加到 reco，其余追加到 childs）"""
+        arena = self.arena
+        last = arena.last_child[self.id]
+        if last == _NIL:
+            arena.first_child[self.id] = child.id
+        else:
+            arena.next_sibling[last] = child.id
+        arena.last_child[self.id] = child.id
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    执行图的保留策略
+
+    内存中最多保留 max_tasks 个任务，且所有任务的估算内存不超过 max_bytes，
+    超出时从最旧的任务开始淘汰（当前任务始终保留）。
+    淘汰的任务序列化到 spill_dir，之后可以通过 LaunchGraph.get_task 等接口按需载入；
+    spill_dir 为 None 时直接丢弃。
+    """
 
-    type: str
-    msg: MsgDict = field(default_factory=dict)
-    status: GeneralStatus = GeneralStatus.RUNNING
-    childs: List["Scope"] = field(default_factory=list)
-    reco: Optional[List["Scope"]] = None  # for pipeline_node
-    action: Optional["Scope"] = None  # for pipeline_node, act_node
-    reco_detail: Optional["Scope"] = None  # for reco_node
-    parent: Optional["Scope"] = field(default=None, repr=False)  # 父节点引用
+    max_tasks: Optional[int] = None
+    max_bytes: Optional[int] = None
+    spill_dir: Optional[Path] = None
+
+
+@dataclass
+class SpilledTask:
+    """已淘汰到磁盘的任务"""
+
+    # 序列化后的 ScopeArena，为 None 表示已丢弃
+    path: Optional[Path]
+    msg: MsgDict
+    status: GeneralStatus
+    scopes: int
+    nbytes: int
+    # 任务中 reco_id 的范围，用于按 reco_id 查找
+    reco_min: Optional[int]
+    reco_max: Optional[int]
+
+    def load(self) -> Optional[Scope]:
+        """从磁盘载入任务"""
+        if self.path is None or not self.path.exists():
+            return None
+        with open(self.path, "rb") as f:
+            arena: ScopeArena = pickle.load(f)
+        return Scope(arena, 0)
 
 
 @dataclass
@@ -64,7 +595,18 @@ class LaunchGraph:
     """执行图的根结构"""
 
     depth: int = 0
+    # 内存中的任务，每个任务使用独立的 ScopeArena
     childs: List[Scope] = field(default_factory=list)
+    # 已处理的消息数量
+    events: int = 0
+    # 活动作用域栈：stack[i] 是深度 i + 1 处的追踪节点，栈顶即当前 tracker
+    # 与 depth 同步维护，使 reducer 每条消息的定位开销为 O(1)
+    stack: List[Optional[Scope]] = field(default_factory=list, repr=False)
+    retention: Optional[RetentionPolicy] = field(default=None, repr=False)
+    # 已淘汰的任务，按时间顺序排列，全局任务序号 = len(spilled) + childs 中的下标
+    spilled: List[SpilledTask] = field(default_factory=list, repr=False)
+    # 按节点聚合的耗时统计，不受任务淘汰影响
+    profiler: NodeProfiler = field(default_factory=NodeProfiler, repr=False)
 
     def to_dict(self) -> Dict[str, Union[int, List[ScopeDict]]]:
         """转换为字典，便于序列化和调试"""
@@ -93,6 +635,337 @@ class LaunchGraph:
 
         return result
 
+    @property
+    def task_count(self) -> int:
+        """任务总数（包括已淘汰的任务）"""
+        return len(self.spilled) + len(self.childs)
+
+    def get_task(self, index: int) -> Optional[Scope]:
+        """
+        获取任务，已淘汰的任务会从磁盘载入
+
+        Args:
+            index: 全局任务序号
+
+        Returns:
+            任务作用域，不存在或已被丢弃时返回 None
+        """
+        if index < 0:
+            index += self.task_count
+        if 0 <= index < len(self.spilled):
+            return self.spilled[index].load()
+        index -= len(self.spilled)
+        if 0 <= index < len(self.childs):
+            return self.childs[index]
+        return None
+
+    def get_recognition(self, reco_id: int) -> Optional[Scope]:
+        """
+        通过 reco_id 查找 Recognition
+
+        内存中的任务通过索引查找；已淘汰的任务按 reco_id 范围定位后从磁盘载入。
+
+        Args:
+            reco_id: 识别 id
+
+        Returns:
+            对应的 RECO 作用域，不存在或已脱离执行图时返回 None
+        """
+        for task in reversed(self.childs):
+            scope = _get_recognition(task.arena, reco_id)
+            if scope is not None:
+                return scope
+
+        for spilled in reversed(self.spilled):
+            if spilled.reco_min is None or spilled.reco_max is None:
+                continue
+            if spilled.reco_min <= reco_id <= spilled.reco_max:
+                task = spilled.load()
+                if task is not None:
+                    return _get_recognition(task.arena, reco_id)
+        return None
+
+    def find_scopes(
+        self,
+        name: Optional[str] = None,
+        type: Optional[ScopeType] = None,
+        status: Optional[GeneralStatus] = None,
+        task: Optional[Scope] = None,
+    ) -> List[Scope]:
+        """
+        按条件查询作用域，结果按任务及创建顺序排列
+
+        从二级索引中选取最小的候选集后再过滤，例如 name + type + status（已结束）的查询
+        只访问结果本身，不遍历整个执行图。
+
+        Args:
+            name: 节点名
+            type: 作用域类型
+            status: 状态
+            task: 所属任务，None 表示内存中的所有任务（可传入 get_task 载入的已淘汰任务）
+
+        Returns:
+            满足所有条件的作用域列表（不包括已脱离执行图的节点）
+        """
+        type_code = None if type is None else _SCOPE_TYPE_CODES[type]
+        status_code = None if status is None else _STATUS_CODES[status]
+        tasks = self.childs if task is None else [task]
+
+        results: List[Scope] = []
+        for t in tasks:
+            results += _find_scopes(t.arena, name, type_code, status_code)
+        return results
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        内存占用统计
+
+        Returns:
+            tasks: 内存中的任务数；scopes: 内存中的作用域数；bytes: 估算内存占用；
+            spilled_tasks: 已淘汰的任务数；spilled_bytes: 淘汰到磁盘的字节数
+        """
+        return {
+            "tasks": len(self.childs),
+            "scopes": sum(len(t.arena) for t in self.childs),
+            "bytes": sum(t.arena.nbytes() for t in self.childs),
+            "spilled_tasks": len(self.spilled),
+            "spilled_bytes": sum(s.nbytes for s in self.spilled),
+        }
+
+    def detached_copy(self) -> "LaunchGraph":
+        """
+        与当前执行图互不影响的副本，用于在其他线程中序列化
+
+        只复制内存中各任务的 arena，比序列化整个执行图快得多。
+        副本不包含保留策略与耗时统计：重放时不应再淘汰任务到磁盘，耗时统计也不随快照保存。
+        """
+        arenas: Dict[int, ScopeArena] = {}
+
+        def rebind(scope: Scope) -> Scope:
+            arena = arenas.get(id(scope.arena))
+            if arena is None:
+                arena = arenas[id(scope.arena)] = scope.arena.copy()
+            return Scope(arena, scope.id)
+
+        return LaunchGraph(
+            depth=self.depth,
+            childs=[rebind(task) for task in self.childs],
+            events=self.events,
+            stack=[None if scope is None else rebind(scope) for scope in self.stack],
+            spilled=list(self.spilled),
+        )
+
+    def apply_retention(self) -> None:
+        """按保留策略淘汰最旧的任务，当前任务始终保留"""
+        policy = self.retention
+        if policy is None:
+            return
+
+        # 总内存只统计一次，淘汰时减去被淘汰任务的占用
+        total = (
+            sum(t.arena.nbytes() for t in self.childs)
+            if policy.max_bytes is not None
+            else 0
+        )
+
+        def over_budget() -> bool:
+            if policy.max_tasks is not None and len(self.childs) > policy.max_tasks:
+                return True
+            return policy.max_bytes is not None and total > policy.max_bytes
+
+        while len(self.childs) > 1 and over_budget():
+            task = self.childs.pop(0)
+            if policy.max_bytes is not None:
+                total -= task.arena.nbytes()
+            self.spilled.append(self._spill(task))
+
+    def _spill(self, task: Scope) -> SpilledTask:
+        arena = task.arena
+        path: Optional[Path] = None
+        nbytes = 0
+        if self.retention and self.retention.spill_dir is not None:
+            spill_dir = Path(self.retention.spill_dir)
+            spill_dir.mkdir(parents=True, exist_ok=True)
+            path = spill_dir / f"{uuid.uuid4().hex}.task"
+            with open(path, "wb") as f:
+                pickle.dump(arena, f, protocol=pickle.HIGHEST_PROTOCOL)
+            nbytes = path.stat().st_size
+
+        reco_ids = arena.index.reco_ids
+        return SpilledTask(
+            path=path,
+            msg=task.msg,
+            status=task.status,
+            scopes=len(arena),
+            nbytes=nbytes,
+            reco_min=min(reco_ids) if reco_ids else None,
+            reco_max=max(reco_ids) if reco_ids else None,
+        )
+
+    def iter_json(
+        self, since: Optional[int] = None, chunk_size: int = 64 * 1024
+    ) -> Iterator[str]:
+        """
+        流式序列化，逐块生成 JSON 文本
+
+        使用显式栈遍历，不受嵌套深度限制，也不会构造完整的嵌套字典。
+        since 为 None 时，拼接所有块等价于 json.dumps(self.to_dict())。
+
+        Args:
+            since: 事件序号水位线，设置后只输出在该事件之后创建或修改的 Scope（扁平列表）
+            chunk_size: 每块的大致字符数
+
+        Yields:
+            JSON 文本块
+        """
+        parts: List[str] = []
+        size = 0
+        pieces = (
+            self._iter_json_pieces()
+            if since is None
+            else self._iter_json_changes(since)
+        )
+        for piece in pieces:
+            parts.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield "".join(parts)
+                parts.clear()
+                size = 0
+        if parts:
+            yield "".join(parts)
+
+    def dump(self, fp: IO[str], since: Optional[int] = None) -> None:
+        """
+        流式写入文件对象
+
+        Args:
+            fp: 文本模式的文件对象
+            since: 同 iter_json
+        """
+        for chunk in self.iter_json(since):
+            fp.write(chunk)
+
+    def _iter_json_pieces(self) -> Iterator[str]:
+        yield f'{{"depth": {self.depth}, "childs": ['
+        for i, task in enumerate(self.childs):
+            if i:
+                yield ", "
+            yield from _iter_scope_json(task.arena, task.id)
+        yield "]}"
+
+    def _iter_json_changes(self, since: int) -> Iterator[str]:
+        yield (
+            f'{{"depth": {self.depth}, "events": {self.events}, '
+            f'"since": {since}, "scopes": ['
+        )
+        first = True
+        for task_index, task in enumerate(self.childs, len(self.spilled)):
+            arena = task.arena
+            for scope_id, version in enumerate(arena.versions):
+                if version <= since:
+                    continue
+                yield (
+                    f'{"" if first else ", "}'
+                    f'{{"task": {task_index}, "id": {scope_id}, '
+                    f'"parent": {arena.parents[scope_id]}, '
+                    f'"type": {json.dumps(SCOPE_TYPES[arena.types[scope_id]])}, '
+                    f'"status": {json.dumps(STATUSES[arena.statuses[scope_id]].value)}, '
+                    f'"msg": {json.dumps(to_msg(arena.msgs[scope_id]))}}}'
+                )
+                first = False
+        yield "]}"
+
+
+def _get_recognition(arena: ScopeArena, reco_id: int) -> Optional[Scope]:
+    scope_id = arena.index.reco_ids.get(reco_id, _NIL)
+    if scope_id == _NIL or arena.detached[scope_id]:
+        return None
+    return Scope(arena, scope_id)
+
+
+def _find_scopes(
+    arena: ScopeArena,
+    name: Optional[str],
+    type_code: Optional[int],
+    status_code: Optional[int],
+) -> List[Scope]:
+    """在单个任务的 arena 中按条件查询"""
+    index = arena.index
+
+    candidates: Iterable[int]
+    if (
+        name is not None
+        and type_code is not None
+        and status_code is not None
+        and status_code != _RUNNING_CODE
+    ):
+        # finished 按结束顺序追加，嵌套时与创建顺序不同
+        candidates = sorted(index.finished.get((name, type_code, status_code), ()))
+    elif status_code == _RUNNING_CODE:
+        candidates = sorted(index.running)
+    elif status_code is not None:
+        candidates = sorted(index.finished_by_status.get(status_code, ()))
+    elif name is not None:
+        candidates = index.names.get(name, ())
+    elif type_code is not None:
+        candidates = index.types[type_code]
+    else:
+        candidates = range(len(arena))
+
+    results: List[Scope] = []
+    for scope_id in candidates:
+        if arena.detached[scope_id]:
+            continue
+        if type_code is not None and arena.types[scope_id] != type_code:
+            continue
+        if status_code is not None and arena.statuses[scope_id] != status_code:
+            continue
+        if name is not None and arena.msgs[scope_id].get("name") != name:
+            continue
+        results.append(Scope(arena, scope_id))
+    return results
+
+
+def _iter_scope_json(arena: ScopeArena, root: int) -> Iterator[str]:
+    """以显式栈遍历 root 子树，生成与 LaunchGraph._scope_to_dict 一致的 JSON 片段"""
+    # 栈中的元素为待输出的文本或待展开的 Scope id
+    stack: List[Union[str, int]] = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+            continue
+
+        type = SCOPE_TYPES[arena.types[item]]
+        yield (
+            f'{{"type": {json.dumps(type)}, '
+            f'"status": {json.dumps(STATUSES[arena.statuses[item]].value)}, '
+            f'"msg": {json.dumps(to_msg(arena.msgs[item]))}'
+        )
+
+        # 与 _scope_to_dict 的字段顺序保持一致：childs, reco, action, reco_detail
+        fields: List[Tuple[str, List[int]]] = []
+        childs = [c.id for c in arena.iter_childs(item)]
+        if childs:
+            key = "reco" if type == ScopeType.PIPELINE_NODE else "childs"
+            fields.append((key, childs))
+        slot = arena.slots[item]
+        if slot != _NIL:
+            key = "reco_detail" if type == ScopeType.RECO_NODE else "action"
+            fields.append((key, [slot]))
+
+        stack.append("}")
+        for key, ids in reversed(fields):
+            is_list = key in ("childs", "reco")
+            if is_list:
+                stack.append("]")
+            for i in range(len(ids) - 1, -1, -1):
+                stack.append(ids[i])
+                if i:
+                    stack.append(", ")
+            stack.append(f', "{key}": [' if is_list else f', "{key}": ')
+
 
 def _last_of(arr: List[Scope]) -> Optional[Scope]:
     """获取列表的最后一个元素"""
@@ -113,10 +986,12 @@ def is_nested_recognition(scope: Scope) -> bool:
         True 如果该 Recognition 是在 RecognitionNode 内部触发的（嵌套调用）
         False 如果是来自 NextList 的正常识别流程
     """
-    if scope.type != ScopeType.RECO:
+    arena = scope.arena
+    if arena.types[scope.id] != _RECO_CODE:
         return False
     # 如果父节点是 RECO_NODE，则是嵌套调用
-    return scope.parent is not None and scope.parent.type == ScopeType.RECO_NODE
+    parent = arena.parents[scope.id]
+    return parent != _NIL and arena.types[parent] == _RECO_NODE_CODE
 
 
 def get_parent_chain(scope: Scope) -> List[Scope]:
@@ -141,8 +1016,9 @@ def find_root_pipeline_node(scope: Scope) -> Optional[Scope]:
     """
     找到最顶层的 PipelineNode
 
-    从当前节点向上遍历，找到最接近根的 PipelineNode。
+    路径上最接近根的 PipelineNode（包含当前节点）。
     这在追踪嵌套调用时很有用，可以确定某个识别属于哪个顶层任务。
+    创建时预先计算，O(1)。
 
     Args:
         scope: 起始作用域
@@ -150,31 +1026,22 @@ def find_root_pipeline_node(scope: Scope) -> Optional[Scope]:
     Returns:
         最顶层的 PipelineNode，如果没有找到则返回 None
     """
-    root_pipeline: Optional[Scope] = None
-    current: Optional[Scope] = scope
-    while current is not None:
-        if current.type == ScopeType.PIPELINE_NODE:
-            root_pipeline = current
-        current = current.parent
-    return root_pipeline
+    return scope.arena.view(scope.arena.root_pipelines[scope.id])
 
 
 def find_immediate_pipeline_node(scope: Scope) -> Optional[Scope]:
     """
     找到最近的 PipelineNode 父节点
 
+    创建时预先计算，O(1)。
+
     Args:
         scope: 起始作用域
 
     Returns:
         最近的 PipelineNode 父节点，如果没有找到则返回 None
     """
-    current: Optional[Scope] = scope.parent
-    while current is not None:
-        if current.type == ScopeType.PIPELINE_NODE:
-            return current
-        current = current.parent
-    return None
+    return scope.arena.view(scope.arena.pipelines[scope.id])
 
 
 def get_nesting_depth(scope: Scope) -> int:
@@ -183,6 +1050,7 @@ def get_nesting_depth(scope: Scope) -> int:
 
     计算从当前节点到根的 PipelineNode 数量。
     深度为 1 表示顶层执行，大于 1 表示嵌套调用。
+    创建时预先计算，O(1)。
 
     Args:
         scope: 要检查的作用域
@@ -190,13 +1058,7 @@ def get_nesting_depth(scope: Scope) -> int:
     Returns:
         嵌套深度（PipelineNode 的数量）
     """
-    depth = 0
-    current: Optional[Scope] = scope
-    while current is not None:
-        if current.type == ScopeType.PIPELINE_NODE:
-            depth += 1
-        current = current.parent
-    return depth
+    return scope.arena.pipeline_depths[scope.id]
 
 
 def _iterate_tracker(tracker: Optional[Scope]) -> Optional[Scope]:
@@ -213,27 +1075,67 @@ def _iterate_tracker(tracker: Optional[Scope]) -> Optional[Scope]:
         return None
 
     if tracker.type == ScopeType.PIPELINE_NODE:
-        if tracker.action:
-            return tracker.action
-        elif tracker.reco:
-            return _last_of(tracker.reco)
+        return tracker.action or tracker.last_child
     elif tracker.type == ScopeType.RECO_NODE:
         return tracker.reco_detail
     elif tracker.type == ScopeType.ACTION_NODE:
         return tracker.action
     elif tracker.type == ScopeType.NEXT_LIST:
-        return _last_of(tracker.childs)
+        return tracker.last_child
     elif tracker.type in (ScopeType.RECO, ScopeType.ACTION):
-        return _last_of(tracker.childs)
+        return tracker.last_child
+
+
+def _tracker_from_stack(current: LaunchGraph) -> Optional[Scope]:
+    """
+    从活动作用域栈中取出当前追踪节点，O(1)
 
+    Args:
+        current: 当前的执行图状态
+
+    Returns:
+        当前深度的作用域，追踪失败时返回 None
+    """
+    tracker = current.stack[-1] if current.stack else None
+    if tracker is None and debug_mode:
+        print(f"[LaunchGraph] Trace failed at depth {current.depth}")
+    return tracker
+
+
+def _finish(
+    current: LaunchGraph, scope: Scope, msg: EventLike, status: GeneralStatus
+) -> None:
+    """结束作用域，并将耗时计入 LaunchGraph.profiler"""
+    duration = scope.finish(msg, status)
+    if duration >= 0:
+        name = msg.get("name") or msg.get("entry") or ""
+        current.profiler.record(scope.type, str(name), duration)
+
+
+def _enter(current: LaunchGraph, tracker: Scope) -> None:
+    """
+    进入下一层：深度加一，并将新深度处的追踪节点压栈
 
-def reduce_launch_graph(current: LaunchGraph, msg: Dict[str, MsgValue]) -> LaunchGraph:
+    新深度处的节点与逐层追踪得到的结果一致，即 _iterate_tracker(tracker)。
+    """
+    current.depth += 1
+    current.stack.append(_iterate_tracker(tracker))
+
+
+def _leave(current: LaunchGraph) -> None:
+    """退出当前层：深度减一，并弹出栈顶"""
+    current.depth -= 1
+    if current.stack:
+        current.stack.pop()
+
+
+def reduce_launch_graph(current: LaunchGraph, msg: EventLike) -> LaunchGraph:
     """
     状态机的 reducer 函数，根据消息更新执行图（原地修改）
 
     Args:
         current: 当前的执行图状态
-        msg: 从 MaaFramework 接收到的消息
+        msg: 从 MaaFramework 接收到的消息，Event 或消息字典
 
     Returns:
         更新后的执行图（同一个实例，已被原地修改）
@@ -241,250 +1143,163 @@ def reduce_launch_graph(current: LaunchGraph, msg: Dict[str, MsgValue]) -> Launc
     Note:
         与 TypeScript 版本使用 immer 实现不可变更新不同，
         Python 版本采用原地修改以避免 deepcopy 带来的内存开销。
+        当前节点通过 LaunchGraph.stack 定位，每条消息的开销与嵌套深度无关。
     """
-    msg_type = msg.get("msg", "")
+    return _reduce(current, msg)
 
-    # 处理 Task 级别的消息
-    if msg_type == "Task.Starting":
-        new_scope = Scope(
-            type=ScopeType.TASK,
-            msg=msg,
-            status=GeneralStatus.RUNNING,
-        )
-        current.childs.append(new_scope)
-        current.depth = 0
-        return current
 
-    elif msg_type == "Task.Succeeded":
-        task = _last_of(current.childs)
-        if task:
-            task.msg = msg
-            task.status = GeneralStatus.SUCCESS
+def reduce_launch_graph_many(
+    current: LaunchGraph, msgs: Iterable[EventLike]
+) -> LaunchGraph:
+    """
+    批量应用消息，等价于依次调用 reduce_launch_graph
+
+    Args:
+        current: 当前的执行图状态
+        msgs: 按接收顺序排列的消息
+
+    Returns:
+        更新后的执行图（同一个实例，已被原地修改）
+    """
+    reduce = _reduce
+    for msg in msgs:
+        reduce(current, msg)
+    return current
+
+
+def _reduce(current: LaunchGraph, msg: EventLike) -> LaunchGraph:
+    event = msg if isinstance(msg, Event) else Event.from_msg(msg)
+    current.events += 1
+
+    if event is None:
+        if debug_mode:
+            print(f"[LaunchGraph] Drop msg: unknown type {msg.get('msg', '')}")
         return current
 
-    elif msg_type == "Task.Failed":
+    kind = event.kind
+
+    # 处理 Task 级别的消息
+    if kind == EventKind.TASK:
+        if event.phase == EventPhase.STARTING:
+            arena = ScopeArena()
+            arena.clock = current.events
+            new_scope = arena.create(ScopeType.TASK, event)
+            current.childs.append(new_scope)
+            current.depth = 0
+            current.stack.clear()
+            current.apply_retention()
+            return current
+
         task = _last_of(current.childs)
         if task:
-            task.msg = msg
-            task.status = GeneralStatus.FAILED
+            task.arena.clock = current.events
+            _finish(current, task, event, _PHASE_STATUSES[event.phase])
         return current
 
-    # 获取当前任务
+    # 获取当前任务，修改只会发生在最后一个任务中
     task = _last_of(current.childs)
     if not task:
         if debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, reason: no task")
+            print(f"[LaunchGraph] Drop msg: {event.msg_type}, reason: no task")
         return current
+    task.arena.clock = current.events
 
     # 深度为 0 时，只能处理 PipelineNode.Starting
     if current.depth == 0:
-        if msg_type == "PipelineNode.Starting":
-            new_scope = Scope(
-                type=ScopeType.PIPELINE_NODE,
-                msg=msg,
-                status=GeneralStatus.RUNNING,
-                reco=[],
-                parent=task,
-            )
-            task.childs.append(new_scope)
+        if kind == EventKind.PIPELINE_NODE and event.phase == EventPhase.STARTING:
+            new_scope = task.arena.create(ScopeType.PIPELINE_NODE, event, parent=task)
+            task.add_child(new_scope)
             current.depth += 1
+            current.stack.append(new_scope)
             return current
         elif debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, reason: no root")
+            print(f"[LaunchGraph] Drop msg: {event.msg_type}, reason: no root")
         return current
 
-    # 深度 > 0，需要追踪到当前节点
-    top_scope = _last_of(task.childs)
-    if not top_scope and debug_mode:
-        print(f"[LaunchGraph] Drop msg: {msg_type}, reason: no root")
+    # 深度 > 0，定位到当前节点
+    tracker = _tracker_from_stack(current)
+    if tracker is None:
+        if debug_mode:
+            print(f"[LaunchGraph] Drop msg: {event.msg_type}, reason: trace failed")
         return current
 
-    tracker = top_scope
-    for i in range(1, current.depth):
-        new_tracker = _iterate_tracker(tracker)
-        if not new_tracker:
-            if tracker and debug_mode:
+    # 根据消息类型更新状态机
+    _HANDLERS[kind][event.phase](current, tracker, event)
+    return current
+
+
+_PHASE_STATUSES = {
+    EventPhase.SUCCEEDED: GeneralStatus.SUCCESS,
+    EventPhase.FAILED: GeneralStatus.FAILED,
+}
+
+_Handler = Callable[[LaunchGraph, Scope, Event], None]
+
+
+def _start_handler(scope_type: ScopeType, parents: Dict[ScopeType, bool]) -> _Handler:
+    """
+    创建 Starting 消息的处理函数
+
+    Args:
+        scope_type: 新作用域的类型
+        parents: 允许的追踪节点类型 -> 新作用域是否放入单个子节点槽（action / reco_detail）
+    """
+
+    def handler(current: LaunchGraph, tracker: Scope, event: Event) -> None:
+        to_slot = parents.get(tracker.type)
+        if to_slot is None:
+            if debug_mode:
                 print(
-                    f"[LaunchGraph] Drop msg: {msg_type}, reason: trace failed at depth {i}"
+                    f"[LaunchGraph] Drop msg: {event.msg_type}, tracker type: {tracker.type}"
                 )
-            return current
-        tracker = new_tracker
+            return
+        new_scope = tracker.arena.create(scope_type, event, parent=tracker)
+        if to_slot:
+            tracker.arena.set_slot(tracker.id, new_scope.id)
+        else:
+            tracker.add_child(new_scope)
+        _enter(current, tracker)
 
-    # 根据消息类型更新状态机
-    if msg_type == "PipelineNode.Starting":
-        if tracker and tracker.type in (ScopeType.RECO, ScopeType.ACTION):
-            new_scope = Scope(
-                type=ScopeType.PIPELINE_NODE,
-                msg=msg,
-                status=GeneralStatus.RUNNING,
-                reco=[],
-                parent=tracker,
-            )
-            tracker.childs.append(new_scope)
-            current.depth += 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
-
-    elif msg_type in ("PipelineNode.Succeeded", "PipelineNode.Failed"):
-        if tracker and tracker.type == ScopeType.PIPELINE_NODE:
-            tracker.msg = msg
-            tracker.status = (
-                GeneralStatus.SUCCESS
-                if msg_type == "PipelineNode.Succeeded"
-                else GeneralStatus.FAILED
-            )
-            current.depth -= 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
-
-    elif msg_type == "RecognitionNode.Starting":
-        if tracker and tracker.type in (ScopeType.RECO, ScopeType.ACTION):
-            new_scope = Scope(
-                type=ScopeType.RECO_NODE,
-                msg=msg,
-                status=GeneralStatus.RUNNING,
-                parent=tracker,
-            )
-            tracker.childs.append(new_scope)
-            current.depth += 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
-
-    elif msg_type in ("RecognitionNode.Succeeded", "RecognitionNode.Failed"):
-        if tracker and tracker.type == ScopeType.RECO_NODE:
-            tracker.msg = msg
-            tracker.status = (
-                GeneralStatus.SUCCESS
-                if msg_type == "RecognitionNode.Succeeded"
-                else GeneralStatus.FAILED
-            )
-            current.depth -= 1
-        elif (
-            tracker
-            and tracker.type == ScopeType.RECO
-            and hasattr(tracker, "reco_detail") is False
-        ):
-            # 如果在 RECO 中但不是标准结构，检查父节点
-            # 这种情况可能是从 reco_node.reco_detail 追踪过来的
-            current.depth -= 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
-
-    elif msg_type == "ActionNode.Starting":
-        if tracker and tracker.type in (ScopeType.RECO, ScopeType.ACTION):
-            new_scope = Scope(
-                type=ScopeType.ACTION_NODE,
-                msg=msg,
-                status=GeneralStatus.RUNNING,
-                parent=tracker,
-            )
-            tracker.childs.append(new_scope)
-            current.depth += 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
-
-    elif msg_type in ("ActionNode.Succeeded", "ActionNode.Failed"):
-        if tracker and tracker.type == ScopeType.ACTION_NODE:
-            tracker.msg = msg
-            tracker.status = (
-                GeneralStatus.SUCCESS
-                if msg_type == "ActionNode.Succeeded"
-                else GeneralStatus.FAILED
-            )
-            current.depth -= 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
-
-    elif msg_type == "NextList.Starting":
-        if tracker and tracker.type == ScopeType.PIPELINE_NODE:
-            if tracker.reco is None:
-                tracker.reco = []
-            new_scope = Scope(
-                type=ScopeType.NEXT_LIST,
-                msg=msg,
-                status=GeneralStatus.RUNNING,
-                parent=tracker,
-            )
-            tracker.reco.append(new_scope)
-            current.depth += 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
-
-    elif msg_type in ("NextList.Succeeded", "NextList.Failed"):
-        if tracker and tracker.type == ScopeType.NEXT_LIST:
-            tracker.msg = msg
-            tracker.status = (
-                GeneralStatus.SUCCESS
-                if msg_type == "NextList.Succeeded"
-                else GeneralStatus.FAILED
-            )
-            current.depth -= 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
-
-    elif msg_type == "Recognition.Starting":
-        if tracker and tracker.type == ScopeType.RECO_NODE:
-            new_scope = Scope(
-                type=ScopeType.RECO,
-                msg=msg,
-                status=GeneralStatus.RUNNING,
-                parent=tracker,
-            )
-            tracker.reco_detail = new_scope
-            current.depth += 1
-        elif tracker and tracker.type == ScopeType.NEXT_LIST:
-            new_scope = Scope(
-                type=ScopeType.RECO,
-                msg=msg,
-                status=GeneralStatus.RUNNING,
-                parent=tracker,
-            )
-            tracker.childs.append(new_scope)
-            current.depth += 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
-
-    elif msg_type in ("Recognition.Succeeded", "Recognition.Failed"):
-        if tracker and tracker.type == ScopeType.RECO:
-            tracker.msg = msg
-            tracker.status = (
-                GeneralStatus.SUCCESS
-                if msg_type == "Recognition.Succeeded"
-                else GeneralStatus.FAILED
-            )
-            current.depth -= 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
-
-    elif msg_type == "Action.Starting":
-        if tracker and tracker.type in (ScopeType.PIPELINE_NODE, ScopeType.ACTION_NODE):
-            new_scope = Scope(
-                type=ScopeType.ACTION,
-                msg=msg,
-                status=GeneralStatus.RUNNING,
-                parent=tracker,
-            )
-            tracker.action = new_scope
-            current.depth += 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
-
-    elif msg_type in ("Action.Succeeded", "Action.Failed"):
-        if tracker and tracker.type == ScopeType.ACTION:
-            tracker.msg = msg
-            tracker.status = (
-                GeneralStatus.SUCCESS
-                if msg_type == "Action.Succeeded"
-                else GeneralStatus.FAILED
-            )
-            current.depth -= 1
-        elif tracker and debug_mode:
-            print(f"[LaunchGraph] Drop msg: {msg_type}, tracker type: {tracker.type}")
+    return handler
 
-    elif debug_mode:
-        print(f"[LaunchGraph] Drop msg: unknown type {msg_type}")
 
-    return current
+def _end_handler(scope_type: ScopeType) -> _Handler:
+    """创建 Succeeded / Failed 消息的处理函数：追踪节点类型匹配时结束它并退出一层"""
+
+    def handler(current: LaunchGraph, tracker: Scope, event: Event) -> None:
+        if tracker.type != scope_type:
+            if debug_mode:
+                print(
+                    f"[LaunchGraph] Drop msg: {event.msg_type}, tracker type: {tracker.type}"
+                )
+            return
+        _finish(current, tracker, event, _PHASE_STATUSES[event.phase])
+        _leave(current)
+
+    return handler
+
+
+def _handlers(
+    scope_type: ScopeType, parents: Dict[ScopeType, bool]
+) -> Tuple[_Handler, _Handler, _Handler]:
+    end = _end_handler(scope_type)
+    return (_start_handler(scope_type, parents), end, end)
+
+
+_NESTED_PARENTS = {ScopeType.RECO: False, ScopeType.ACTION: False}
+
+# _HANDLERS[kind][phase]，Task 消息在 _reduce 中单独处理
+_HANDLERS: Tuple[Tuple[_Handler, _Handler, _Handler], ...] = (
+    (),  # type: ignore[assignment]
+    _handlers(ScopeType.PIPELINE_NODE, _NESTED_PARENTS),
+    _handlers(ScopeType.RECO_NODE, _NESTED_PARENTS),
+    _handlers(ScopeType.ACTION_NODE, _NESTED_PARENTS),
+    _handlers(ScopeType.NEXT_LIST, {ScopeType.PIPELINE_NODE: False}),
+    _handlers(ScopeType.RECO, {ScopeType.RECO_NODE: True, ScopeType.NEXT_LIST: False}),
+    _handlers(
+        ScopeType.ACTION, {ScopeType.PIPELINE_NODE: True, ScopeType.ACTION_NODE: True}
+    ),
+)
 
 
 # 全局状态机实例
@@ -0,0 +1,166 @@
+"""
+实时画面：后台线程按目标帧率连续截图并编码为 JPEG，由 MJPEG 流读取
+"""
+
+import time
+from collections import deque
+from threading import Condition, Thread
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from ..utils.img_tools import Frame
+from .profiler import NodeStats
+
+
+class LiveView:
+    """
+    连续截图的共享帧源
+
+    截图线程只在有观看者时运行。暂停或 busy 返回 True（例如任务运行中）时不截图，
+    避免与任务争用控制器。每个观看者总是取最新一帧，跟不上时中间的帧被丢弃。
+    """
+
+    def __init__(
+        self,
+        screencap: Callable[[], Optional[np.ndarray]],
+        busy: Optional[Callable[[], bool]] = None,
+        fps: float = 10,
+        max_height: int = 720,
+        quality: int = 80,
+    ) -> None:
+        """
+        Args:
+            screencap: 同步截图函数，返回 BGR 格式的原始图像
+            busy: 返回 True 时暂停截图
+            fps: 目标帧率
+            max_height: 推送画面的最大高度，超过时等比缩小
+            quality: JPEG 质量
+        """
+        self.screencap = screencap
+        self.busy = busy
+        self.fps = fps
+        self.max_height = max_height
+        self.quality = quality
+        self.paused = False
+
+        self.frames = 0
+        # 观看者跟不上而跳过的帧数
+        self.dropped = 0
+        self.latency = NodeStats()
+
+        self._cond = Condition()
+        self._viewers = 0
+        self._thread: Optional[Thread] = None
+        self._seq = 0
+        self._jpeg: Optional[bytes] = None
+        # 最新一帧的原图尺寸与推送尺寸
+        self._sizes: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
+        self._times: Deque[float] = deque(maxlen=32)
+
+    @property
+    def viewers(self) -> int:
+        return self._viewers
+
+    @property
+    def suspended(self) -> bool:
+        """是否因暂停或任务运行而停止截图"""
+        return self.paused or (self.busy is not None and self.busy())
+
+    def stream(self, keepalive: float = 1.0) -> Iterator[Optional[bytes]]:
+        """
+        一个观看者的 JPEG 帧序列，迭代期间截图线程保持运行
+
+        Args:
+            keepalive: 没有新帧时每隔这么多秒产出一次 None，便于调用方发现连接已断开
+
+        Yields:
+            JPEG 数据，或没有新帧时的 None
+        """
+        with self._cond:
+            self._viewers += 1
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._run, name="LiveViewCapture", daemon=True
+                )
+                self._thread.start()
+            # 已有帧时立即发送
+            last = self._seq - 1 if self._jpeg is not None else self._seq
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._seq != last, keepalive)
+                    if self._seq == last:
+                        jpeg = None
+                    else:
+                        if self._seq - last > 1:
+                            self.dropped += self._seq - last - 1
+                        last, jpeg = self._seq, self._jpeg
+                yield jpeg
+        finally:
+            with self._cond:
+                self._viewers -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """实际帧率、截图耗时与观看者数量"""
+        with self._cond:
+            times = list(self._times)
+        fps = 0.0
+        if len(times) > 1 and time.monotonic() - times[-1] < 2:
+            fps = (len(times) - 1) / (times[-1] - times[0])
+        latency = self.latency
+        return {
+            "fps": fps,
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "viewers": self._viewers,
+            "suspended": self.suspended,
+            "latency_ns": {
+                "mean": latency.mean,
+                "p99": latency.percentile(99),
+                "max": latency.max,
+            },
+        }
+
+    def to_frame_coords(self, x: float, y: float) -> Tuple[int, int]:
+        """将推送画面上的坐标换算为原图坐标"""
+        sizes = self._sizes
+        if sizes is None:
+            return int(x), int(y)
+        (width, height), (view_width, view_height) = sizes
+        return int(x * width / view_width), int(y * height / view_height)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._viewers == 0:
+                    self._thread = None
+                    return
+            start = time.monotonic()
+            if not self.suspended:
+                self._capture()
+            interval = 1 / self.fps if self.fps > 0 else 0
+            time.sleep(max(interval - (time.monotonic() - start), 0.001))
+
+    def _capture(self) -> None:
+        start = time.perf_counter_ns()
+        try:
+            cvmat = self.screencap()
+        except Exception as e:
+            print(f"[LiveView] Screencap error: {e}")
+            return
+        latency = time.perf_counter_ns() - start
+        if cvmat is None:
+            return
+
+        frame = Frame.from_cvmat(cvmat)
+        view = frame.preview(self.max_height)
+        jpeg = view.encode("JPEG", quality=self.quality)
+        with self._cond:
+            self._jpeg = jpeg
+            self._sizes = (frame.size, view.size)
+            self._seq += 1
+            self.frames += 1
+            self.latency.add(latency)
+            self._times.append(time.monotonic())
+            self._cond.notify_all()
@@ -0,0 +1,89 @@
+"""
+Prometheus 文本格式（0.0.4）的指标输出
+不依赖 prometheus_client：计数器与直方图由各组件常驻维护，抓取时才格式化
+"""
+
+from typing import Dict, Iterable, List, Tuple, Union
+
+from .profiler import BUCKETS, NodeStats, bucket_bound
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Dict[str, str]
+Number = Union[int, float]
+
+# 直方图的桶上界（秒），最后一个桶没有上界，只输出为 +Inf
+_BOUNDS = [repr(bucket_bound(i) / 1e9) for i in range(BUCKETS - 1)]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class MetricsWriter:
+    """
+    按指标族输出样本，同一指标的所有样本必须在一次调用中给出
+
+    Example:
+        writer = MetricsWriter()
+        writer.gauge("up", "Whether the app is running", [({}, 1)])
+        text = writer.render()
+    """
+
+    def __init__(self, prefix: str = "maadebugger_") -> None:
+        self.prefix = prefix
+        self._lines: List[str] = []
+
+    def _family(self, name: str, type: str, help: str) -> str:
+        name = self.prefix + name
+        self._lines.append(f"# HELP {name} {_escape(help)}")
+        self._lines.append(f"# TYPE {name} {type}")
+        return name
+
+    def counter(
+        self, name: str, help: str, samples: Iterable[Tuple[Labels, Number]]
+    ) -> None:
+        """单调递增的计数，name 以 _total 结尾"""
+        name = self._family(name, "counter", help)
+        for labels, value in samples:
+            self._lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    def gauge(
+        self, name: str, help: str, samples: Iterable[Tuple[Labels, Number]]
+    ) -> None:
+        name = self._family(name, "gauge", help)
+        for labels, value in samples:
+            self._lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    def histogram(
+        self, name: str, help: str, samples: Iterable[Tuple[Labels, NodeStats]]
+    ) -> None:
+        """
+        将纳秒耗时的 NodeStats 输出为以秒为单位的累积直方图
+
+        NodeStats 由其他线程并发更新，_count 取各桶之和，保证与 +Inf 桶一致。
+        """
+        name = self._family(name, "histogram", help)
+        lines = self._lines
+        for labels, stats in samples:
+            histogram = stats.histogram.tolist()
+            total = stats.total
+            prefix = _format_labels(labels)[:-1] + "," if labels else "{"
+            seen = 0
+            for bound, count in zip(_BOUNDS, histogram):
+                seen += count
+                lines.append(f'{name}_bucket{prefix}le="{bound}"}} {seen}')
+            seen += histogram[-1]
+            lines.append(f'{name}_bucket{prefix}le="+Inf"}} {seen}')
+            label_text = _format_labels(labels)
+            lines.append(f"{name}_sum{label_text} {total / 1e9!r}")
+            lines.append(f"{name}_count{label_text} {seen}")
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
@@ -0,0 +1,122 @@
+"""
+节点耗时统计
+按 (作用域类型, 节点名) 聚合已结束作用域的耗时，每个节点只占用固定大小的内存
+"""
+
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 直方图按 2 的幂划分桶：第 i 个桶的上界为 2 ** (i + _MIN_SHIFT) 纳秒
+# 最小桶 < ~1µs，最大桶 >= ~1100s
+_MIN_SHIFT = 10
+BUCKETS = 32
+
+
+def _bucket(duration: int) -> int:
+    return min(max(duration.bit_length() - _MIN_SHIFT, 0), BUCKETS - 1)
+
+
+def bucket_bound(index: int) -> int:
+    """第 index 个桶的上界（纳秒）"""
+    return 1 << (index + _MIN_SHIFT)
+
+
+class NodeStats:
+    """单个节点的耗时聚合：次数、总耗时、最小、最大与对数直方图"""
+
+    __slots__ = ("count", "total", "min", "max", "histogram")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+        self.histogram = array("Q", bytes(8 * BUCKETS))
+
+    def add(self, duration: int) -> None:
+        if self.count == 0 or duration < self.min:
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+        self.count += 1
+        self.total += duration
+        self.histogram[_bucket(duration)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> int:
+        """
+        由直方图估算分位数
+
+        Args:
+            p: 百分位（0 ~ 100）
+
+        Returns:
+            分位数所在桶的上界（纳秒），不超过实际最大值
+        """
+        if not self.count:
+            return 0
+        rank = self.count * p / 100
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank and count:
+                return min(bucket_bound(index), self.max)
+        return self.max
+
+
+class NodeProfiler:
+    """按 (作用域类型, 节点名) 聚合耗时"""
+
+    def __init__(self) -> None:
+        self.stats: Dict[Tuple[str, str], NodeStats] = {}
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    def __iter__(self) -> Iterator[Tuple[Tuple[str, str], NodeStats]]:
+        return iter(self.stats.items())
+
+    def record(self, type: str, name: str, duration: int) -> None:
+        """
+        记录一次耗时
+
+        Args:
+            type: 作用域类型
+            name: 节点名
+            duration: 耗时（纳秒）
+        """
+        key = (type, name)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = NodeStats()
+        stats.add(duration)
+
+    def get(self, type: str, name: str) -> Optional[NodeStats]:
+        return self.stats.get((type, name))
+
+    def hot_nodes(
+        self, type: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Tuple[str, str, NodeStats]]:
+        """
+        按总耗时降序排列的节点
+
+        Args:
+            type: 只返回该类型的作用域，None 表示全部
+            limit: 最多返回的数量
+
+        Returns:
+            (类型, 节点名, 统计) 列表
+        """
+        items = [
+            (t, name, stats)
+            for (t, name), stats in self.stats.items()
+            if type is None or t == type
+        ]
+        items.sort(key=lambda item: item[2].total, reverse=True)
+        return items if limit is None else items[:limit]
+
+    def clear(self) -> None:
+        self.stats.clear()
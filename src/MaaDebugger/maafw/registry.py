@@ -0,0 +1,171 @@
+"""
+多个具名调试会话
+每个会话拥有独立的 MaaFW（Resource / Controller / Tasker）、EventSink 与 LaunchGraphManager。
+各会话的 LaunchGraphManager 有各自的 reducer 线程与锁，事件互不阻塞。
+"""
+
+import re
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import (
+    EventJournal,
+    EventKind,
+    LaunchGraphContextEventSink,
+    LaunchGraphManager,
+    LaunchGraphTaskerEventSink,
+    MaaFW,
+    RetentionPolicy,
+    maafw,
+)
+from ..utils.arg_parser import ArgParser
+
+DEFAULT_SESSION = "default"
+
+_NAME_PATTERN = re.compile(r"^[\w.-]{1,32}$")
+
+
+def create_launch_graph_manager(name: str = DEFAULT_SESSION) -> LaunchGraphManager:
+    """
+    按命令行参数创建并启动 LaunchGraphManager
+
+    Args:
+        name: 会话名称，非默认会话的事件日志写入 --journal 下以会话名称命名的子目录
+    """
+    journal_dir = ArgParser.get_journal()
+    if journal_dir and name != DEFAULT_SESSION:
+        journal_dir = str(Path(journal_dir) / name)
+    max_tasks = ArgParser.get_max_tasks()
+    max_graph_bytes = ArgParser.get_max_graph_bytes()
+
+    manager = LaunchGraphManager(
+        journal=EventJournal(journal_dir) if journal_dir else None,
+        retention=(
+            RetentionPolicy(max_tasks=max_tasks, max_bytes=max_graph_bytes)
+            if max_tasks is not None or max_graph_bytes is not None
+            else None
+        ),
+        batch_window=ArgParser.get_batch_window(),
+    )
+    # EventSink 只将消息放入缓冲区，由 reducer 线程更新状态机
+    manager.start()
+    return manager
+
+
+class DebugSession:
+    """一个调试会话，创建时将状态机 EventSink 绑定到会话自己的 LaunchGraphManager"""
+
+    def __init__(self, name: str, maafw: MaaFW, manager: LaunchGraphManager) -> None:
+        self.name = name
+        self.maafw = maafw
+        self.manager = manager
+
+        maafw.context_event_sink = LaunchGraphContextEventSink(graph_manager=manager)
+        maafw.tasker_event_sink = LaunchGraphTaskerEventSink(graph_manager=manager)
+        if maafw.frames is not None:
+            manager.subscribe_batch(self._link_frames, kinds=[EventKind.RECOGNITION])
+
+    def _link_frames(self, _, msgs: List[Dict[str, Any]]) -> None:
+        """识别开始时记录时间，由截图缓冲区按时间关联到最近的一帧"""
+        frames = self.maafw.frames
+        for msg in msgs:
+            if msg.get("msg") == "Recognition.Starting":
+                frames.link(msg.get("reco_id", 0), msg.get("ts", 0))
+
+    @property
+    def is_default(self) -> bool:
+        return self.name == DEFAULT_SESSION
+
+    def close(self) -> None:
+        """停止正在运行的任务与 reducer 线程，MaaFramework 的对象随会话一起释放"""
+        tasker = self.maafw.tasker
+        if tasker is not None and tasker.running:
+            tasker.post_stop().wait()
+        self.manager.stop()
+
+    def __repr__(self) -> str:
+        return f"DebugSession({self.name!r})"
+
+
+class SessionRegistry:
+    """按名称管理调试会话，默认会话使用全局的 maafw 实例，不能被移除"""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._sessions: Dict[str, DebugSession] = {}
+        self._default: Optional[DebugSession] = None
+
+    @property
+    def default(self) -> DebugSession:
+        """默认会话，第一次访问时创建"""
+        with self._lock:
+            if self._default is None:
+                self._default = DebugSession(
+                    DEFAULT_SESSION, maafw, create_launch_graph_manager()
+                )
+                self._sessions[DEFAULT_SESSION] = self._default
+            return self._default
+
+    def create(self, name: str) -> DebugSession:
+        """
+        创建新的会话
+
+        Raises:
+            ValueError: 名称不合法或已存在
+        """
+        self.default
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(
+                f"Invalid session name: {name!r}, "
+                "use up to 32 letters, digits, '_', '-' or '.'."
+            )
+        with self._lock:
+            if name in self._sessions:
+                raise ValueError(f"Session {name!r} already exists.")
+            session = DebugSession(name, MaaFW(), create_launch_graph_manager(name))
+            self._sessions[name] = session
+            return session
+
+    def get(self, name: Optional[str] = None) -> Optional[DebugSession]:
+        """按名称获取会话，None 或空字符串表示默认会话"""
+        if not name:
+            return self.default
+        with self._lock:
+            return self._sessions.get(name)
+
+    def remove(self, name: str) -> Optional[DebugSession]:
+        """
+        移除并关闭会话
+
+        Raises:
+            ValueError: 试图移除默认会话
+        """
+        if name == DEFAULT_SESSION:
+            raise ValueError("The default session cannot be removed.")
+        with self._lock:
+            session = self._sessions.pop(name, None)
+        if session is not None:
+            session.close()
+        return session
+
+    def names(self) -> List[str]:
+        self.default
+        with self._lock:
+            return list(self._sessions)
+
+    def __iter__(self) -> Iterator[DebugSession]:
+        self.default
+        with self._lock:
+            return iter(list(self._sessions.values()))
+
+    def __len__(self) -> int:
+        return len(self.names())
+
+    def __contains__(self, name: object) -> bool:
+        with self._lock:
+            return name in self._sessions
+
+
+# 全局会话注册表
+sessions = SessionRegistry()
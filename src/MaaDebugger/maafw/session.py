@@ -0,0 +1,243 @@
+"""
+会话录制与回放
+录制 EventSink 产生的完整事件流，以及运行期间获取过的截图与识别详情，写入压缩的会话文件；
+回放时按原始速度、N 倍速或尽可能快地将事件推送到 LaunchGraphManager，无需连接设备。
+
+会话文件为 gzip 压缩的 pickle 记录流，每条记录为 (tag, ts, payload)：
+    ("session", ts, {"version": ...})   文件头
+    ("event", ts, msg)                  消息字典（与订阅者收到的格式一致，包括 Reset）
+    ("image", ts, (key, png))           截图内容，同一内容只写入一次
+    ("screenshot", ts, key)             截图引用
+    ("reco", ts, RecognitionDetail)     识别详情
+
+ts 为单调时钟纳秒，事件使用 EventSink 记录的 ts。
+会话文件包含 pickle 数据，只应回放自己录制的文件。
+"""
+
+import gzip
+import hashlib
+import io
+import pickle
+import time
+from pathlib import Path
+from threading import Event as ThreadEvent, Lock, Thread
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from PIL import Image
+
+from .events import Event
+from .journal import RESET_MSG
+from .launch_graph import LaunchGraph
+
+if TYPE_CHECKING:
+    from maa.tasker import RecognitionDetail
+
+    from . import LaunchGraphManager
+
+VERSION = 1
+
+Record = Tuple[str, int, Any]
+
+
+def read_session(path: Union[str, Path]) -> Iterator[Record]:
+    """
+    按写入顺序读取会话文件中的记录（不包括文件头）
+
+    Raises:
+        ValueError: 不是会话文件或版本不受支持
+    """
+    with gzip.open(path, "rb") as f:
+        try:
+            tag, _, header = pickle.load(f)
+        except (EOFError, pickle.UnpicklingError, OSError) as e:
+            raise ValueError(f"Not a MaaDebugger session file: {path}") from e
+        if tag != "session" or header.get("version") != VERSION:
+            raise ValueError(f"Unsupported session file: {path}")
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                # 录制被中断时最后一条记录可能不完整
+                return
+
+
+class SessionRecorder:
+    """
+    会话录制器
+
+    record_events 作为批量订阅者注册到 LaunchGraphManager，
+    record_screenshot / record_reco_detail 由获取截图与识别详情的位置调用，可以在任意线程调用。
+    """
+
+    def __init__(self, path: Union[str, Path], compresslevel: int = 6) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[gzip.GzipFile] = gzip.GzipFile(
+            self.path, "wb", compresslevel=compresslevel
+        )
+        self._lock = Lock()
+        self._images: Set[bytes] = set()
+        self._reco_ids: Set[int] = set()
+
+        self.events = 0
+        self.screenshots = 0
+        self.reco_details = 0
+
+        self._write("session", {"version": VERSION, "time": time.time()})
+
+    def _write(self, tag: str, payload: Any, ts: Optional[int] = None) -> None:
+        record = (tag, ts or time.monotonic_ns(), payload)
+        data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(data)
+
+    def record_events(self, graph: LaunchGraph, msgs: List[Dict[str, Any]]) -> None:
+        """批量订阅回调，按顺序记录消息"""
+        for msg in msgs:
+            self._write("event", msg, msg.get("ts"))
+        self.events += len(msgs)
+
+    def record_screenshot(
+        self, image: Image.Image, png: Optional[bytes] = None
+    ) -> None:
+        """
+        记录一张截图，内容相同的截图只保存一次
+
+        Args:
+            image: 截图
+            png: 已经编码好的 PNG，为空时在此编码
+        """
+        key = hashlib.blake2b(image.tobytes(), digest_size=16).digest()
+        if key not in self._images:
+            if png is None:
+                buffer = io.BytesIO()
+                image.save(buffer, format="PNG")
+                png = buffer.getvalue()
+            self._images.add(key)
+            self._write("image", (key, png))
+        self._write("screenshot", key)
+        self.screenshots += 1
+
+    def record_reco_detail(self, detail: Optional["RecognitionDetail"]) -> None:
+        """记录一次获取到的识别详情，同一 reco_id 只保存一次"""
+        if detail is None or detail.reco_id in self._reco_ids:
+            return
+        self._reco_ids.add(detail.reco_id)
+        self._write("reco", detail)
+        self.reco_details += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class SessionReplayer:
+    """
+    会话回放器
+
+    在独立线程中按记录的时间间隔将事件 post 到 LaunchGraphManager，
+    Reset 消息对应调用 manager.reset()。
+    截图通过 on_screenshot 回调传递，识别详情保存在 reco_details 中供按 reco_id 查询。
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        manager: "LaunchGraphManager",
+        speed: float = 1.0,
+        on_screenshot: Optional[Callable[[Image.Image], None]] = None,
+    ) -> None:
+        """
+        Args:
+            path: 会话文件路径
+            manager: 接收事件的 LaunchGraphManager
+            speed: 回放倍速，1 为原始速度，0 表示尽可能快
+            on_screenshot: 回放到截图时调用
+        """
+        self.path = Path(path)
+        self.manager = manager
+        self.speed = speed
+        self.on_screenshot = on_screenshot
+        self.reco_details: Dict[int, "RecognitionDetail"] = {}
+
+        self._images: Dict[bytes, bytes] = {}
+        self._stop = ThreadEvent()
+        self._thread: Optional[Thread] = None
+
+        self.events = 0
+        self.elapsed = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = Thread(target=self.run, name="SessionReplayer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待回放结束，返回是否已结束"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.running
+
+    def run(self) -> None:
+        """在当前线程中回放，直到结束或被 stop"""
+        post = self.manager.post
+        origin: Optional[int] = None
+        start = time.perf_counter()
+        try:
+            for tag, ts, payload in read_session(self.path):
+                if self._stop.is_set():
+                    break
+                if self.speed > 0:
+                    if origin is None:
+                        origin = ts
+                    delay = (ts - origin) / 1e9 / self.speed - (
+                        time.perf_counter() - start
+                    )
+                    if delay > 0 and self._stop.wait(delay):
+                        break
+
+                if tag == "event":
+                    if payload.get("msg") == RESET_MSG["msg"]:
+                        self.manager.reset()
+                    else:
+                        post(Event.from_msg(payload) or payload)
+                    self.events += 1
+                elif tag == "image":
+                    key, png = payload
+                    self._images[key] = png
+                elif tag == "screenshot":
+                    if self.on_screenshot is not None and payload in self._images:
+                        image = Image.open(io.BytesIO(self._images[payload]))
+                        image.load()
+                        self.on_screenshot(image)
+                elif tag == "reco":
+                    self.reco_details[payload.reco_id] = payload
+        except Exception as e:
+            print(f"[SessionReplayer] Replay failed: {e}")
+        finally:
+            self.elapsed = time.perf_counter() - start
+            print(
+                f"[SessionReplayer] Replayed {self.events} events in {self.elapsed:.2f}s"
+            )
@@ -0,0 +1,235 @@
+"""
+订阅者索引与限频、合并的订阅
+- SubscriberIndex 按事件类型索引订阅者，每批消息只分发给关心的订阅者
+- RateLimitedSubscription 在独立线程中按固定频率通知订阅者，reducer 只负责把消息追加到订阅者的缓冲区
+"""
+
+import time
+from threading import Condition, Thread
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from strenum import StrEnum
+
+from .events import EventKind
+from .launch_graph import LaunchGraph
+
+BatchCallback = Callable[[LaunchGraph, List[Dict[str, Any]]], None]
+
+
+class Subscriber:
+    """
+    一个批量订阅者及其过滤条件，None 表示不过滤
+
+    deferred 为 True 时回调可能阻塞，由分发方在释放执行图的锁之后再调用。
+    """
+
+    __slots__ = ("callback", "kinds", "names", "deferred")
+
+    def __init__(
+        self,
+        callback: BatchCallback,
+        kinds: Optional[Iterable[EventKind]] = None,
+        names: Optional[Iterable[str]] = None,
+        deferred: bool = False,
+    ) -> None:
+        self.callback = callback
+        self.deferred = deferred
+        self.kinds: Optional[FrozenSet[EventKind]] = (
+            None if kinds is None else frozenset(EventKind(kind) for kind in kinds)
+        )
+        self.names: Optional[FrozenSet[str]] = (
+            None if names is None else frozenset(names)
+        )
+
+    @property
+    def filtered(self) -> bool:
+        return self.kinds is not None or self.names is not None
+
+
+class SubscriberIndex:
+    """
+    按事件类型索引的订阅者集合
+
+    - 未设置过滤条件的订阅者直接收到整批消息，不逐条检查
+    - 设置了过滤条件的订阅者按 kinds 登记到对应类型的列表中（未设置 kinds 时登记到所有类型），
+      每条消息只检查该类型下的订阅者，names 在此基础上按节点名过滤
+    - 没有类型的消息（Reset 等）发送给所有订阅者
+    - 只收到空批的订阅者不会被调用
+
+    添加、移除时重建列表（写时复制），分发时无需加锁。
+    """
+
+    def __init__(self) -> None:
+        self._all: Tuple[Subscriber, ...] = ()
+        self._filtered: Tuple[Subscriber, ...] = ()
+        self._by_kind: Tuple[Tuple[Subscriber, ...], ...] = tuple(() for _ in EventKind)
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def __bool__(self) -> bool:
+        return bool(self._all)
+
+    @property
+    def has_filters(self) -> bool:
+        return bool(self._filtered)
+
+    def add(self, subscriber: Subscriber) -> None:
+        self._rebuild(self._all + (subscriber,))
+
+    def remove(self, subscriber: Subscriber) -> None:
+        self._rebuild(tuple(s for s in self._all if s is not subscriber))
+
+    def _rebuild(self, subscribers: Tuple[Subscriber, ...]) -> None:
+        self._filtered = tuple(s for s in subscribers if s.filtered)
+        self._by_kind = tuple(
+            tuple(s for s in self._filtered if s.kinds is None or kind in s.kinds)
+            for kind in EventKind
+        )
+        self._all = subscribers
+
+    def route(
+        self,
+        msgs: List[Dict[str, Any]],
+        kinds: Sequence[Optional[EventKind]],
+    ) -> List[Tuple[Subscriber, List[Dict[str, Any]]]]:
+        """
+        计算每个订阅者应收到的消息
+
+        Args:
+            msgs: 一批消息字典
+            kinds: 与 msgs 一一对应的事件类型
+
+        Returns:
+            按订阅顺序排列的 (subscriber, msgs)，不包含没有消息的订阅者
+        """
+        filtered = self._filtered
+        if not filtered:
+            return [(s, msgs) for s in self._all]
+
+        selected: Dict[int, List[Dict[str, Any]]] = {}
+        by_kind = self._by_kind
+        for msg, kind in zip(msgs, kinds):
+            if kind is None:
+                targets: Sequence[Subscriber] = filtered
+                name = None
+            else:
+                targets = by_kind[kind]
+                if not targets:
+                    continue
+                name = msg.get("name")
+            for subscriber in targets:
+                names = subscriber.names
+                if kind is not None and names is not None and name not in names:
+                    continue
+                batch = selected.get(id(subscriber))
+                if batch is None:
+                    selected[id(subscriber)] = [msg]
+                else:
+                    batch.append(msg)
+
+        routes = []
+        for subscriber in self._all:
+            batch = selected.get(id(subscriber)) if subscriber.filtered else msgs
+            if batch:
+                routes.append((subscriber, batch))
+        return routes
+
+
+class CoalescePolicy(StrEnum):
+    """两次通知之间收到的多批消息如何合并"""
+
+    # 传递自上次通知以来的所有消息
+    BATCH = "batch"
+    # 只传递最新的一条消息，订阅者从 graph 读取最新状态
+    LATEST = "latest"
+
+
+class RateLimitedSubscription:
+    """
+    以不超过 max_hz 的频率通知订阅者
+
+    push 作为普通的批量回调注册到 LaunchGraphManager，只在锁内追加消息并唤醒通知线程；
+    通知线程只在持有 graph_lock 时取出待通知的消息与执行图，释放锁后再调用 callback，
+    订阅者的耗时只会降低通知频率，不会阻塞 reducer。
+    callback 读取执行图时 reducer 可能仍在更新，需要一致的状态时由订阅者自行加锁。
+    """
+
+    def __init__(
+        self,
+        callback: BatchCallback,
+        max_hz: float,
+        coalesce: CoalescePolicy,
+        graph_lock: ContextManager,
+        name: str = "",
+    ) -> None:
+        self.callback = callback
+        self.interval = 1 / max_hz
+        self.coalesce = coalesce
+        self._graph_lock = graph_lock
+
+        self._cond = Condition()
+        self._pending: List[Dict[str, Any]] = []
+        self._graph: Optional[LaunchGraph] = None
+        self._closed = False
+
+        self.ticks = 0
+        self.received = 0
+
+        self._thread = Thread(
+            target=self._run, name=f"Subscription-{name or id(self)}", daemon=True
+        )
+        self._thread.start()
+
+    def push(self, graph: LaunchGraph, msgs: List[Dict[str, Any]]) -> None:
+        with self._cond:
+            if self.coalesce == CoalescePolicy.LATEST:
+                self._pending[:] = msgs[-1:]
+            else:
+                self._pending += msgs
+            self._graph = graph
+            self.received += len(msgs)
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def _run(self) -> None:
+        last = 0.0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+
+            delay = last + self.interval - time.monotonic()
+            if delay > 0:
+                # 等待期间到达的消息会合并到这一次通知中
+                time.sleep(delay)
+
+            # 在两批消息之间取出，使 msgs 与 graph 对应同一状态
+            with self._graph_lock:
+                with self._cond:
+                    msgs, self._pending = self._pending, []
+                    graph = self._graph
+            if graph is None or not msgs:
+                continue
+            last = time.monotonic()
+            self.ticks += 1
+            try:
+                self.callback(graph, msgs)
+            except Exception as e:
+                print(f"[LaunchGraphManager] Subscriber error: {e}")
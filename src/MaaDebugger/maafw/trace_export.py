@@ -0,0 +1,425 @@
+"""
+执行轨迹导出
+将执行图（任务 → PipelineNode → NextList → Recognition → Action）按调用栈导出为：
+- Chrome Trace Event JSON，可以在 Perfetto (https://ui.perfetto.dev) 或 chrome://tracing 中打开
+- collapsed-stack 文本（每行 "frame;frame;frame value"），可以交给 flamegraph.pl、speedscope 等生成火焰图
+
+数据来源可以是内存中的 LaunchGraph，也可以是事件日志目录、--record 的会话文件或 --trace 的追踪文件。
+事件按顺序流式处理，输出逐块生成，导出数百 MB 的轨迹时内存占用只与调用栈深度
+（collapsed-stack 还与不同调用栈的数量）有关。
+"""
+
+import gzip
+import json
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from strenum import StrEnum
+
+from .events import Event, EventKind, EventLike, EventPhase, parse_msg_type
+from .journal import JOURNAL_FILE, read_journal
+from .launch_graph import (
+    SCOPE_TYPES,
+    STATUSES,
+    GeneralStatus,
+    LaunchGraph,
+    ScopeArena,
+    ScopeType,
+)
+from .session import read_session
+from .tracer import VALUE_FIELDS as _KIND_ID_FIELDS, MAGIC as TRACE_MAGIC, read_trace
+
+
+class TraceFormat(StrEnum):
+    """导出格式"""
+
+    # Chrome Trace Event JSON
+    CHROME = "chrome"
+    # Brendan Gregg 的 collapsed-stack 文本
+    COLLAPSED = "collapsed"
+
+
+# 导出文件的扩展名与 MIME 类型
+TRACE_FILE_TYPES: Dict[TraceFormat, Tuple[str, str]] = {
+    TraceFormat.CHROME: (".json", "application/json"),
+    TraceFormat.COLLAPSED: (".folded", "text/plain"),
+}
+
+_KIND_SCOPE_TYPES: Tuple[ScopeType, ...] = (
+    ScopeType.TASK,  # TASK
+    ScopeType.PIPELINE_NODE,  # PIPELINE_NODE
+    ScopeType.RECO_NODE,  # RECOGNITION_NODE
+    ScopeType.ACTION_NODE,  # ACTION_NODE
+    ScopeType.NEXT_LIST,  # NEXT_LIST
+    ScopeType.RECO,  # RECOGNITION
+    ScopeType.ACTION,  # ACTION
+)
+# 枚举成员的属性访问较慢，循环中使用缓存的成员
+_TASK = EventKind.TASK
+_STARTING = EventPhase.STARTING
+_PHASE_STATUSES = {
+    EventPhase.SUCCEEDED: GeneralStatus.SUCCESS,
+    EventPhase.FAILED: GeneralStatus.FAILED,
+}
+
+
+class Span:
+    """
+    一个已结束（或导出时仍未结束）的作用域
+
+    按结束顺序产生，子作用域总是先于父作用域，因此 self_ns 可以在产生时确定。
+    """
+
+    __slots__ = (
+        "type",
+        "name",
+        "id",
+        "tid",
+        "start",
+        "end",
+        "status",
+        "stack",
+        "self_ns",
+    )
+
+    def __init__(
+        self,
+        type: ScopeType,
+        name: str,
+        id: Optional[int],
+        tid: int,
+        start: int,
+        end: int,
+        status: GeneralStatus,
+        stack: Tuple[str, ...],
+        self_ns: int,
+    ) -> None:
+        self.type = type
+        self.name = name
+        self.id = id
+        # 所属任务的 task_id
+        self.tid = tid
+        # 开始、结束时间（单调时钟纳秒），未知为 0
+        self.start = start
+        self.end = end
+        self.status = status
+        # 从任务到自身的帧名称
+        self.stack = stack
+        # 不包含子作用域的耗时
+        self.self_ns = self_ns
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end - self.start if self.start and self.end else 0
+
+    def __repr__(self) -> str:
+        return f"Span({';'.join(self.stack)}, {self.start}-{self.end}, {self.status})"
+
+
+def _frame(type: ScopeType, name: Optional[str]) -> str:
+    # ";" 是 collapsed-stack 的分隔符，换行会破坏行格式
+    name = (name or "").replace(";", ":").replace("\n", " ")
+    return f"{type.value}:{name}"
+
+
+class _Open:
+    """事件流中尚未结束的作用域"""
+
+    __slots__ = ("kind", "name", "id", "start", "child_ns")
+
+    def __init__(
+        self, kind: EventKind, name: str, id: Optional[int], start: int
+    ) -> None:
+        self.kind = kind
+        self.name = name
+        self.id = id
+        self.start = start
+        self.child_ns = 0
+
+
+def spans_from_events(events: Iterable[EventLike]) -> Iterator[Span]:
+    """
+    从有序的事件流中重建调用栈
+
+    结束事件按类型与 id（NextList / Action 按名称）匹配栈中最近的作用域，
+    其上方没有收到结束事件的作用域视为在同一时刻结束（状态为 running）。
+    Reset 以及事件流结束时，所有未结束的作用域以最后一个时间戳结束。
+    """
+    stack: List[_Open] = []
+    frames: List[str] = []
+    tid = 0
+    last_ts = 0
+
+    def close(status: GeneralStatus, end: int) -> Span:
+        top = stack.pop()
+        duration = end - top.start if top.start and end else 0
+        if stack:
+            stack[-1].child_ns += duration
+        span = Span(
+            _KIND_SCOPE_TYPES[top.kind],
+            top.name,
+            top.id,
+            tid,
+            top.start,
+            end,
+            status,
+            tuple(frames),
+            max(duration - top.child_ns, 0),
+        )
+        frames.pop()
+        return span
+
+    for msg in events:
+        # Event 与消息字典都支持 get，不需要转换
+        parsed = parse_msg_type(msg.get("msg", ""))
+        if parsed is None:
+            if msg.get("msg") == "Reset":
+                while stack:
+                    yield close(GeneralStatus.RUNNING, last_ts)
+            continue
+
+        kind, phase = parsed
+        ts = msg.get("ts") or 0
+        if ts:
+            last_ts = ts
+        id_field = _KIND_ID_FIELDS[kind]
+        id = msg.get(id_field) if id_field is not None else None
+        name = msg.get("entry" if kind == _TASK else "name") or ""
+
+        if phase == _STARTING:
+            if kind == _TASK and id is not None:
+                tid = id
+            stack.append(_Open(kind, name, id, ts))
+            frames.append(_frame(_KIND_SCOPE_TYPES[kind], name))
+            continue
+
+        for depth in range(len(stack) - 1, -1, -1):
+            top = stack[depth]
+            if top.kind == kind and (
+                top.id == id if id is not None else top.name == name
+            ):
+                break
+        else:
+            # 开始事件不在事件流中（例如追踪级别不同，或录制开始前已经在运行）
+            continue
+        while len(stack) > depth + 1:
+            yield close(GeneralStatus.RUNNING, ts)
+        yield close(_PHASE_STATUSES[phase], ts)
+
+    while stack:
+        yield close(GeneralStatus.RUNNING, last_ts)
+
+
+def _task_spans(arena: ScopeArena, now: int) -> Iterator[Span]:
+    """按后序遍历一个任务，未结束的作用域以 now 结束"""
+    task_event = _scope_event(arena, 0)
+    tid = (task_event.task_id if task_event is not None else None) or 0
+
+    def children(scope_id: int) -> List[int]:
+        ids = [child.id for child in arena.iter_childs(scope_id)]
+        slot = arena.view(arena.slots[scope_id])
+        if slot is not None:
+            ids.append(slot.id)
+        ids.sort(key=arena.starts.__getitem__)
+        return ids
+
+    # (scope_id, 子节点, 下一个子节点的下标, 子节点耗时)
+    stack: List[List[Any]] = [[0, children(0), 0, 0]]
+    frames = [_scope_frame(arena, 0, task_event)]
+    while stack:
+        entry = stack[-1]
+        scope_id, childs, index = entry[0], entry[1], entry[2]
+        if index < len(childs):
+            entry[2] += 1
+            child = childs[index]
+            stack.append([child, children(child), 0, 0])
+            frames.append(_scope_frame(arena, child, _scope_event(arena, child)))
+            continue
+
+        stack.pop()
+        status = STATUSES[arena.statuses[scope_id]]
+        start = arena.starts[scope_id]
+        end = arena.ends[scope_id] or (now if status == GeneralStatus.RUNNING else 0)
+        duration = end - start if start and end else 0
+        if stack:
+            stack[-1][3] += duration
+        event = _scope_event(arena, scope_id)
+        type = SCOPE_TYPES[arena.types[scope_id]]
+        id_field = _KIND_ID_FIELDS[event.kind] if event is not None else None
+        yield Span(
+            type,
+            _scope_name(event),
+            getattr(event, id_field) if id_field is not None else None,
+            tid,
+            start,
+            end,
+            status,
+            tuple(frames),
+            max(duration - entry[3], 0),
+        )
+        frames.pop()
+
+
+def _scope_event(arena: ScopeArena, scope_id: int) -> Optional[Event]:
+    msg = arena.msgs[scope_id]
+    return msg if isinstance(msg, Event) else Event.from_msg(msg)
+
+
+def _scope_name(event: Optional[Event]) -> str:
+    if event is None:
+        return ""
+    return (event.entry if event.kind == EventKind.TASK else event.name) or ""
+
+
+def _scope_frame(arena: ScopeArena, scope_id: int, event: Optional[Event]) -> str:
+    return _frame(SCOPE_TYPES[arena.types[scope_id]], _scope_name(event))
+
+
+def spans_from_graph(graph: LaunchGraph, now: int = 0) -> Iterator[Span]:
+    """
+    按任务顺序遍历执行图，已淘汰到磁盘的任务逐个载入
+
+    reducer 线程可能同时在更新执行图，遍历期间新增的作用域可能不会出现在结果中。
+
+    Args:
+        graph: 执行图
+        now: 未结束作用域的结束时间（单调时钟纳秒），0 表示使用最后一个已知的时间戳
+    """
+    for index in range(graph.task_count):
+        task = graph.get_task(index)
+        if task is None:
+            continue
+        arena = task.arena
+        yield from _task_spans(arena, now or max(max(arena.ends), max(arena.starts)))
+
+
+def iter_recorded_events(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    按文件内容读取录制的事件：事件日志目录（--journal）、会话文件（--record）或追踪文件（--trace）
+
+    Raises:
+        ValueError: 无法识别的文件
+    """
+    path = Path(path)
+    if path.is_dir() or path.name == JOURNAL_FILE:
+        return read_journal(path if path.is_dir() else path.parent)
+
+    with open(path, "rb") as f:
+        head = f.read(len(TRACE_MAGIC))
+    if head == TRACE_MAGIC:
+        return read_trace(path)
+    if head[:2] == b"\x1f\x8b":
+        return (payload for tag, _, payload in read_session(path) if tag == "event")
+    raise ValueError(f"Unrecognized trace source: {path}")
+
+
+def _chunked(pieces: Iterable[str], chunk_size: int) -> Iterator[str]:
+    parts: List[str] = []
+    size = 0
+    for piece in pieces:
+        parts.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(parts)
+            parts.clear()
+            size = 0
+    if parts:
+        yield "".join(parts)
+
+
+def _iter_chrome_events(spans: Iterable[Span], process_name: str) -> Iterator[str]:
+    yield '{"displayTimeUnit": "ms", "traceEvents": [\n'
+    yield (
+        '{"name": "process_name", "ph": "M", "pid": 1, "tid": 0, '
+        f'"args": {{"name": {json.dumps(process_name)}}}}}'
+    )
+    # 节点名称大量重复，只编码一次
+    names: Dict[str, str] = {}
+    for span in spans:
+        start, end = span.start, span.end
+        if not start or not end:
+            continue
+        name = names.get(span.name)
+        if name is None:
+            if len(names) >= 4096:
+                names.clear()
+            name = names[span.name] = json.dumps(span.name)
+        id = "" if span.id is None else f', "id": {span.id}'
+        yield (
+            f',\n{{"name": {name}, "cat": "{span.type.value}", "ph": "X", '
+            f'"ts": {start / 1e3:.3f}, "dur": {(end - start) / 1e3:.3f}, "pid": 1, '
+            f'"tid": {span.tid}, "args": {{"status": "{span.status.value}"{id}}}}}'
+        )
+        if span.type == ScopeType.TASK:
+            # 每个任务显示为一条轨道
+            yield (
+                f',\n{{"name": "thread_name", "ph": "M", "pid": 1, "tid": {span.tid}, '
+                f'"args": {{"name": {json.dumps(f"Task {span.tid}: {span.name}")}}}}}'
+            )
+    yield "\n]}\n"
+
+
+def iter_chrome_trace(
+    spans: Iterable[Span],
+    process_name: str = "MaaDebugger",
+    chunk_size: int = 64 * 1024,
+) -> Iterator[str]:
+    """
+    流式生成 Chrome Trace Event JSON
+
+    每个作用域为一个 "X"（complete）事件，时间单位为微秒，cat 为作用域类型，
+    每个任务使用 task_id 作为 tid，在 Perfetto 中显示为一条轨道。
+    """
+    return _chunked(_iter_chrome_events(spans, process_name), chunk_size)
+
+
+def iter_collapsed_stacks(
+    spans: Iterable[Span], chunk_size: int = 64 * 1024
+) -> Iterator[str]:
+    """
+    生成 collapsed-stack 文本，值为各调用栈的自身耗时（微秒）
+
+    相同的调用栈合并为一行，按调用栈排序，不足 1 微秒的调用栈被省略；
+    需要读完所有作用域后才开始输出。
+    """
+    totals: Dict[Tuple[str, ...], int] = {}
+    for span in spans:
+        if span.self_ns:
+            totals[span.stack] = totals.get(span.stack, 0) + span.self_ns
+    return _chunked(
+        (
+            f"{';'.join(stack)} {round(ns / 1e3)}\n"
+            for stack, ns in sorted(totals.items())
+            if ns >= 500
+        ),
+        chunk_size,
+    )
+
+
+def iter_trace(
+    spans: Iterable[Span], format: TraceFormat, process_name: str = "MaaDebugger"
+) -> Iterator[str]:
+    """按格式流式生成导出内容"""
+    if format == TraceFormat.CHROME:
+        return iter_chrome_trace(spans, process_name)
+    return iter_collapsed_stacks(spans)
+
+
+def export_trace(
+    spans: Iterable[Span],
+    fp: IO[str],
+    format: TraceFormat = TraceFormat.CHROME,
+    process_name: str = "MaaDebugger",
+) -> None:
+    """流式写入文本模式的文件对象"""
+    for chunk in iter_trace(spans, format, process_name):
+        fp.write(chunk)
+
+
+def open_output(path: Union[str, Path]) -> IO[str]:
+    """打开导出文件，扩展名为 .gz 时使用 gzip 压缩"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".gz":
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
@@ -0,0 +1,282 @@
+"""
+事件追踪
+EventSink 只将事件写入预分配的环形缓冲区，后台线程定期将其编码为紧凑的二进制追踪文件，
+回调线程上不发生任何控制台或文件 I/O。
+
+追踪文件格式（小端）：
+    文件头  b"MAATRACE" + <H 版本号>
+    NAME    <B 0> <I name_id> <H 长度> <UTF-8 名称>    名称首次出现时写入
+    EVENT   <B 1> <B kind> <B phase> <I name_id> <q ts> <q value>
+    DROPPED <B 2> <Q 数量>                               缓冲区被写满覆盖的事件数
+
+EVENT 中 name_id 为 NO_NAME 表示没有名称（Task 事件记录 entry），
+value 按 kind 依次为 task_id / node_id / reco_id，没有时为 -1。
+NextList 的 next_list 等列表字段不写入追踪文件。
+"""
+
+import itertools
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from threading import Event as ThreadEvent, Thread
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from strenum import StrEnum
+
+from .events import MSG_TYPES, Event, EventKind
+
+MAGIC = b"MAATRACE"
+VERSION = 1
+NO_NAME = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<8sH")
+_NAME = struct.Struct("<BIH")
+_EVENT = struct.Struct("<BBBIqq")
+_DROPPED = struct.Struct("<BQ")
+_TAG_NAME, _TAG_EVENT, _TAG_DROPPED = 0, 1, 2
+
+# EVENT 记录中 value 对应的字段，按 EventKind 下标排列，导出轨迹时用于还原 id
+VALUE_FIELDS: Tuple[Optional[str], ...] = (
+    "task_id",  # TASK
+    "node_id",  # PIPELINE_NODE
+    "node_id",  # RECOGNITION_NODE
+    "node_id",  # ACTION_NODE
+    None,  # NEXT_LIST
+    "reco_id",  # RECOGNITION
+    None,  # ACTION
+)
+
+
+class TraceLevel(StrEnum):
+    """追踪的详细程度"""
+
+    OFF = "off"
+    # 只记录 Task 事件
+    TASK = "task"
+    # 额外记录 PipelineNode / RecognitionNode / ActionNode 事件
+    NODE = "node"
+    # 记录所有事件
+    ALL = "all"
+
+
+_LEVEL_KINDS = {
+    TraceLevel.OFF: (),
+    TraceLevel.TASK: (EventKind.TASK,),
+    TraceLevel.NODE: (
+        EventKind.TASK,
+        EventKind.PIPELINE_NODE,
+        EventKind.RECOGNITION_NODE,
+        EventKind.ACTION_NODE,
+    ),
+    TraceLevel.ALL: tuple(EventKind),
+}
+
+
+class EventTracer:
+    """
+    环形缓冲区事件追踪器
+
+    trace 只取一个序号并写入一个槽位，不加锁、不分配任何对象（序号存放在预分配的 array 中，
+    避免每个事件分配元组而频繁触发 GC）；后台线程按序号顺序取出事件并写入追踪文件。
+    生产者比后台线程快一整圈时，被覆盖的事件计入 dropped 并在文件中记录 DROPPED。
+
+    写入槽位时先将序号置为 -1，再写入事件与序号；读取时在读取事件前后各检查一次序号，
+    两次不一致说明槽位正在被覆盖。
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        level: TraceLevel = TraceLevel.ALL,
+        capacity: int = 65536,
+        interval: float = 0.2,
+    ) -> None:
+        """
+        Args:
+            path: 追踪文件路径，已存在时会被覆盖
+            level: 追踪级别
+            capacity: 环形缓冲区容量，向上取整为 2 的幂
+            interval: 后台线程写入文件的间隔（秒）
+        """
+        self.path = Path(path)
+        self.level = level
+        self.capacity = 1 << max(capacity - 1, 1).bit_length()
+        self.interval = interval
+
+        self._mask = self.capacity - 1
+        self._seqs = array("q", [-1]) * self.capacity
+        self._events: List[Optional[Event]] = [None] * self.capacity
+        self._seq = itertools.count()
+        self._read = 0
+        self._enabled = tuple(kind in _LEVEL_KINDS[level] for kind in EventKind)
+
+        self._names: Dict[str, int] = {}
+        self._file: Optional[BinaryIO] = None
+        self._stop = ThreadEvent()
+        self._thread: Optional[Thread] = None
+
+        self.written = 0
+        self.dropped = 0
+
+    def trace(self, event: Event) -> None:
+        """记录一个事件，可以在任意线程调用"""
+        if self._enabled[event.kind]:
+            seq = next(self._seq)
+            index = seq & self._mask
+            self._seqs[index] = -1
+            self._events[index] = event
+            self._seqs[index] = seq
+
+    def start(self) -> None:
+        """创建追踪文件并启动后台线程"""
+        if self._thread is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION))
+        self._thread = Thread(target=self._run, name="EventTracer", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """停止后台线程，写入缓冲区中剩余的事件并关闭文件"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+        self.flush()
+
+    def flush(self) -> None:
+        """将缓冲区中已写入的事件编码并写入文件，只在后台线程（或其停止后）调用"""
+        if self._file is None:
+            return
+        chunks: List[bytes] = []
+        seqs, events, mask, read = self._seqs, self._events, self._mask, self._read
+        lost = 0
+        while True:
+            index = read & mask
+            seq = seqs[index]
+            if seq < read:
+                # 尚未写入
+                break
+            if seq > read:
+                # 生产者已超过一整圈，缓冲区中最旧的事件不早于 seq - mask
+                lost += seq - mask - read
+                read = seq - mask
+                continue
+            event = events[index]
+            if seqs[index] != seq:
+                # 读取期间被覆盖，重新检查该槽位
+                continue
+            events[index] = None
+            if event is None:
+                # 清空槽位的同时被覆盖（仅在超过一整圈时发生）
+                lost += 1
+                read += 1
+                continue
+            if lost:
+                chunks.append(_DROPPED.pack(_TAG_DROPPED, lost))
+                self.dropped += lost
+                lost = 0
+            chunks.append(self._encode(event))
+            self.written += 1
+            read += 1
+        if lost:
+            chunks.append(_DROPPED.pack(_TAG_DROPPED, lost))
+            self.dropped += lost
+        if read == self._read:
+            return
+        self._read = read
+        self._file.write(b"".join(chunks))
+        self._file.flush()
+
+    def _encode(self, event: Event) -> bytes:
+        kind = event.kind
+        name = event.entry if kind == EventKind.TASK else event.name
+        prefix = b""
+        if name is None:
+            name_id = NO_NAME
+        else:
+            name_id = self._names.get(name, -1)
+            if name_id < 0:
+                name_id = self._names[name] = len(self._names)
+                encoded = name.encode("utf-8")
+                prefix = _NAME.pack(_TAG_NAME, name_id, len(encoded)) + encoded
+        field = VALUE_FIELDS[kind]
+        value = getattr(event, field) if field is not None else None
+        return prefix + _EVENT.pack(
+            _TAG_EVENT,
+            kind,
+            event.phase,
+            name_id,
+            event.ts or 0,
+            -1 if value is None else value,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "level": self.level.value,
+            "path": str(self.path),
+            "capacity": self.capacity,
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+def read_trace(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    读取追踪文件
+
+    Yields:
+        与消息字典格式一致的事件，DROPPED 记录为 {"msg": "Dropped", "count": n}
+
+    Raises:
+        ValueError: 不是追踪文件或版本不受支持
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _HEADER.size:
+            raise ValueError(f"Not a MaaDebugger trace file: {path}")
+        # 追踪文件可能很大，通过 mmap 读取而不是整个载入内存
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from _iter_trace_records(data, path)
+
+
+def _iter_trace_records(data: Any, path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    magic, version = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a MaaDebugger trace file: {path}")
+
+    names: List[str] = []
+    offset = _HEADER.size
+    while offset < len(data):
+        tag = data[offset]
+        if tag == _TAG_NAME:
+            _, name_id, length = _NAME.unpack_from(data, offset)
+            offset += _NAME.size
+            names.append(data[offset : offset + length].decode("utf-8"))
+            offset += length
+        elif tag == _TAG_EVENT:
+            _, kind, phase, name_id, ts, value = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            msg: Dict[str, Any] = {"msg": MSG_TYPES[kind][phase], "ts": ts}
+            if name_id != NO_NAME:
+                msg["entry" if kind == EventKind.TASK else "name"] = names[name_id]
+            field = VALUE_FIELDS[kind]
+            if field is not None and value != -1:
+                msg[field] = value
+            yield msg
+        elif tag == _TAG_DROPPED:
+            _, count = _DROPPED.unpack_from(data, offset)
+            offset += _DROPPED.size
+            yield {"msg": "Dropped", "count": count}
+        else:
+            raise ValueError(f"Corrupted trace file at offset {offset}: {path}")
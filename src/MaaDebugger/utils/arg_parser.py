@@ -1,5 +1,5 @@
 import argparse
-from typing import Optional
+from typing import Optional, Tuple
 
 
 class ArgParser:
@@ -42,6 +42,80 @@ class ArgParser:
             help="Enable Debug mode. (Default: False)",
             default=False,
         )
+        cls.parser.add_argument(
+            "--journal",
+            type=str,
+            help="Write every LaunchGraph event to an on-disk journal in this directory, so the history survives resets and restarts. (Default: Disabled)",
+            default=None,
+        )
+        cls.parser.add_argument(
+            "--max-tasks",
+            type=int,
+            help="Keep at most this many tasks of the LaunchGraph in memory. Older tasks are spilled to disk and loaded on demand. (Default: Unlimited)",
+            default=None,
+        )
+        cls.parser.add_argument(
+            "--max-graph-mb",
+            type=float,
+            help="Keep the estimated memory of the LaunchGraph under this many MiB by spilling older tasks to disk. (Default: Unlimited)",
+            default=None,
+        )
+
+        cls.parser.add_argument(
+            "--batch-window",
+            type=float,
+            help="Accumulate LaunchGraph events for this many milliseconds and apply them as one batch, so subscribers are notified once per batch. (Default: 0, dispatch immediately)",
+            default=0,
+        )
+        cls.parser.add_argument(
+            "--trace",
+            type=str,
+            choices=["off", "task", "node", "all"],
+            help="Record MaaFramework events to a binary trace file in a background thread. 'task' records tasks only, 'node' adds pipeline, recognition and action nodes, 'all' records every event. (Default: 'all' with --DEBUG, otherwise 'off')",
+            default=None,
+        )
+        cls.parser.add_argument(
+            "--trace-file",
+            type=str,
+            help="Path of the trace file written by --trace. (Default: ./debug/MaaDebugger-<time>.trace)",
+            default=None,
+        )
+        cls.parser.add_argument(
+            "--screenshot-fps",
+            type=float,
+            help="Refresh the screenshot at most this many times per second while a task is running. Unchanged screenshots are not sent to the browser. 0 means unlimited. (Default: 5)",
+            default=5.0,
+        )
+        cls.parser.add_argument(
+            "--frame-buffer",
+            type=int,
+            help="Keep this many recent screenshots in a preallocated ring buffer, so the screen a recognition ran on can be viewed later. Frames are stored uncompressed at width * height * 3 bytes each, about 6 MB at 1080p and 25 MB at 4K (16 frames at 4K take about 400 MB); use --frame-buffer-roi to keep only a region. 0 disables it. (Default: 0)",
+            default=0,
+        )
+        cls.parser.add_argument(
+            "--frame-buffer-roi",
+            type=str,
+            help="Keep only this region 'x,y,width,height' of each screenshot in the frame buffer to save memory. (Default: Whole screenshot)",
+            default=None,
+        )
+        cls.parser.add_argument(
+            "--record",
+            type=str,
+            help="Record the event stream, screenshots and fetched recognition details into this compressed session file. (Default: Disabled)",
+            default=None,
+        )
+        cls.parser.add_argument(
+            "--replay",
+            type=str,
+            help="Replay a session file recorded by --record instead of events from a device. (Default: Disabled)",
+            default=None,
+        )
+        cls.parser.add_argument(
+            "--replay-speed",
+            type=float,
+            help="Replay speed of --replay, e.g. 2 for twice the original speed. 0 replays as fast as possible. (Default: 1)",
+            default=1.0,
+        )
 
     @classmethod
     def _add_dark_group(cls):
@@ -101,5 +175,103 @@ class ArgParser:
     def get_debug(cls) -> bool:
         return bool(cls.args.DEBUG)
 
+    @classmethod
+    def get_journal(cls) -> Optional[str]:
+        """
+        The directory of the LaunchGraph event journal. `None` means disabled.
+        """
+        return cls.args.journal
+
+    @classmethod
+    def get_max_tasks(cls) -> Optional[int]:
+        """
+        The maximum number of LaunchGraph tasks kept in memory. `None` means unlimited.
+        """
+        return cls.args.max_tasks
+
+    @classmethod
+    def get_max_graph_bytes(cls) -> Optional[int]:
+        """
+        The memory budget of the LaunchGraph in bytes. `None` means unlimited.
+        """
+        if cls.args.max_graph_mb is None:
+            return None
+        return int(cls.args.max_graph_mb * 1024 * 1024)
+
+    @classmethod
+    def get_batch_window(cls) -> float:
+        """
+        The LaunchGraph batch dispatch window in seconds. `0` means dispatch immediately.
+        """
+        return max(cls.args.batch_window, 0) / 1000
+
+    @classmethod
+    def get_trace(cls) -> str:
+        """
+        The event trace level: `off`, `task`, `node` or `all`.
+        Debug mode traces all events unless a level is given.
+        """
+        if cls.args.trace is not None:
+            return cls.args.trace
+        return "all" if cls.get_debug() else "off"
+
+    @classmethod
+    def get_trace_file(cls) -> Optional[str]:
+        """
+        The path of the event trace file. `None` means the default path.
+        """
+        return cls.args.trace_file
+
+    @classmethod
+    def get_screenshot_fps(cls) -> float:
+        """
+        The maximum screenshot refresh rate during a task. `0` means unlimited.
+        """
+        return max(cls.args.screenshot_fps, 0)
+
+    @classmethod
+    def get_frame_buffer(cls) -> int:
+        """
+        The capacity of the screenshot ring buffer. `0` means disabled.
+        """
+        return max(cls.args.frame_buffer, 0)
+
+    @classmethod
+    def get_frame_buffer_roi(cls) -> Optional[Tuple[int, int, int, int]]:
+        """
+        The region `(x, y, width, height)` kept in the screenshot ring buffer. `None` means the whole screenshot.
+        """
+        if not cls.args.frame_buffer_roi:
+            return None
+        usage = "--frame-buffer-roi must be 'x,y,width,height' with x, y >= 0 and width, height > 0"
+        try:
+            values = [int(v) for v in cls.args.frame_buffer_roi.split(",")]
+        except ValueError:
+            cls.parser.error(usage)
+        if len(values) != 4 or min(values[:2]) < 0 or min(values[2:]) <= 0:
+            cls.parser.error(usage)
+        return values[0], values[1], values[2], values[3]
+
+    @classmethod
+    def get_record(cls) -> Optional[str]:
+        """
+        The session file to record into. `None` means disabled.
+        """
+        return cls.args.record
+
+    @classmethod
+    def get_replay(cls) -> Optional[str]:
+        """
+        The session file to replay. `None` means disabled.
+        """
+        return cls.args.replay
+
+    @classmethod
+    def get_replay_speed(cls) -> float:
+        """
+        The replay speed multiplier. `0` means as fast as possible.
+        """
+        return max(cls.args.replay_speed, 0)
+
 
 ArgParser.init()
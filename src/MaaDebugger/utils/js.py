@@ -29,3 +29,39 @@ def select_filter(element_id: int) -> str:
                     return [...startsWithMatches, ...endsWithMatches, ...includesMatches];
                 }};
             }}"""
+
+
+def live_view_start(element_id: int, url: str) -> str:
+    """
+    在 img 元素上播放实时画面的二进制 WebSocket 流。
+
+    收到一帧后立即回复确认，服务端收到确认才发送下一帧，跟不上时服务端丢弃中间的帧。
+    """
+    return f"""
+            const img = document.getElementById("c{element_id}");
+            if (img) {{
+                img._liveSocket?.close();
+                const scheme = location.protocol === "https:" ? "wss:" : "ws:";
+                const ws = new WebSocket(`${{scheme}}//${{location.host}}{url}`);
+                ws.binaryType = "blob";
+                ws.onmessage = (event) => {{
+                    // 文本消息只用于保活
+                    if (typeof event.data === "string") return;
+                    ws.send("ack");
+                    const src = URL.createObjectURL(event.data);
+                    img.onload = () => URL.revokeObjectURL(src);
+                    img.src = src;
+                }};
+                img._liveSocket = ws;
+            }}"""
+
+
+def live_view_stop(element_id: int) -> str:
+    """断开 live_view_start 建立的连接。"""
+    return f"""
+            const img = document.getElementById("c{element_id}");
+            if (img) {{
+                img._liveSocket?.close();
+                img._liveSocket = null;
+                img.removeAttribute("src");
+            }}"""
@@ -1,5 +1,7 @@
+import os
 import platform
 from enum import Enum, auto
+from typing import Optional
 
 
 class OSTypeEnum(Enum):
@@ -19,3 +21,45 @@ def get_os_type() -> OSTypeEnum:
         return OSTypeEnum.macOS
     else:
         return OSTypeEnum.Unknown
+
+
+def get_process_rss() -> Optional[int]:
+    """当前进程的常驻内存（字节），不支持的平台返回 None"""
+    os_type = get_os_type()
+    if os_type == OSTypeEnum.Linux:
+        try:
+            with open("/proc/self/statm", "rb") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    elif os_type == OSTypeEnum.Windows:
+        return _get_windows_rss()
+    return None
+
+
+def _get_windows_rss() -> Optional[int]:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()  # type: ignore[attr-defined]
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(  # type: ignore[attr-defined]
+        process, ctypes.byref(counters), counters.cb
+    ):
+        return None
+    return counters.WorkingSetSize
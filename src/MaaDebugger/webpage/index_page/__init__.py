@@ -1,13 +1,98 @@
-from nicegui import ui
+from typing import Dict
 
+from nicegui import run, ui
+
+from ...maafw.registry import DEFAULT_SESSION, DebugSession, sessions
+from ...webpage.reco_page import RecoData
 from .master_control import main as master_control
-from .runtime_control import main as runtime_control
+from .runtime_control import RecognitionRow, main as runtime_control
+from .session_view import SessionView
 
 
 def main():
+    panels = SessionPanels()
+    panels.init_elements()
+
+
+class SessionPanels:
+    """首页的会话视图：一次显示一个会话，或并排显示所有会话"""
+
+    def __init__(self) -> None:
+        self.side_by_side = False
+        self.columns: Dict[str, ui.column] = {}
+        self.rows: Dict[str, RecognitionRow] = {}
+
+    def init_elements(self):
+        with ui.row(align_items="center"):
+            self.selector = ui.toggle(
+                [DEFAULT_SESSION],
+                value=DEFAULT_SESSION,
+                on_change=lambda e: self.show(e.value),
+            ).props("no-caps")
+            ui.switch(
+                "Side by Side",
+                on_change=lambda e: self.on_side_by_side_change(e.value),
+            )
+            name_input = ui.input("Session Name", placeholder="eg: device2").props(
+                "size=15"
+            )
+            ui.button(
+                "New Session",
+                icon="add",
+                on_click=lambda: self.on_click_new(name_input.value),
+            ).props("no-caps")
+            ui.button(
+                "Close Session",
+                icon="close",
+                on_click=lambda: self.on_click_close(self.selector.value),
+            ).props("no-caps").bind_enabled_from(
+                self.selector, "value", lambda x: x != DEFAULT_SESSION
+            )
+
+        ui.separator()
+
+        self.container = ui.row(wrap=False, align_items="start").classes(
+            "w-full overflow-x-auto"
+        )
+        self.add(sessions.default)
+
+    def add(self, session: DebugSession):
+        view = SessionView(session)
+        with self.container:
+            with ui.column() as column:
+                ui.label(session.name).classes("text-h6").bind_visibility_from(
+                    self, "side_by_side"
+                )
+                master_control(view)
+                ui.separator()
+                self.rows[session.name] = runtime_control(view)
+        self.columns[session.name] = column
+
+    def show(self, name: str):
+        for session_name, column in self.columns.items():
+            column.set_visibility(self.side_by_side or session_name == name)
+
+    def on_side_by_side_change(self, value: bool):
+        self.side_by_side = value
+        self.show(self.selector.value)
+
+    def on_click_new(self, name: str):
+        try:
+            session = sessions.create(name)
+        except ValueError as e:
+            ui.notify(str(e), position="bottom-right", type="negative")
+            return
 
-    master_control()
+        self.add(session)
+        self.selector.set_options(list(self.columns), value=session.name)
 
-    ui.separator()
+    async def on_click_close(self, name: str):
+        if name == DEFAULT_SESSION or name not in self.columns:
+            return
 
-    runtime_control()
+        self.rows.pop(name).close()
+        self.columns.pop(name).delete()
+        self.selector.set_options(list(self.columns), value=DEFAULT_SESSION)
+        # 停止任务与 reducer 线程会阻塞，不在事件循环中执行
+        await run.io_bound(sessions.remove, name)
+        RecoData.sessions.pop(name, None)
@@ -1,9 +1,16 @@
 from ...webpage.components.status_indicator import Status
 
 
-class GlobalStatus:
-    ctrl_connecting: Status = Status.PENDING
-    ctrl_detecting: Status = Status.PENDING  # not required
-    res_loading: Status = Status.PENDING
-    task_running: Status = Status.PENDING
-    agent_connecting: Status = Status.PENDING
+class SessionStatus:
+    """一个调试会话的界面状态"""
+
+    def __init__(self) -> None:
+        self.ctrl_connecting: Status = Status.PENDING
+        self.ctrl_detecting: Status = Status.PENDING  # not required
+        self.res_loading: Status = Status.PENDING
+        self.task_running: Status = Status.PENDING
+        self.agent_connecting: Status = Status.PENDING
+
+
+# 默认会话的状态
+GlobalStatus = SessionStatus()
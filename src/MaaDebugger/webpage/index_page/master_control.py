@@ -1,45 +1,42 @@
 import asyncio
-import io
 import json
 from pathlib import Path
-from typing import Any, Optional, List, Union, Literal
+from typing import Optional, List, Literal
 
 from maa.define import (
     MaaWin32ScreencapMethodEnum,
     MaaWin32InputMethodEnum,
     MaaGamepadTypeEnum,
 )
-from nicegui import app, binding, ui
+from nicegui import binding, ui
 from nicegui.elements.mixins.value_element import ValueElement
-from PIL.Image import Image
 
-from ...maafw import maafw
 from ...utils import input_checker as ic
 from ...utils import system, js
 from ...webpage.components.status_indicator import Status, StatusIndicator
-from .global_status import GlobalStatus
+from .session_view import SessionView
 
 binding.MAX_PROPAGATION_TIME = 1
-STORAGE = app.storage.general
 
-NodeListElement = ValueElement(value=[])
 
+def main(view: SessionView):
+    view.node_list = ValueElement(value=[])
 
-def main():
     with ui.row():
         with ui.column():
-            connect_control()
+            connect_control(view)
             with ui.row(align_items="center").classes("w-full"):
-                load_resource_control()
+                load_resource_control(view)
             with ui.row(align_items="center").classes("w-full"):
-                agent_control()
+                agent_control(view)
             with ui.row(align_items="center").classes("w-full"):
-                run_task_control()
+                run_task_control(view)
 
-    screenshot_control()
+    screenshot_control(view)
+    live_view_control(view)
 
 
-def connect_control():
+def connect_control(view: SessionView):
     with ui.tabs() as tabs:
         adb = ui.tab("Adb")
         win32 = ui.tab("Win32")
@@ -49,25 +46,25 @@ def connect_control():
 
     tab_panels = (
         ui.tab_panels(tabs, value="Adb")
-        .bind_value(STORAGE, "controller_type")
+        .bind_value(view.storage, "controller_type")
         .props("no-caps")
     )
     with tab_panels:
         with ui.tab_panel(adb):
             with ui.row(align_items="center").classes("w-full"):
-                adb_control()
+                adb_control(view)
         with ui.tab_panel(win32):
             with ui.row(align_items="center").classes("w-full"):
-                win32_control("win32")
+                win32_control(view, "win32")
         with ui.tab_panel(playcover):
             with ui.row(align_items="center").classes("w-full"):
-                playcover_control()
+                playcover_control(view)
         with ui.tab_panel(gamepad):
             with ui.row(align_items="center").classes("w-full"):
-                win32_control("gamepad")
+                win32_control(view, "gamepad")
         with ui.tab_panel(custom):
             with ui.row(align_items="center").classes("w-full"):
-                custom_control()
+                custom_control(view)
 
     os_type = system.get_os_type()
     if os_type != system.OSTypeEnum.Windows:
@@ -79,16 +76,16 @@ def connect_control():
         tab_panels.set_value("Adb")
 
 
-def adb_control():
+def adb_control(view: SessionView):
     with ui.row(align_items="baseline"):
-        StatusIndicator(GlobalStatus, "ctrl_connecting")
+        StatusIndicator(view.status, "ctrl_connecting")
         adb_path_input = (
             ui.input(
                 "ADB Path",
                 placeholder="eg: C:/adb.exe",
             )
             .props("size=60")
-            .bind_value(STORAGE, "adb_path")
+            .bind_value(view.storage, "adb_path")
         )
         adb_address_input = (
             ui.input(
@@ -97,7 +94,7 @@ def adb_control():
                 validation=ic.ascii_str,
             )
             .props("size=20")
-            .bind_value(STORAGE, "adb_address")
+            .bind_value(view.storage, "adb_address")
         )
 
         adb_config_input = (
@@ -108,7 +105,7 @@ def adb_control():
                 validation=ic.json_style_str,
             )
             .props("size=20")
-            .bind_value(STORAGE, "adb_config")
+            .bind_value(view.storage, "adb_config")
         )
         ui.button(
             "Connect",
@@ -124,22 +121,22 @@ def adb_control():
             label="Devices",
             on_change=lambda e: on_change_device_select(e.value),
         ).bind_visibility_from(
-            GlobalStatus,
+            view.status,
             "ctrl_detecting",
             backward=lambda s: s == Status.SUCCEEDED,
         )
 
-    StatusIndicator(GlobalStatus, "ctrl_detecting").label().bind_visibility_from(
-        GlobalStatus,
+    StatusIndicator(view.status, "ctrl_detecting").label().bind_visibility_from(
+        view.status,
         "ctrl_detecting",
         backward=lambda s: s == Status.RUNNING or s == Status.FAILED,
     )
 
     async def on_click_connect():
-        GlobalStatus.ctrl_connecting = Status.RUNNING
+        view.status.ctrl_connecting = Status.RUNNING
 
         if not adb_path_input.value or not adb_address_input.value:
-            GlobalStatus.ctrl_connecting = Status.FAILED
+            view.status.ctrl_connecting = Status.FAILED
             return
         if not adb_config_input.value:
             adb_config_input.value = "{}"
@@ -149,27 +146,27 @@ def adb_control():
             ui.notify(
                 f"Error parsing extras: {e}", position="bottom-right", type="negative"
             )
-            GlobalStatus.ctrl_connecting = Status.FAILED
+            view.status.ctrl_connecting = Status.FAILED
             return
 
-        connected, error = await maafw.connect_adb(
+        connected, error = await view.maafw.connect_adb(
             Path(adb_path_input.value), adb_address_input.value, config
         )
         if not connected:
-            GlobalStatus.ctrl_connecting = Status.FAILED
+            view.status.ctrl_connecting = Status.FAILED
             ui.notify(error, position="bottom-right", type="negative")
             print(error)
             return
 
-        GlobalStatus.ctrl_connecting = Status.SUCCEEDED
-        GlobalStatus.ctrl_detecting = Status.PENDING
+        view.status.ctrl_connecting = Status.SUCCEEDED
+        view.status.ctrl_detecting = Status.PENDING
 
-        await maafw.screenshotter.refresh(True)
+        await view.maafw.screenshotter.refresh(True)
 
     async def on_click_scan():
-        GlobalStatus.ctrl_detecting = Status.RUNNING
+        view.status.ctrl_detecting = Status.RUNNING
 
-        devices = await maafw.detect_adb()
+        devices = await view.maafw.detect_adb()
         options = {}
         for d in devices:
             v = (d.adb_path, d.address, json.dumps(d.config))
@@ -179,12 +176,12 @@ def adb_control():
         device_select.set_options(options)
 
         if not options:
-            GlobalStatus.ctrl_detecting = Status.FAILED
+            view.status.ctrl_detecting = Status.FAILED
             return
 
         device_select.set_value(next(iter(options)))
         on_change_device_select(device_select.value)
-        GlobalStatus.ctrl_detecting = Status.SUCCEEDED
+        view.status.ctrl_detecting = Status.SUCCEEDED
 
     def on_change_device_select(value: Optional[List[str]]):
         if not value:
@@ -195,7 +192,7 @@ def adb_control():
         adb_config_input.value = value[2]
 
 
-def win32_control(type: Literal["win32", "gamepad"] = "win32"):
+def win32_control(view: SessionView, type: Literal["win32", "gamepad"] = "win32"):
     SCREENCAP_DICT = {
         MaaWin32ScreencapMethodEnum.GDI: "GDI",
         MaaWin32ScreencapMethodEnum.FramePool: "FramePool",
@@ -226,11 +223,11 @@ def win32_control(type: Literal["win32", "gamepad"] = "win32"):
         }
 
     with ui.row(align_items="baseline"):
-        StatusIndicator(GlobalStatus, "ctrl_connecting")
+        StatusIndicator(view.status, "ctrl_connecting")
         hwnd_input = (
             ui.input("HWND", placeholder="0x11451", validation=ic.hwnd)
             .props("size=15")
-            .bind_value(STORAGE, "hwnd")
+            .bind_value(view.storage, "hwnd")
             .on("keydown.enter", lambda: on_click_connect())
         )
         screencap_select = (
@@ -240,7 +237,7 @@ def win32_control(type: Literal["win32", "gamepad"] = "win32"):
                 value=MaaWin32ScreencapMethodEnum.DXGI_DesktopDup,
             )
             .style("min-width: 100px")
-            .bind_value(STORAGE, STORAGE_TARGET_PREFIX + "screencap")
+            .bind_value(view.storage, STORAGE_TARGET_PREFIX + "screencap")
             .on_value_change(lambda: on_connect_params_change())
         )
 
@@ -252,7 +249,7 @@ def win32_control(type: Literal["win32", "gamepad"] = "win32"):
                     value=MaaWin32InputMethodEnum.Seize,
                 )
                 .style("min-width: 100px")
-                .bind_value(STORAGE, "win32_mouse")
+                .bind_value(view.storage, "win32_mouse")
                 .on_value_change(lambda: on_connect_params_change())
             )
             keyboard_select = (
@@ -262,14 +259,14 @@ def win32_control(type: Literal["win32", "gamepad"] = "win32"):
                     value=MaaWin32InputMethodEnum.Seize,
                 )
                 .style("min-width: 100px")
-                .bind_value(STORAGE, "win32_keyboard")
+                .bind_value(view.storage, "win32_keyboard")
                 .on_value_change(lambda: on_connect_params_change())
             )
         else:  # elif type == "gamepad":
             gamepad_type_select = (
                 ui.select(GAMEPAD_TYPE_DICT, label="Gamepad Type")
                 .style("min-width: 100px")
-                .bind_value(STORAGE, "gamepad_keyboard")
+                .bind_value(view.storage, "gamepad_keyboard")
                 .on_value_change(lambda: on_connect_params_change())
             )
 
@@ -279,7 +276,7 @@ def win32_control(type: Literal["win32", "gamepad"] = "win32"):
         )
         window_name_input = (
             ui.input("Window Name", placeholder="Supports regex")
-            .bind_value(STORAGE, "window_name")
+            .bind_value(view.storage, "window_name")
             .on("keydown.enter", lambda: on_click_scan())
         )
         ui.button(
@@ -290,69 +287,69 @@ def win32_control(type: Literal["win32", "gamepad"] = "win32"):
         hwnd_select = ui.select(
             {}, label="Windows", on_change=lambda e: on_change_hwnd_select(e.value)
         ).bind_visibility_from(
-            GlobalStatus,
+            view.status,
             "ctrl_detecting",
             backward=lambda s: s == Status.SUCCEEDED,
         )
 
-    StatusIndicator(GlobalStatus, "ctrl_detecting").label().bind_visibility_from(
-        GlobalStatus,
+    StatusIndicator(view.status, "ctrl_detecting").label().bind_visibility_from(
+        view.status,
         "ctrl_detecting",
         backward=lambda s: s == Status.RUNNING or s == Status.FAILED,
     )
 
     async def on_connect_params_change():
-        if GlobalStatus.ctrl_connecting == Status.SUCCEEDED:
+        if view.status.ctrl_connecting == Status.SUCCEEDED:
             await on_click_connect()
 
     async def on_click_connect():
-        GlobalStatus.ctrl_connecting = Status.RUNNING
+        view.status.ctrl_connecting = Status.RUNNING
 
         if not hwnd_input.value:
-            GlobalStatus.ctrl_connecting = Status.FAILED
+            view.status.ctrl_connecting = Status.FAILED
             return
 
         if type == "win32":
-            connected, error = await maafw.connect_win32(
+            connected, error = await view.maafw.connect_win32(
                 str(hwnd_input.value),
-                int(screencap_select.value),  # type:ignore
-                int(mouse_select.value),  # type:ignore
-                int(keyboard_select.value),  # type:ignore
+                int(screencap_select.value),  # type: ignore
+                int(mouse_select.value),  # type: ignore
+                int(keyboard_select.value),  # type: ignore
             )
 
         elif type == "gamepad":
-            connected, error = await maafw.connect_gamepad(
-                str(hwnd_input.value),  # type:ignore
-                int(gamepad_type_select.value),  # type:ignore
-                int(screencap_select.value),  # type:ignore
+            connected, error = await view.maafw.connect_gamepad(
+                str(hwnd_input.value),  # type: ignore
+                int(gamepad_type_select.value),  # type: ignore
+                int(screencap_select.value),  # type: ignore
             )
 
         if not connected:
-            GlobalStatus.ctrl_connecting = Status.FAILED
+            view.status.ctrl_connecting = Status.FAILED
             ui.notify(error, position="bottom-right", type="negative")
             return
 
-        GlobalStatus.ctrl_connecting = Status.SUCCEEDED
-        GlobalStatus.ctrl_detecting = Status.PENDING
+        view.status.ctrl_connecting = Status.SUCCEEDED
+        view.status.ctrl_detecting = Status.PENDING
 
-        await maafw.screenshotter.refresh(True)
+        await view.maafw.screenshotter.refresh(True)
 
     async def on_click_scan():
-        GlobalStatus.ctrl_detecting = Status.RUNNING
+        view.status.ctrl_detecting = Status.RUNNING
 
-        windows = await maafw.detect_win32hwnd(window_name_input.value)
+        windows = await view.maafw.detect_win32hwnd(window_name_input.value)
         options = {}
         for w in windows:
-            options[hex(w.hwnd)] = hex(w.hwnd) + " " + w.window_name  # type:ignore
+            options[hex(w.hwnd)] = hex(w.hwnd) + " " + w.window_name  # type: ignore
 
         hwnd_select.set_options(options)
         if not options:
-            GlobalStatus.ctrl_detecting = Status.FAILED
+            view.status.ctrl_detecting = Status.FAILED
             return
 
         hwnd_select.set_value(next(iter(options)))
         on_change_hwnd_select(hwnd_select.value)
-        GlobalStatus.ctrl_detecting = Status.SUCCEEDED
+        view.status.ctrl_detecting = Status.SUCCEEDED
 
     def on_change_hwnd_select(value: Optional[str]):
         if not value:
@@ -361,21 +358,21 @@ def win32_control(type: Literal["win32", "gamepad"] = "win32"):
         hwnd_input.value = value
 
 
-def playcover_control():
-    StatusIndicator(GlobalStatus, "ctrl_connecting")
+def playcover_control(view: SessionView):
+    StatusIndicator(view.status, "ctrl_connecting")
 
     with ui.row(align_items="baseline"):
         address_input = (
             ui.input(label="Address")
             .tooltip("PlayTools service endpoint (host:port)")
             .props("size=30")
-            .bind_value(STORAGE, "playcover_address")
+            .bind_value(view.storage, "playcover_address")
         )
         uuid_input = (
             ui.input(label="UUID")
             .tooltip("Target app bundle identifier")
             .props("size=30")
-            .bind_value(STORAGE, "playcover_uuid")
+            .bind_value(view.storage, "playcover_uuid")
         )
         ui.button(
             "Connect",
@@ -383,12 +380,12 @@ def playcover_control():
         )
 
     async def on_click_connect():
-        GlobalStatus.ctrl_connecting = Status.RUNNING
-        connected, err = await maafw.connect_playcover(
+        view.status.ctrl_connecting = Status.RUNNING
+        connected, err = await view.maafw.connect_playcover(
             address_input.value, uuid_input.value
         )
         if not connected:
-            GlobalStatus.ctrl_connecting = Status.FAILED
+            view.status.ctrl_connecting = Status.FAILED
             ui.notify(
                 f"Failed to connect PlayCover controller. {err}",
                 position="bottom-right",
@@ -396,14 +393,14 @@ def playcover_control():
             )
             return
 
-        GlobalStatus.ctrl_connecting = Status.SUCCEEDED
-        GlobalStatus.ctrl_detecting = Status.PENDING
+        view.status.ctrl_connecting = Status.SUCCEEDED
+        view.status.ctrl_detecting = Status.PENDING
 
-        await maafw.screenshotter.refresh(True)
+        await view.maafw.screenshotter.refresh(True)
 
 
-def custom_control():
-    StatusIndicator(GlobalStatus, "ctrl_connecting")
+def custom_control(view: SessionView):
+    StatusIndicator(view.status, "ctrl_connecting")
     with ui.row(align_items="baseline"):
         img_path_input = (
             ui.input(
@@ -411,13 +408,13 @@ def custom_control():
                 validation=ic.is_file,
             )
             .props("size=80")
-            .bind_value(STORAGE, "custom_controller_img_path")
+            .bind_value(view.storage, "custom_controller_img_path")
         )
         ui.button("Load").on_click(lambda: on_load_img())
 
     async def on_load_img():
         if not img_path_input.value:
-            GlobalStatus.ctrl_connecting = Status.FAILED
+            view.status.ctrl_connecting = Status.FAILED
             ui.notify(
                 "Image path cannot be empty.",
                 position="bottom-right",
@@ -427,7 +424,7 @@ def custom_control():
 
         _path = Path(img_path_input.value)
         if not _path.is_file():
-            GlobalStatus.ctrl_connecting = Status.FAILED
+            view.status.ctrl_connecting = Status.FAILED
             ui.notify(
                 "Please enter a valid image file path.",
                 position="bottom-right",
@@ -435,47 +432,62 @@ def custom_control():
             )
             return
 
-        GlobalStatus.ctrl_connecting = Status.RUNNING
+        view.status.ctrl_connecting = Status.RUNNING
         try:
-            maafw.connect_custom_controller(_path)
+            view.maafw.connect_custom_controller(_path)
         except Exception as e:
-            GlobalStatus.ctrl_connecting = Status.FAILED
+            view.status.ctrl_connecting = Status.FAILED
             raise e
 
-        GlobalStatus.ctrl_connecting = Status.SUCCEEDED
-        await maafw.screenshotter.refresh(True)
+        view.status.ctrl_connecting = Status.SUCCEEDED
+        await view.maafw.screenshotter.refresh(True)
 
 
-def screenshot_control():
+def screenshot_control(view: SessionView):
+    screenshotter = view.maafw.screenshotter
+
+    # 放大查看时才加载原图
+    with ui.dialog().props("full-width") as zoom_dialog, ui.card():
+        zoom_img = ui.interactive_image(
+            cross="green",
+            on_mouse=lambda e: on_click_image(int(e.image_x), int(e.image_y)),
+        ).classes("w-full")
+
     with (
         ui.row()
         .style("align-items: flex-end;")
         .bind_visibility_from(
-            maafw.screenshotter, "source", backward=lambda x: x is not None
+            view.maafw.screenshotter, "source", backward=lambda x: x is not None
         )
     ):
         with ui.card().tight():
             img = (
                 ui.interactive_image(
                     cross="green",
-                    on_mouse=lambda e: on_click_image(int(e.image_x), int(e.image_y)),
+                    # 预览图上的坐标换算为原图坐标
+                    on_mouse=lambda e: on_click_image(
+                        *screenshotter.to_frame_coords(e.image_x, e.image_y)
+                    ),
                 )
-                .bind_source_from(maafw.screenshotter, "source")
+                .bind_source_from(view.maafw.screenshotter, "source")
                 .style("height: 200px;")
             )
 
         ui.button(
             icon="refresh", on_click=lambda: on_click_refresh()
         ).bind_enabled_from(
-            GlobalStatus, "task_running", backward=lambda s: s != Status.RUNNING
+            view.status, "task_running", backward=lambda s: s != Status.RUNNING
+        )
+        ui.button(icon="zoom_in", on_click=lambda: on_click_zoom()).bind_enabled_from(
+            img, "source", lambda x: x is not None
         )
         ui.button(
             icon="download",
-            on_click=lambda: on_download_image(img.source),  # type:ignore
+            on_click=lambda: on_download_image(),
         ).bind_enabled_from(img, "source", lambda x: x is not None)
 
     async def on_click_image(x, y):
-        if await maafw.click(x, y):
+        if await view.maafw.click(x, y):
             print(f"on_click_image: {x}, {y}")
             await asyncio.sleep(1)
             await on_click_refresh()
@@ -483,23 +495,89 @@ def screenshot_control():
             print(f"Failed to click at {x}, {y}")
 
     async def on_click_refresh():
-        await maafw.screenshotter.refresh(True)
+        await screenshotter.refresh(True)
+        if zoom_dialog.value:
+            load_full_image()
 
-    def on_download_image(img: Union[Image, Any]):
-        if not img or type(img) != Image:
+    def load_full_image():
+        zoom_img.set_source(view.url("/screenshot", frame=str(screenshotter.frame_id)))
+
+    def on_click_zoom():
+        load_full_image()
+        zoom_dialog.open()
+
+    def on_download_image():
+        if screenshotter.frame is None:
             return
 
-        # Image to Bytes
-        bytes_io = io.BytesIO()
-        img.save(bytes_io, format="PNG")
-        img_bytes = bytes_io.getvalue()
+        # 原图在下载时由 /screenshot 编码，文件名为 PNG 内容的哈希
+        ui.download(view.url("/screenshot", download="true"))
+
 
-        # Use hash of Bytes as filename
-        ui.download(img_bytes, f"{hash(img_bytes)}.png")
+def live_view_control(view: SessionView):
+    live_view = view.maafw.live_view
 
+    with ui.row(align_items="center"):
+        live_switch = ui.switch(
+            "Live View", on_change=lambda e: on_change_live(e.value)
+        ).bind_enabled_from(
+            view.status, "ctrl_connecting", backward=lambda s: s == Status.SUCCEEDED
+        )
+        ui.switch("Pause").bind_value(live_view, "paused").bind_visibility_from(
+            live_switch, "value"
+        )
+        ui.number("FPS", min=1, max=60, precision=0).bind_value(
+            live_view, "fps", forward=lambda x: float(x or 1)
+        ).bind_visibility_from(live_switch, "value").style("width: 80px;")
+        stats_label = (
+            ui.label().classes("text-sm").bind_visibility_from(live_switch, "value")
+        )
 
-def load_resource_control():
-    StatusIndicator(GlobalStatus, "res_loading")
+    with ui.card().tight().bind_visibility_from(live_switch, "value"):
+        # 画面通过 /live/ws 以二进制帧推送，不经过 NiceGUI 的 websocket
+        live_img = (
+            ui.element("img")
+            .style("height: 360px; cursor: crosshair;")
+            .on(
+                "click",
+                lambda e: on_click_live(
+                    *live_view.to_frame_coords(e.args[0], e.args[1])
+                ),
+                # 换算为画面的像素坐标
+                js_handler="""(e) => emit(
+                    e.offsetX * e.target.naturalWidth / e.target.clientWidth,
+                    e.offsetY * e.target.naturalHeight / e.target.clientHeight,
+                )""",
+            )
+        )
+
+    def on_change_live(value: bool):
+        # 最后一个观看者断开后截图线程退出
+        if value:
+            ui.run_javascript(js.live_view_start(live_img.id, view.url("/live/ws")))
+        else:
+            ui.run_javascript(js.live_view_stop(live_img.id))
+
+    async def on_click_live(x, y):
+        if not await view.maafw.click(x, y):
+            print(f"Failed to click at {x}, {y}")
+
+    def update_stats():
+        if not live_switch.value:
+            return
+        stats = live_view.stats()
+        latency = stats["latency_ns"]
+        state = " (paused)" if stats["suspended"] else ""
+        stats_label.set_text(
+            f"{stats['fps']:.1f} FPS{state}, capture mean {latency['mean'] / 1e6:.1f}ms, "
+            f"p99 {latency['p99'] / 1e6:.1f}ms, {stats['dropped']} frames dropped"
+        )
+
+    ui.timer(1, update_stats)
+
+
+def load_resource_control(view: SessionView):
+    StatusIndicator(view.status, "res_loading")
 
     with ui.row(align_items="baseline").classes("w-3/4"):
         dir_input = (
@@ -510,86 +588,86 @@ def load_resource_control():
             )
             .props("input-class=h-7")
             .style("width: 500px;")
-            .bind_value(STORAGE, "resource_dir")
+            .bind_value(view.storage, "resource_dir")
             .tooltip("Directorise are separated by newline characters.")
         )
 
         ui.button(
             "Load",
-            on_click=lambda: on_click_resource_load(dir_input.value),
+            on_click=lambda: on_click_resource_load(view, dir_input.value),
         )
 
 
-def agent_control():
-    StatusIndicator(GlobalStatus, "agent_connecting")
+def agent_control(view: SessionView):
+    StatusIndicator(view.status, "agent_connecting")
 
     ui.input(
         "Agent Identifier",
     ).props(
         "size=40"
-    ).bind_value(STORAGE, "agent_identifier")
+    ).bind_value(view.storage, "agent_identifier")
 
     ui.button(
         "Connect",
-        on_click=lambda: on_click_agent(),
-    ).bind_enabled_from(GlobalStatus, "agent_connecting", lambda x: x != Status.RUNNING)
+        on_click=lambda: on_click_agent(view),
+    ).bind_enabled_from(view.status, "agent_connecting", lambda x: x != Status.RUNNING)
 
-    ui.button("Disconnect").on_click(maafw.disconnect_agent)
+    ui.button("Disconnect").on_click(view.maafw.disconnect_agent)
 
 
-async def on_click_agent() -> bool:
-    GlobalStatus.agent_connecting = Status.RUNNING
+async def on_click_agent(view: SessionView) -> bool:
+    view.status.agent_connecting = Status.RUNNING
 
-    created, error = await maafw.create_agent(STORAGE.get("agent_identifier"))
+    created, error = await view.maafw.create_agent(view.storage.get("agent_identifier"))
     if not created:
-        GlobalStatus.agent_connecting = Status.FAILED
+        view.status.agent_connecting = Status.FAILED
         ui.notify(error, position="bottom-right", type="negative")
         print(error)
         return False
 
-    STORAGE["agent_identifier"] = maafw.agent_identifier
-    connected, error = await maafw.connect_agent()
+    view.storage["agent_identifier"] = view.maafw.agent_identifier
+    connected, error = await view.maafw.connect_agent()
     if not connected:
-        GlobalStatus.agent_connecting = Status.FAILED
+        view.status.agent_connecting = Status.FAILED
         ui.notify(error, position="bottom-right", type="negative")
         print(error)
         return False
 
-    GlobalStatus.agent_connecting = Status.SUCCEEDED
+    view.status.agent_connecting = Status.SUCCEEDED
     return True
 
 
-async def on_click_resource_load(values: Optional[str]) -> bool:
-    GlobalStatus.res_loading = Status.RUNNING
+async def on_click_resource_load(view: SessionView, values: Optional[str]) -> bool:
+    view.status.res_loading = Status.RUNNING
 
     if not values:
-        GlobalStatus.res_loading = Status.FAILED
+        view.status.res_loading = Status.FAILED
         return False
 
     paths = [Path(p) for p in values.split("\n") if p]
-    loaded, error = await maafw.load_resource(paths)
+    loaded, error = await view.maafw.load_resource(paths)
 
     if not loaded:
-        NodeListElement.value = []
-        GlobalStatus.res_loading = Status.FAILED
+        view.node_list.value = []
+        view.status.res_loading = Status.FAILED
         ui.notify(error, position="bottom-right", type="negative")
         print(error)
         return False
     else:
-        GlobalStatus.res_loading = Status.SUCCEEDED
-        node_list = sorted(await maafw.get_node_list())
-        NodeListElement.value = node_list
+        view.status.res_loading = Status.SUCCEEDED
+        node_list = sorted(await view.maafw.get_node_list())
+        view.node_list.value = node_list
         return True
 
 
-def run_task_control():
-    StatusIndicator(GlobalStatus, "task_running")
+def run_task_control(view: SessionView):
+    StatusIndicator(view.status, "task_running")
 
     with ui.row(align_items="baseline"):
         entry_select = (
             ui.select([], label="Task Entry", with_input=True)
             .props("size=30")
-            .bind_value(STORAGE, "task_entry")
+            .bind_value(view.storage, "task_entry")
         )
         ui.timer(
             0.1,
@@ -605,25 +683,25 @@ def run_task_control():
                 validation=ic.json_style_str,
             )
             .props("size=60")
-            .bind_value(STORAGE, "task_pipeline_override")
+            .bind_value(view.storage, "task_pipeline_override")
         )
 
         ui.button("Start", on_click=lambda: on_click_start()).bind_enabled_from(
-            GlobalStatus, "task_running", backward=lambda s: s != Status.RUNNING
+            view.status, "task_running", backward=lambda s: s != Status.RUNNING
         )
         ui.button("Stop", on_click=lambda: on_click_stop())
 
-        NodeListElement.on_value_change(
+        view.node_list.on_value_change(
             lambda: entry_select.set_options(
-                NodeListElement.value, value=get_entry_node()
+                view.node_list.value, value=get_entry_node(view)
             )
         )
 
     async def on_click_start():
-        GlobalStatus.task_running = Status.RUNNING
+        view.status.task_running = Status.RUNNING
 
         if not entry_select.value:
-            GlobalStatus.task_running = Status.FAILED
+            view.status.task_running = Status.FAILED
             return
         if not pipeline_override_input.value:
             pipeline_override_input.value = "{}"
@@ -635,47 +713,49 @@ def run_task_control():
                 position="bottom-right",
                 type="negative",
             )
-            GlobalStatus.task_running = Status.FAILED
+            view.status.task_running = Status.FAILED
             return
 
         # 重新加载资源
-        res_status = await on_click_resource_load(STORAGE.get("resource_dir"))
-        # agent_status = await on_click_agent() if maafw.agent_connected else True
+        res_status = await on_click_resource_load(
+            view, view.storage.get("resource_dir")
+        )
+        # agent_status = await on_click_agent(view) if view.maafw.agent_connected else True
 
         if not res_status:
-            GlobalStatus.task_running = Status.FAILED
+            view.status.task_running = Status.FAILED
             return
 
-        _, error = await maafw.run_task(entry_select.value, pipeline_override)
+        _, error = await view.maafw.run_task(entry_select.value, pipeline_override)
         if error:
-            GlobalStatus.task_running = Status.FAILED
+            view.status.task_running = Status.FAILED
             print(error)
             if error is not None:
                 ui.notify(error, position="bottom-right", type="negative")
             return
 
-        GlobalStatus.task_running = Status.SUCCEEDED
+        view.status.task_running = Status.SUCCEEDED
 
     async def on_click_stop():
-        stopped = await maafw.stop_task()
+        stopped = await view.maafw.stop_task()
         if not stopped:
-            GlobalStatus.task_running = Status.FAILED
+            view.status.task_running = Status.FAILED
             return
 
-        GlobalStatus.task_running = Status.PENDING
-        await maafw.screenshotter.refresh(True)
+        view.status.task_running = Status.PENDING
+        await view.maafw.screenshotter.refresh(True)
 
 
-def get_entry_node() -> Optional[str]:
+def get_entry_node(view: SessionView) -> Optional[str]:
     """
     Get a entry node value. (Current Node -> List[0] -> None)
     """
-    node_list: List[str] = NodeListElement.value
+    node_list: List[str] = view.node_list.value
 
     if not node_list:
         return None
 
-    entry = STORAGE.get("task_entry", None)
+    entry = view.storage.get("task_entry", None)
     if entry is None or entry not in node_list:
         return node_list[0] or None
     else:
@@ -1,32 +1,69 @@
 import os
+import atexit
 from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Optional, Any, Dict, List
-from queue import Queue
 from threading import Lock
 
-from nicegui import app, ui, background_tasks
+from nicegui import app, background_tasks, ui
 from maa.resource import Resource, NotificationType
 
 from ...maafw import (
     maafw,
     MyResourceEventSink,
-    LaunchGraphContextEventSink,
-    LaunchGraphTaskerEventSink,
-    LaunchGraphManager,
-    LaunchGraph,
+    OverflowPolicy,
+    EventKind,
+    EventStream,
+    SessionRecorder,
+    SessionReplayer,
 )
+from ...maafw.registry import sessions
+from ...maafw.trace_export import TraceFormat
 from ...webpage.components.status_indicator import Status, StatusIndicator
-from ...webpage.reco_page import RecoData
-from .global_status import GlobalStatus
 from ...utils.arg_parser import ArgParser
+from .session_view import SessionView
 
 debug_mode: bool = ArgParser.get_debug()
-# 全局状态机管理器实例
-launch_graph_manager = LaunchGraphManager()
+# 默认会话的状态机管理器，录制与回放只作用于默认会话
+launch_graph_manager = sessions.default.manager
+
+# 会话录制：事件流、截图与获取过的识别详情
+record_path = ArgParser.get_record()
+session_recorder = SessionRecorder(record_path) if record_path else None
+if session_recorder is not None:
+    launch_graph_manager.subscribe_batch(session_recorder.record_events)
+    maafw.recorder = session_recorder
+    maafw.screenshotter.recorder = session_recorder
+
+    def _close_session_recorder():
+        launch_graph_manager.wait_idle(timeout=5)
+        session_recorder.close()
+
+    atexit.register(_close_session_recorder)
+
+# 会话回放：事件推送到状态机，截图与识别详情来自会话文件
+replay_path = ArgParser.get_replay()
+session_replayer = (
+    SessionReplayer(
+        replay_path,
+        launch_graph_manager,
+        speed=ArgParser.get_replay_speed(),
+        on_screenshot=maafw.screenshotter.show,
+    )
+    if replay_path
+    else None
+)
+maafw.replayer = session_replayer
 
 
-STORAGE = app.storage.general
+# 状态机通知 UI 的最大频率，期间的消息合并为一批
+UI_NOTIFY_HZ = 30
+# RecognitionRow 处理的消息类型，其余消息不会发送到事件循环
+UI_EVENT_KINDS = (
+    EventKind.NEXT_LIST,
+    EventKind.RECOGNITION_NODE,
+    EventKind.RECOGNITION,
+)
 
 PAGINATION_DOCS_URL = "https://github.com/MaaXYZ/MaaDebugger/discussions/120"
 # Set None to disable pagination or warning
@@ -74,20 +111,25 @@ class ListData:
     anchor_targets: List[str] = field(default_factory=list)
 
 
-def main():
-    reco_data = RecognitionRow()
+def main(view: SessionView) -> "RecognitionRow":
+    reco_data = RecognitionRow(view)
     reco_data.init_elements()
+    return reco_data
 
 
 class RecognitionRow:
-    def __init__(self) -> None:
+    # 各会话的识别行，按会话名称索引，由 /metrics 读取待处理消息数
+    instances: Dict[str, "RecognitionRow"] = {}
+
+    def __init__(self, view: SessionView) -> None:
+        self.view = view
+        self._stream: Optional[EventStream] = None
+        # 已从事件流取出、尚未处理完的消息数
+        self._pending_messages = 0
         self.row_len = 0
         self.data = defaultdict(dict)
         self.list_data_map: dict[int, ListData] = {}
-        self._pending_messages: Queue = Queue()
         self._lock = Lock()
-        # 标志位：确保任意时刻只有一个消息处理任务在运行
-        self._processing_messages: bool = False
         # 追踪当前正在处理的识别项栈（用于嵌套）
         # 栈顶是当前正在执行的识别项
         self._recognition_stack: List[ItemData] = []
@@ -99,25 +141,41 @@ class RecognitionRow:
         self._current_reco_index: int = 0
 
         self.register_sink()
+        RecognitionRow.instances[view.name] = self
+
+    @property
+    def pending_messages(self) -> int:
+        """事件流中排队的消息与当前批次中尚未处理的消息"""
+        queued = self._stream.pending_messages if self._stream is not None else 0
+        return queued + self._pending_messages
 
     def register_sink(self):
         """Register the custom notification handler to maafw."""
-        # 使用状态机驱动的 EventSink
-        context_event_sink = LaunchGraphContextEventSink(
-            graph_manager=launch_graph_manager
+        # 状态机驱动的 ContextEventSink 与 TaskerEventSink 已在创建会话时注册
+        self.view.maafw.resource_event_sink = MyResourceEventSink(
+            self.on_resource_loading
         )
-        resource_event_sink = MyResourceEventSink(self.on_resource_loading)
-        # 注册 TaskerEventSink 以捕获 Task 级别事件
-        tasker_event_sink = LaunchGraphTaskerEventSink(
-            graph_manager=launch_graph_manager
-        )
-
-        maafw.context_event_sink = context_event_sink
-        maafw.resource_event_sink = resource_event_sink
-        maafw.tasker_event_sink = tasker_event_sink
 
-        # 订阅状态机变化（增量处理方式）
-        launch_graph_manager.subscribe(self.on_graph_change)
+        # 订阅状态机变化（增量处理方式），在事件循环启动后开始消费
+        if not app.is_stopped:
+            # 运行期间新建的会话
+            background_tasks.create(self._consume_graph_events())
+            return
+        app.on_startup(self._consume_graph_events)
+        if session_replayer is not None and self.view.session.is_default:
+            app.on_startup(self._start_replay)
+
+    def close(self):
+        """结束事件订阅，会话被移除时调用"""
+        if self._stream is not None:
+            self._stream.close()
+        if RecognitionRow.instances.get(self.view.name) is self:
+            del RecognitionRow.instances[self.view.name]
+
+    async def _start_replay(self):
+        """启动任务按注册顺序执行，此时 _consume_graph_events 已经订阅"""
+        if session_replayer is not None:
+            session_replayer.start()
 
     def init_elements(self):
         """Initialize the UI elements."""
@@ -128,17 +186,35 @@ class RecognitionRow:
             ui.button(
                 "Clear Items and Cache", icon="delete_forever", on_click=self.clear
             ).props("no-caps").bind_enabled_from(
-                GlobalStatus, "task_running", lambda x: x != Status.RUNNING
+                self.view.status, "task_running", lambda x: x != Status.RUNNING
             )
+            ui.button(
+                "Hot Nodes",
+                icon="local_fire_department",
+                on_click=lambda: ui.navigate.to(
+                    self.view.url("/hot_nodes"), new_tab=True
+                ),
+            ).props("no-caps")
+            with ui.dropdown_button(
+                "Export Trace", icon="timeline", auto_close=True
+            ).props("no-caps"):
+                ui.item(
+                    "Chrome Trace (Perfetto)",
+                    on_click=lambda: self.on_click_export(TraceFormat.CHROME),
+                )
+                ui.item(
+                    "Collapsed Stacks (Flame Graph)",
+                    on_click=lambda: self.on_click_export(TraceFormat.COLLAPSED),
+                )
             self.reverse_switch = (
                 ui.switch(
                     "Reverse",
-                    value=STORAGE.get("items-reverse", True),
+                    value=self.view.storage.get("items-reverse", True),
                     on_change=lambda x: self.on_reverse_switch_change(x.value),
                 )
                 .tooltip("Switch this will clear all items and cache.")
                 .bind_enabled_from(
-                    GlobalStatus, "task_running", lambda x: x != Status.RUNNING
+                    self.view.status, "task_running", lambda x: x != Status.RUNNING
                 )
             )
 
@@ -151,7 +227,7 @@ class RecognitionRow:
             lambda: self.on_page_change(self.pagination.value)
         )
         self.pagination.bind_enabled_from(
-            GlobalStatus,
+            self.view.status,
             "task_running",
             lambda x: x == Status.FAILED or x == Status.SUCCEEDED,
         )
@@ -159,21 +235,24 @@ class RecognitionRow:
         if PER_PAGE_ITEM_NUM is None:
             self.pagination.set_visibility(False)
 
+    def on_click_export(self, format: TraceFormat):
+        ui.download(self.view.url("/export/trace", format=format.value))
+
     async def on_reverse_switch_change(self, value: bool):
         await self.clear()
-        STORAGE["items-reverse"] = value
+        self.view.storage["items-reverse"] = value
 
     async def clear(self):
-        await maafw.clear_cache()
+        await self.view.maafw.clear_cache()
         self.clear_items()
 
     def clear_items(self):
         self.row_len = 0
-        RecoData.data.clear()
+        self.view.reco_data.clear()
         self.data.clear()
         self.list_data_map.clear()
         # 重置状态机
-        launch_graph_manager.reset()
+        self.view.manager.reset()
         # 重置追踪状态
         self._recognition_stack.clear()
         self._reco_node_depth = 0
@@ -295,41 +374,33 @@ class RecognitionRow:
             print(
                 f"on_click_item ({data.col}, {data.row}): {data.name} ({data.reco_id})"
             )
-        ui.navigate.to(f"reco/{data.reco_id}", new_tab=True)
+        ui.navigate.to(self.view.url(f"reco/{data.reco_id}"), new_tab=True)
 
-    def on_graph_change(self, graph: LaunchGraph, msg: Dict[str, Any]):
+    async def _consume_graph_events(self):
         """
-        状态机变化时的回调（增量处理）
-        将消息放入队列，由 NiceGUI 主线程处理
-        """
-        msg_type = msg.get("msg", "")
-        if debug_mode:
-            print(f"[DEBUG on_graph_change] msg_type={msg_type}, msg={msg}")
-
-        # 将消息放入队列
-        self._pending_messages.put(msg)
-
-        # 使用 background_tasks 在主线程中处理消息
-        # 只有当没有正在运行的处理任务时才创建新任务
-        if not self._processing_messages:
-            background_tasks.create(self._process_pending_messages())
+        在事件循环中按顺序处理状态机的消息
 
-    async def _process_pending_messages(self):
-        """在主线程中处理待处理的消息"""
-        # 如果已经有任务在处理，直接返回
-        if self._processing_messages:
-            return
-
-        self._processing_messages = True
-        try:
-            while not self._pending_messages.empty():
-                try:
-                    msg = self._pending_messages.get_nowait()
-                    await self._handle_message(msg)
-                except Exception as e:
-                    print(f"[ERROR] Failed to process message: {e}")
-        finally:
-            self._processing_messages = False
+        消息以不超过 UI_NOTIFY_HZ 的频率成批到达，队列满时合并到最后一批，不会丢失消息。
+        只订阅 _handle_message 处理的消息类型。
+        """
+        async with self.view.manager.events(
+            overflow=OverflowPolicy.COALESCE,
+            max_hz=UI_NOTIFY_HZ,
+            kinds=UI_EVENT_KINDS,
+        ) as stream:
+            self._stream = stream
+            async for event in stream:
+                self._pending_messages = len(event.msgs)
+                for msg in event.msgs:
+                    if debug_mode:
+                        print(
+                            f"[DEBUG on_graph_change] msg_type={msg.get('msg', '')}, msg={msg}"
+                        )
+                    try:
+                        await self._handle_message(msg)
+                    except Exception as e:
+                        print(f"[ERROR] Failed to process message: {e}")
+                    self._pending_messages -= 1
 
     async def _handle_message(self, msg: Dict[str, Any]):
         """处理单个消息"""
@@ -345,7 +416,7 @@ class RecognitionRow:
                     f"[DEBUG] NextList.Starting: name={name}, next_list={next_names}, anchor_flags={anchor_flags}"
                 )
             self._on_next_list_starting(name, next_names, anchor_flags)
-            await maafw.screenshotter.refresh(False)
+            self.view.maafw.screenshotter.request_refresh()
 
         # RecognitionNode.Starting - 标记进入嵌套识别模式
         elif msg_type == "RecognitionNode.Starting":
@@ -356,7 +427,7 @@ class RecognitionRow:
                     f"[DEBUG] RecognitionNode.Starting: name={name}, node_id={node_id}"
                 )
             self._on_reco_node_starting(name, node_id)
-            await maafw.screenshotter.refresh(False)
+            self.view.maafw.screenshotter.request_refresh()
 
         # RecognitionNode.Succeeded/Failed - 退出嵌套识别模式
         elif msg_type in ("RecognitionNode.Succeeded", "RecognitionNode.Failed"):
@@ -384,7 +455,7 @@ class RecognitionRow:
             if debug_mode:
                 print(f"[DEBUG] Recognition: name={name}, reco_id={reco_id}, hit={hit}")
             self._on_recognized(reco_id, name, hit)
-            await maafw.screenshotter.refresh(False)
+            self.view.maafw.screenshotter.request_refresh()
 
     def _on_recognition_starting(self, name: str, reco_id: int):
         """
@@ -467,7 +538,7 @@ class RecognitionRow:
                 f"[DEBUG] _on_recognized: reco_id={reco_id} not found in _reco_id_map, name={name}"
             )
 
-        RecoData.data[reco_id] = name, hit, maafw.get_node_data(name)
+        self.view.reco_data[reco_id] = name, hit, self.view.maafw.get_node_data(name)
 
     def _on_reco_node_starting(self, name: str, node_id: int):
         """
@@ -511,7 +582,7 @@ class RecognitionRow:
         anchor_names: List[str] = []
         anchor_targets: List[str] = []
         if any(normalized_anchor_flags):
-            node_data = maafw.get_node_data(current)
+            node_data = self.view.maafw.get_node_data(current)
             if isinstance(node_data, dict):
                 node_next = node_data.get("next", [])
                 anchor_map = node_data.get("anchor", {})
@@ -0,0 +1,51 @@
+from typing import Dict, Tuple
+from urllib.parse import urlencode
+
+from nicegui import app
+from nicegui.elements.mixins.value_element import ValueElement
+
+from ...maafw import MaaFW, LaunchGraphManager
+from ...maafw.registry import DebugSession
+from ...webpage.reco_page import RecoData
+from .global_status import GlobalStatus, SessionStatus
+
+STORAGE = app.storage.general
+
+
+class SessionView:
+    """
+    首页上一个调试会话的界面上下文
+
+    默认会话沿用原有的全局状态与存储键，其他会话的输入保存在 STORAGE["sessions"][name] 中。
+    """
+
+    # 资源加载后的节点列表，由 master_control 创建
+    node_list: ValueElement
+
+    def __init__(self, session: DebugSession) -> None:
+        self.session = session
+        self.status = GlobalStatus if session.is_default else SessionStatus()
+        self.storage: Dict = (
+            STORAGE
+            if session.is_default
+            else STORAGE.setdefault("sessions", {}).setdefault(session.name, {})
+        )
+        self.reco_data: Dict[int, Tuple[str, bool, dict]] = RecoData.of(session.name)
+
+    @property
+    def name(self) -> str:
+        return self.session.name
+
+    @property
+    def maafw(self) -> MaaFW:
+        return self.session.maafw
+
+    @property
+    def manager(self) -> LaunchGraphManager:
+        return self.session.manager
+
+    def url(self, path: str, **params: str) -> str:
+        """页面地址，默认会话不带 session 参数"""
+        if not self.session.is_default:
+            params["session"] = self.name
+        return f"{path}?{urlencode(params)}" if params else path
@@ -0,0 +1,93 @@
+from fastapi.responses import PlainTextResponse
+from nicegui import Client, app
+
+from ...maafw.metrics import CONTENT_TYPE, MetricsWriter
+from ...maafw.registry import sessions
+from ...utils.system import get_process_rss
+from ..index_page.runtime_control import RecognitionRow
+from ..reco_page import RecoData
+
+SINKS = {
+    "context": "context_event_sink",
+    "tasker": "tasker_event_sink",
+    "resource": "resource_event_sink",
+}
+
+
+def render_metrics() -> str:
+    """
+    汇总各会话的计数器与直方图
+
+    这里只读取常驻的计数，不遍历执行图，在事件循环中执行以获得一致的界面状态。
+    """
+    targets = list(sessions)
+    writer = MetricsWriter()
+
+    writer.counter(
+        "sink_events_total",
+        "Events received from MaaFramework per sink.",
+        (
+            ({"session": s.name, "sink": sink}, getattr(s.maafw, attr).received)
+            for s in targets
+            for sink, attr in SINKS.items()
+            if hasattr(getattr(s.maafw, attr), "received")
+        ),
+    )
+
+    queues = [(s.name, s.manager.queue_stats()) for s in targets]
+    writer.gauge(
+        "event_queue_depth",
+        "Events waiting for the reducer thread.",
+        (({"session": name}, stats["depth"]) for name, stats in queues if stats),
+    )
+    latency = [(s.name, s.manager.latency_stats()) for s in targets]
+    writer.histogram(
+        "reducer_batch_seconds",
+        "Time the reducer thread spends on one batch of events.",
+        (({"session": name}, stats["reduce"]) for name, stats in latency),
+    )
+    writer.histogram(
+        "subscriber_callback_seconds",
+        "Time spent in one subscriber callback.",
+        (({"session": name}, stats["callback"]) for name, stats in latency),
+    )
+    writer.histogram(
+        "screencap_seconds",
+        "Time to capture one screenshot from the controller.",
+        (({"session": s.name}, s.maafw.screencap_stats) for s in targets),
+    )
+
+    writer.gauge(
+        "ui_pending_messages",
+        "Messages waiting to be rendered in the recognition row.",
+        (
+            ({"session": name}, row.pending_messages)
+            for name, row in list(RecognitionRow.instances.items())
+        ),
+    )
+    writer.gauge(
+        "reco_data_entries",
+        "Recognition results kept for the reco page.",
+        [({"session": s.name}, len(RecoData.of(s.name))) for s in targets],
+    )
+    writer.gauge(
+        "ui_elements",
+        "NiceGUI elements across all clients.",
+        [({}, sum(len(c.elements) for c in list(Client.instances.values())))],
+    )
+    writer.gauge(
+        "ui_clients", "Connected NiceGUI clients.", [({}, len(Client.instances))]
+    )
+
+    rss = get_process_rss()
+    if rss is not None:
+        writer.gauge(
+            "process_resident_memory_bytes", "Resident memory size.", [({}, rss)]
+        )
+    return writer.render()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 文本格式的指标"""
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
@@ -0,0 +1,133 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from nicegui import app, ui
+
+from ...maafw import LaunchGraphManager, ScopeType
+from ...maafw.registry import sessions
+from ...maafw.trace_export import (
+    TRACE_FILE_TYPES,
+    TraceFormat,
+    iter_trace,
+    spans_from_graph,
+)
+
+COLUMNS = [
+    {"name": "name", "label": "Node", "field": "name", "align": "left"},
+    {"name": "type", "label": "Type", "field": "type", "align": "left"},
+    {"name": "count", "label": "Count", "field": "count", "sortable": True},
+    {"name": "total", "label": "Total (ms)", "field": "total", "sortable": True},
+    {"name": "mean", "label": "Mean (ms)", "field": "mean", "sortable": True},
+    {"name": "min", "label": "Min (ms)", "field": "min", "sortable": True},
+    {"name": "max", "label": "Max (ms)", "field": "max", "sortable": True},
+    {"name": "p50", "label": "p50 (ms)", "field": "p50", "sortable": True},
+    {"name": "p90", "label": "p90 (ms)", "field": "p90", "sortable": True},
+    {"name": "p99", "label": "p99 (ms)", "field": "p99", "sortable": True},
+]
+
+TYPE_OPTIONS = {"all": "All", **{t.value: t.value for t in ScopeType}}
+
+
+def _ms(ns: float) -> float:
+    return round(ns / 1e6, 3)
+
+
+def _us(ns: float) -> str:
+    return f"{ns / 1e3:.1f}µs"
+
+
+def get_queue_summary(manager: LaunchGraphManager) -> str:
+    """reducer 线程的队列深度与回调阻塞时间"""
+    stats = manager.queue_stats()
+    if stats is None:
+        return "Reducer thread is not running."
+    push, reduce = stats["push_ns"], stats["reduce_ns"]
+    return (
+        f"Event queue: depth {stats['depth']} (max {stats['max_depth']} / {stats['capacity']}), "
+        f"{stats['pushed']} events, {stats['full_waits']} full waits. "
+        f"Callback blocked: mean {_us(push['mean'])}, p99 {_us(push['p99'])}, max {_us(push['max'])}. "
+        f"Reducer: {stats['batches']} batches, mean size {stats['batch_size']['mean']:.1f}, "
+        f"p99 {_us(reduce['p99'])} per batch."
+    )
+
+
+def get_rows(
+    manager: LaunchGraphManager, type: Optional[str], limit: int
+) -> List[Dict[str, Any]]:
+    """按总耗时降序排列的节点统计"""
+    rows = []
+    for scope_type, name, stats in manager.hot_nodes(type, limit):
+        rows.append(
+            {
+                "id": f"{scope_type}:{name}",
+                "name": name,
+                "type": scope_type,
+                "count": stats.count,
+                "total": _ms(stats.total),
+                "mean": _ms(stats.mean),
+                "min": _ms(stats.min),
+                "max": _ms(stats.max),
+                "p50": _ms(stats.percentile(50)),
+                "p90": _ms(stats.percentile(90)),
+                "p99": _ms(stats.percentile(99)),
+            }
+        )
+    return rows
+
+
+@ui.page("/hot_nodes")
+def hot_nodes_page(session: Optional[str] = None):
+    target = sessions.get(session)
+    if target is None:
+        ui.markdown("## Not Found")
+        return
+    manager = target.manager
+
+    title = "Hot Nodes" if target.is_default else f"Hot Nodes ({target.name})"
+    ui.page_title(title)
+    ui.markdown(f"## {title}")
+    ui.markdown(
+        "Wall-clock time per node, sorted by total time. "
+        "Percentiles are estimated from a log2 histogram."
+    )
+
+    with ui.row(align_items="center"):
+        type_select = ui.select(
+            TYPE_OPTIONS, value=ScopeType.PIPELINE_NODE.value, label="Type"
+        ).classes("w-48")
+        limit_input = ui.number(
+            "Maximum Results to Show", value=100, min=1, precision=0
+        )
+        auto_update = ui.switch("Auto Update", value=True)
+
+    table = ui.table(columns=COLUMNS, rows=[], row_key="id").classes("w-full")
+    queue_label = ui.label().classes("text-sm")
+
+    def refresh():
+        queue_label.set_text(get_queue_summary(manager))
+        type = None if type_select.value == "all" else type_select.value
+        table.rows = get_rows(manager, type, int(limit_input.value or 100))
+        table.update()
+
+    type_select.on_value_change(refresh)
+    limit_input.on_value_change(refresh)
+    ui.timer(1, lambda: auto_update.value and refresh())
+    refresh()
+
+
+@app.get("/export/trace")
+def export_trace(format: TraceFormat = TraceFormat.CHROME, session: str = ""):
+    """流式下载当前执行图的轨迹，生成过程在线程池中进行，不阻塞事件循环"""
+    target = sessions.get(session)
+    if target is None:
+        raise HTTPException(status_code=404, detail=f"Session {session!r} not found")
+
+    suffix, media_type = TRACE_FILE_TYPES[format]
+    filename = f"MaaDebugger-{target.name}-{time.strftime('%Y%m%d-%H%M%S')}{suffix}"
+    return StreamingResponse(
+        iter_trace(spans_from_graph(target.manager.graph), format, target.name),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
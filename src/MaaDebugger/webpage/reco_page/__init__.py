@@ -1,22 +1,36 @@
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+from urllib.parse import urlencode
 
-from nicegui import ui
+from nicegui import run, ui
+from numpy import ndarray
 
-from ...utils.img_tools import cvmat_to_image
-from ...maafw import maafw, RecognitionDetail
+from ...utils.img_tools import Frame
+from ...maafw import RecognitionDetail
+from ...maafw.frame_buffer import FrameRingBuffer
+from ...maafw.registry import DEFAULT_SESSION, sessions
 
 
 class RecoData:
+    # 默认会话的识别结果
     data: Dict[int, Tuple[str, bool, dict]] = {}
+    # 其他会话的识别结果，按会话名称索引
+    sessions: Dict[str, Dict[int, Tuple[str, bool, dict]]] = {}
+
+    @classmethod
+    def of(cls, session: str) -> Dict[int, Tuple[str, bool, dict]]:
+        if session == DEFAULT_SESSION:
+            return cls.data
+        return cls.sessions.setdefault(session, {})
 
 
 @ui.page("/reco/{reco_id}")
-async def reco_page(reco_id: int):
-    if reco_id == 0 or not reco_id in RecoData.data:
+async def reco_page(reco_id: int, session: Optional[str] = None):
+    target = sessions.get(session)
+    if target is None or reco_id == 0 or not reco_id in RecoData.of(target.name):
         ui.markdown("## Not Found")
         return
 
-    name, hit, node_data = RecoData.data[reco_id]
+    name, hit, node_data = RecoData.of(target.name)[reco_id]
     status = hit and "✅" or "❌"
     title = f"{status} {name} ({reco_id})"
 
@@ -25,7 +39,7 @@ async def reco_page(reco_id: int):
 
     ui.separator()
 
-    details: Optional[RecognitionDetail] = await maafw.get_reco_detail(reco_id)
+    details: Optional[RecognitionDetail] = await target.maafw.get_reco_detail(reco_id)
     if not details:
         ui.markdown("## Not Found")
         return
@@ -33,9 +47,49 @@ async def reco_page(reco_id: int):
     ui.markdown(f"#### `{details.algorithm}`")
     ui.markdown(f"#### `{details.best_result}`")
 
-    for draw in details.draw_images:
-        ui.image(cvmat_to_image(draw)).props("fit=scale-down")
+    # 转换与编码在线程池中进行，每张图只编码一次
+    for source in await run.io_bound(encode_draw_images, details.draw_images):
+        ui.image(source).props("fit=scale-down")
+
+    frames = target.maafw.frames
+    seq = frames.find_reco(reco_id) if frames is not None else None
+    if frames is not None and seq is not None:
+        buffered_frames(target.name, frames, reco_id, seq)
 
     with ui.row():
         ui.json_editor({"content": {"json": details.raw_detail}, "readOnly": True})
         ui.json_editor({"content": {"json": node_data}, "readOnly": True})
+
+
+def encode_draw_images(draw_images: List[ndarray]) -> List[str]:
+    return [Frame.from_cvmat(draw).data_url("PNG") for draw in draw_images]
+
+
+def buffered_frames(session: str, frames: FrameRingBuffer, reco_id: int, seq: int):
+    """识别开始时的画面，可以拖动滑块翻看缓冲区中前后的帧"""
+    query = "" if session == DEFAULT_SESSION else f"?{urlencode({'session': session})}"
+    start = frames.reco_time(reco_id) or 0
+
+    ui.markdown("#### Screen")
+    label = ui.label().classes("text-sm")
+    image = ui.image().props("fit=scale-down")
+
+    def show(value: int):
+        ts = frames.timestamp(value)
+        if ts is None:
+            label.set_text(f"Frame {value} has been overwritten.")
+            return
+        label.set_text(
+            f"Frame {value} ({frames.oldest} - {frames.newest}), "
+            f"{(ts - start) / 1e6:+.0f} ms from recognition start"
+        )
+        image.set_source(f"/frames/{value}{query}")
+
+    if frames.oldest < frames.newest:
+        ui.slider(
+            min=frames.oldest,
+            max=frames.newest,
+            value=seq,
+            on_change=lambda e: show(int(e.value)),
+        ).props("label").classes("w-96")
+    show(seq)
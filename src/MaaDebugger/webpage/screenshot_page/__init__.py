@@ -0,0 +1,114 @@
+import asyncio
+from typing import Iterator
+
+from fastapi import HTTPException, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from nicegui import app
+
+from ...maafw.live_view import LiveView
+from ...maafw.registry import sessions
+
+BOUNDARY = "frame"
+
+
+@app.get("/screenshot")
+def screenshot(session: str = "", download: bool = False):
+    """
+    当前截图的原图（PNG）
+
+    首页只推送预览图，放大查看时才通过此地址获取原图，编码在线程池中进行并缓存在帧上。
+    """
+    target = sessions.get(session)
+    frame = target.maafw.screenshotter.frame if target is not None else None
+    if frame is None:
+        raise HTTPException(status_code=404, detail="No screenshot")
+    data = frame.encode("PNG")
+    headers = {"Cache-Control": "no-store"}
+    if download:
+        headers["Content-Disposition"] = f'attachment; filename="{hash(data)}.png"'
+    return Response(data, media_type="image/png", headers=headers)
+
+
+@app.get("/frames/{seq}")
+def buffered_frame(seq: int, session: str = ""):
+    """
+    截图缓冲区中的一帧（PNG），已被覆盖时返回 404
+
+    最近请求的几帧的编码结果会被缓存，来回拖动滑块时不会重复编码。
+    """
+    target = sessions.get(session)
+    frames = target.maafw.frames if target is not None else None
+    frame = frames.frame(seq) if frames is not None else None
+    if frame is None:
+        raise HTTPException(status_code=404, detail=f"Frame {seq} not in buffer")
+    return Response(
+        frame.encode("PNG"),
+        media_type="image/png",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def iter_mjpeg(live_view: LiveView) -> Iterator[bytes]:
+    """
+    multipart/x-mixed-replace 的 MJPEG 流，可以在浏览器标签页或其他播放器中打开
+
+    在线程池中迭代，客户端断开后生成器被关闭，最后一个观看者离开时截图线程随之退出。
+    只依靠 TCP 背压丢帧，系统发送缓冲区较大时延迟会增加，首页使用 /live/ws。
+    """
+    for jpeg in live_view.stream():
+        if jpeg is None:
+            # 没有新帧时也要返回，以便及时发现断开的连接
+            yield b""
+            continue
+        yield (
+            f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+            f"Content-Length: {len(jpeg)}\r\n\r\n"
+        ).encode() + jpeg + b"\r\n"
+
+
+@app.get("/live")
+def live(session: str = ""):
+    """实时画面的 MJPEG 流，可以直接作为 img 的 src"""
+    target = sessions.get(session)
+    if target is None:
+        raise HTTPException(status_code=404, detail=f"Session {session!r} not found")
+    return StreamingResponse(
+        iter_mjpeg(target.maafw.live_view),
+        media_type=f"multipart/x-mixed-replace; boundary={BOUNDARY}",
+        # JPEG 无法再压缩，且 GZip 中间件会缓冲数据造成延迟
+        headers={"Cache-Control": "no-store", "Content-Encoding": "identity"},
+    )
+
+
+@app.websocket("/live/ws")
+async def live_ws(websocket: WebSocket, session: str = ""):
+    """
+    实时画面的二进制 WebSocket 流
+
+    每发送一帧等待客户端确认后再取最新一帧，客户端跟不上时中间的帧被丢弃，延迟不超过一帧。
+    """
+    target = sessions.get(session)
+    if target is None:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    frames = target.maafw.live_view.stream()
+    try:
+        while True:
+            # 等待新帧会阻塞，最长为保活间隔
+            jpeg = await asyncio.to_thread(next, frames)
+            if jpeg is None:
+                await websocket.send_text("")
+                continue
+            await websocket.send_bytes(jpeg)
+            await websocket.receive_text()
+    except (WebSocketDisconnect, RuntimeError):
+        # 客户端断开时发送会抛出 RuntimeError
+        pass
+    finally:
+        try:
+            frames.close()
+        except ValueError:
+            # 被取消时线程仍在等待新帧，生成器结束后由垃圾回收关闭
+            pass
@@ -0,0 +1,156 @@
+"""
+事件记录基准测试：对比 EventSink 构造消息字典（f-string 拼接消息类型）与构造 Event 的
+单事件内存占用与耗时，reducer 分别以消息字典与 Event 为输入的吞吐，
+以及 EventSink 中 print 与写入追踪器环形缓冲区的耗时
+
+Usage:
+    python tools/bench_events.py [--events 200000] [--seed 0]
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from synthetic_streams import mixed_stream
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+_parser.add_argument("--events", type=int, default=200000)
+_parser.add_argument("--seed", type=int, default=0)
+ARGS = _parser.parse_args()
+
+# MaaDebugger 在导入时解析命令行参数
+sys.argv = sys.argv[:1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from MaaDebugger.maafw.events import Event, EventKind, EventPhase  # noqa: E402
+from MaaDebugger.maafw.launch_graph import (  # noqa: E402
+    LaunchGraph,
+    reduce_launch_graph_many,
+)
+from MaaDebugger.maafw.tracer import EventTracer, TraceLevel  # noqa: E402
+
+Msg = Dict[str, Any]
+
+PHASES = {0: EventPhase.STARTING, 1: EventPhase.SUCCEEDED, 2: EventPhase.FAILED}
+PIPELINE_NODE = EventKind.PIPELINE_NODE
+
+
+def make_dict(noti_type: int, name: str, node_id: int) -> Msg:
+    """改动前 EventSink 的构造方式"""
+    msg_suffix = {0: "Starting", 1: "Succeeded", 2: "Failed"}.get(noti_type)
+    return {
+        "msg": f"PipelineNode.{msg_suffix}",
+        "ts": time.monotonic_ns(),
+        "name": name,
+        "node_id": node_id,
+    }
+
+
+def make_event(noti_type: int, name: str, node_id: int) -> Event:
+    phase = PHASES.get(noti_type)
+    return Event(PIPELINE_NODE, phase, name, time.monotonic_ns(), node_id=node_id)
+
+
+def bench_construct(factory: Callable[[int, str, int], Any], count: int) -> None:
+    # 节点名来自 MaaFramework 的回调，每个事件都是新的字符串对象
+    names = [f"Node{i % 500}".encode() for i in range(count)]
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    kept = [factory(i % 3, names[i].decode(), i) for i in range(count)]
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del kept
+
+    start = time.perf_counter_ns()
+    for i in range(count):
+        factory(i % 3, names[i].decode(), i)
+    elapsed = time.perf_counter_ns() - start
+    print(
+        f"  {factory.__name__:<12} {retained / count:8.1f} B/event retained, "
+        f"{elapsed / count:8.1f} ns/event"
+    )
+
+
+def bench_reduce(label: str, msgs: List[Any]) -> None:
+    gc.collect()
+    tracemalloc.start()
+    graph = reduce_launch_graph_many(LaunchGraph(), msgs)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del graph
+
+    gc.collect()
+    start = time.perf_counter()
+    reduce_launch_graph_many(LaunchGraph(), msgs)
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {label:<12} {len(msgs) / elapsed:10.0f} events/s, "
+        f"graph {retained / 2**20:7.1f} MiB"
+    )
+
+
+def bench_trace(events: List[Event]) -> None:
+    # print 的目标为 os.devnull，不包含控制台渲染的耗时，实际控制台只会更慢
+    with open(os.devnull, "w") as devnull:
+        start = time.perf_counter_ns()
+        for event in events:
+            print(f"[DEBUG EventSink] {event.to_msg()}", file=devnull)
+        elapsed = time.perf_counter_ns() - start
+    print(f"  {'print':<12} {elapsed / len(events):8.1f} ns/event")
+
+    with tempfile.TemporaryDirectory() as directory:
+        # 先只测量回调线程上的写入，再单独测量后台线程的编码与写入
+        tracer = EventTracer(
+            Path(directory) / "bench.trace", TraceLevel.ALL, capacity=len(events)
+        )
+        trace = tracer.trace
+        start = time.perf_counter_ns()
+        for event in events:
+            trace(event)
+        elapsed = time.perf_counter_ns() - start
+
+        flush_start = time.perf_counter_ns()
+        tracer.start()
+        tracer.close()
+        flush = time.perf_counter_ns() - flush_start
+        size = tracer.path.stat().st_size
+    print(
+        f"  {'trace':<12} {elapsed / len(events):8.1f} ns/event on the callback thread, "
+        f"{flush / len(events):.1f} ns/event in the background, "
+        f"{size / len(events):.1f} B/event on disk"
+    )
+
+
+def main():
+    count = ARGS.events
+    print(f"construct {count} events:")
+    bench_construct(make_dict, count)
+    bench_construct(make_event, count)
+
+    msgs = mixed_stream(count, random.Random(ARGS.seed))
+    # 与 EventSink 一致，每个事件持有独立的节点名字符串
+    for msg in msgs:
+        if "name" in msg:
+            msg["name"] = msg["name"].encode().decode()
+    events = [Event.from_msg(msg) for msg in msgs]
+    print(f"reduce {len(msgs)} events:")
+    bench_reduce("dict", msgs)
+    bench_reduce("Event", events)
+
+    print(f"sink logging {len(events)} events:")
+    bench_trace(events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+截图转换基准测试：对比 BGR 转 RGB 的原实现（split + merge）、numpy 视图与向量化翻转，
+以及 PIL 解包时直接交换通道的实现，并给出各格式的编码耗时与 Frame 缓存命中的耗时
+
+Usage:
+    python tools/bench_img_tools.py [--repeat 20] [--seed 0]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+_parser.add_argument("--repeat", type=int, default=20)
+_parser.add_argument("--seed", type=int, default=0)
+ARGS = _parser.parse_args()
+
+# MaaDebugger 在导入时解析命令行参数
+sys.argv = sys.argv[:1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from MaaDebugger.utils.img_tools import Frame, cvmat_to_image  # noqa: E402
+
+SIZES: Dict[str, Tuple[int, int]] = {"1080p": (1080, 1920), "4K": (2160, 3840)}
+
+
+def split_merge(cvmat: np.ndarray) -> Image.Image:
+    """改动前的实现"""
+    pil = Image.fromarray(cvmat)
+    b, g, r = pil.split()
+    return Image.merge("RGB", (r, g, b))
+
+
+def strided_view(cvmat: np.ndarray) -> Image.Image:
+    return Image.fromarray(cvmat[..., ::-1])
+
+
+def vectorized_flip(cvmat: np.ndarray) -> Image.Image:
+    return Image.fromarray(np.ascontiguousarray(cvmat[..., ::-1]))
+
+
+def make_frame(height: int, width: int, rng: np.random.Generator) -> np.ndarray:
+    """8x8 色块拼成的 BGR 图像，压缩率接近游戏截图而不是随机噪声"""
+    blocks = rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8)
+    return np.ascontiguousarray(np.repeat(np.repeat(blocks, 8, 0), 8, 1))
+
+
+def timeit(func: Callable[[], object], repeat: int) -> float:
+    """最快一次的耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main():
+    rng = np.random.default_rng(ARGS.seed)
+    for label, (height, width) in SIZES.items():
+        cvmat = make_frame(height, width, rng)
+        expected = split_merge(cvmat).tobytes()
+        print(f"{label} ({width}x{height}) BGR -> RGB:")
+        for name, convert in (
+            ("split_merge", split_merge),
+            ("strided_view", strided_view),
+            ("vectorized", vectorized_flip),
+            ("cvmat_to_image", cvmat_to_image),
+        ):
+            assert convert(cvmat).tobytes() == expected, name
+            elapsed = timeit(lambda: convert(cvmat), ARGS.repeat)
+            print(f"  {name:<16} {elapsed:8.2f} ms")
+
+        image = cvmat_to_image(cvmat)
+        print(f"{label} encode:")
+        for format in ("PNG", "JPEG", "WEBP"):
+            # 编码较慢，最多重复 3 次
+            elapsed = timeit(lambda: Frame(image).encode(format), min(ARGS.repeat, 3))
+            frame = Frame(image)
+            size = len(frame.encode(format))
+            cached = timeit(lambda: frame.encode(format), ARGS.repeat)
+            print(
+                f"  {format:<16} {elapsed:8.2f} ms, {size / 1024:8.1f} KiB, "
+                f"cached {cached * 1e3:.1f} µs"
+            )
+
+
+if __name__ == "__main__":
+    main()
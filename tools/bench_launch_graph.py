@@ -0,0 +1,142 @@
+"""
+LaunchGraph 基准测试
+
+Usage:
+    python tools/bench_launch_graph.py [--scopes 500000] [--seed 0]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from synthetic_streams import StreamBuilder
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+_parser.add_argument("--scopes", type=int, default=500000)
+_parser.add_argument("--seed", type=int, default=0)
+ARGS = _parser.parse_args()
+
+# MaaDebugger 在导入时解析命令行参数
+sys.argv = sys.argv[:1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from MaaDebugger.maafw.launch_graph import (  # noqa: E402
+    GeneralStatus,
+    LaunchGraph,
+    Scope,
+    ScopeType,
+    reduce_launch_graph,
+)
+
+
+def build_graph(scopes: int, seed: int) -> LaunchGraph:
+    """重放合成消息流，直到执行图中至少有 scopes 个作用域"""
+    rng = random.Random(seed)
+    graph = LaunchGraph()
+    # 复用同一个 builder，使 reco_id 在所有任务中保持唯一
+    builder = StreamBuilder(rng)
+    count = 0
+    while count < scopes:
+        builder.msgs.clear()
+        builder.task()
+        for msg in builder.msgs:
+            reduce_launch_graph(graph, msg)
+        count += len(graph.childs[-1].arena)
+    return graph
+
+
+def traverse_recognitions(graph: LaunchGraph) -> List[Tuple[Scope, int]]:
+    """引入索引之前 get_all_recognitions 的全量遍历"""
+    results: List[Tuple[Scope, int]] = []
+
+    def traverse(scope: Scope, depth: int = 0):
+        if scope.type == ScopeType.RECO:
+            results.append((scope, depth))
+        for child in scope.childs:
+            traverse(child, depth + 1)
+        if scope.reco:
+            for reco in scope.reco:
+                traverse(reco, depth + 1)
+        if scope.action:
+            traverse(scope.action, depth + 1)
+        if scope.reco_detail:
+            traverse(scope.reco_detail, depth + 1)
+
+    for task in graph.childs:
+        traverse(task)
+    return results
+
+
+def timeit(func: Callable[[], Any], repeat: int = 3) -> Tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_index(graph: LaunchGraph) -> Dict[str, Tuple[float, float]]:
+    results: Dict[str, Tuple[float, float]] = {}
+
+    # 所有 Recognition
+    t_full, full = timeit(lambda: traverse_recognitions(graph))
+    t_index, indexed = timeit(lambda: graph.find_scopes(type=ScopeType.RECO))
+    assert [s for s, _ in full] == indexed
+    assert [d for _, d in full] == [s.arena.levels[s.id] for s in indexed]
+    results["all recognitions"] = (t_full, t_index)
+
+    # 某个节点所有失败的 Recognition
+    name = "Sub"
+    t_full, full = timeit(
+        lambda: [
+            s
+            for s, _ in traverse_recognitions(graph)
+            if s.msg.get("name") == name and s.status == GeneralStatus.FAILED
+        ]
+    )
+    t_index, indexed = timeit(
+        lambda: graph.find_scopes(
+            name=name, type=ScopeType.RECO, status=GeneralStatus.FAILED
+        )
+    )
+    assert full == indexed
+    results[f"failed recognitions of {name!r}"] = (t_full, t_index)
+
+    # 通过 reco_id 查找
+    reco_id = full[len(full) // 2].msg["reco_id"] if full else 0
+    t_full, found = timeit(
+        lambda: next(
+            s for s, _ in traverse_recognitions(graph) if s.msg["reco_id"] == reco_id
+        )
+    )
+    t_index, indexed = timeit(lambda: graph.get_recognition(reco_id))
+    assert found == indexed
+    results["recognition by reco_id"] = (t_full, t_index)
+
+    return results
+
+
+def main():
+    start = time.perf_counter()
+    graph = build_graph(ARGS.scopes, ARGS.seed)
+    print(
+        f"Built graph: {graph.memory_usage()['scopes']} scopes, {graph.events} events "
+        f"in {time.perf_counter() - start:.2f}s\n"
+    )
+
+    print(f"{'query':<36}{'traversal':>12}{'index':>12}{'speedup':>10}")
+    for name, (t_full, t_index) in bench_index(graph).items():
+        print(
+            f"{name:<36}{t_full * 1000:>10.2f}ms{t_index * 1000:>10.3f}ms"
+            f"{t_full / max(t_index, 1e-9):>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
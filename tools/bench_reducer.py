@@ -0,0 +1,292 @@
+"""
+LaunchGraph 状态机基准测试套件
+
+对每个合成场景测量 reducer 的吞吐（events/sec）、逐条消息延迟分位数与峰值内存，
+以及逐层追踪（tracker_walk.py）、get_all_recognitions、LaunchGraph.to_dict 的耗时。
+结果可以保存为 JSON，并与基线对比，回归超过阈值时以非零状态码退出。
+
+Usage:
+    python tools/bench_reducer.py                           # 运行所有场景
+    python tools/bench_reducer.py --quick                   # 缩小规模，用于快速检查
+    python tools/bench_reducer.py --output results.json     # 保存结果
+    python tools/bench_reducer.py --baseline results.json   # 与基线对比
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from synthetic_streams import deep_stream, flat_stream, mixed_stream, wide_stream
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+_parser.add_argument("--scenario", action="append", help="only run these scenarios")
+_parser.add_argument("--quick", action="store_true", help="scale every scenario down")
+_parser.add_argument("--seed", type=int, default=0)
+_parser.add_argument("--repeat", type=int, default=3)
+_parser.add_argument("--output", type=Path, help="write results as JSON")
+_parser.add_argument("--baseline", type=Path, help="compare with a previous result")
+_parser.add_argument(
+    "--tolerance",
+    type=float,
+    default=0.2,
+    help="allowed relative regression against the baseline (Default: 0.2)",
+)
+ARGS = _parser.parse_args()
+
+# MaaDebugger 在导入时解析命令行参数
+sys.argv = sys.argv[:1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from MaaDebugger.maafw import LaunchGraphManager  # noqa: E402
+from MaaDebugger.maafw.launch_graph import (  # noqa: E402
+    LaunchGraph,
+    reduce_launch_graph,
+    reduce_launch_graph_many,
+)
+from tracker_walk import tracker_from_walk  # noqa: E402
+
+Msg = Dict[str, Any]
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+# 场景名 -> (完整规模, --quick 规模, 生成函数)
+SCENARIOS: Dict[str, Tuple[int, int, Callable[[int, random.Random], List[Msg]]]] = {
+    "flat": (20_000, 1_000, flat_stream),
+    "deep": (5_000, 500, lambda n, _: deep_stream(n)),
+    "wide": (100_000, 5_000, lambda n, _: wide_stream(n)),
+    "million": (1_000_000, 50_000, mixed_stream),
+}
+
+# 对比基线时检查的指标：(路径, 越大越好)
+COMPARED_METRICS = (
+    (("reduce", "events_per_sec"), True),
+    (("reduce_many", "events_per_sec"), True),
+    (("latency_ns", "p99"), False),
+    (("iterate_tracker", "seconds"), False),
+    (("memory", "peak_bytes"), False),
+    (("to_dict", "seconds"), False),
+    (("get_all_recognitions", "seconds"), False),
+)
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def replay(msgs: List[Msg]) -> LaunchGraph:
+    graph = LaunchGraph()
+    for msg in msgs:
+        reduce_launch_graph(graph, msg)
+    return graph
+
+
+def percentiles(samples: array) -> Dict[str, int]:
+    ordered = sorted(samples)
+    result = {
+        f"p{p:g}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+        for p in PERCENTILES
+    }
+    result["max"] = ordered[-1]
+    return result
+
+
+def measure_latency(msgs: List[Msg], repeat: int) -> Dict[str, int]:
+    """逐条消息的 reducer 耗时（纳秒），每个分位数取多次运行中的最小值以降低噪声"""
+    best: Dict[str, int] = {}
+    clock = time.perf_counter_ns
+    for _ in range(repeat):
+        graph = LaunchGraph()
+        samples = array("q", bytes(8 * len(msgs)))
+        gc.collect()
+        for i, msg in enumerate(msgs):
+            start = clock()
+            reduce_launch_graph(graph, msg)
+            samples[i] = clock() - start
+        for key, value in percentiles(samples).items():
+            best[key] = min(best.get(key, value), value)
+    return best
+
+
+def measure_memory(msgs: List[Msg]) -> Dict[str, int]:
+    """重放期间 reducer 分配的峰值内存，消息本身在开始追踪前已分配，不计入"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        graph = replay(msgs)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_bytes": peak,
+        "retained_bytes": current,
+        "graph_bytes": graph.memory_usage()["bytes"],
+    }
+
+
+def measure_iterate_tracker(msgs: List[Msg], repeat: int) -> Dict[str, float]:
+    """
+    在嵌套最深的时刻，从任务根部逐层调用 iterate_tracker 定位当前节点，
+    即引入活动作用域栈之前 reducer 每条消息的定位开销
+    """
+    graph = LaunchGraph()
+    deepest, depth = 0, 0
+    for i, msg in enumerate(msgs):
+        reduce_launch_graph(graph, msg)
+        if graph.depth > depth:
+            deepest, depth = i, graph.depth
+
+    graph = replay(msgs[: deepest + 1])
+    if not graph.childs:
+        return {"seconds": 0.0, "depth": 0}
+    task = graph.childs[-1]
+    loops = 1000
+
+    def walk():
+        for _ in range(loops):
+            tracker_from_walk(graph, task)
+
+    return {"seconds": best_of(walk, repeat) / loops, "depth": graph.depth}
+
+
+def run_scenario(name: str, msgs: List[Msg]) -> Dict[str, Any]:
+    repeat = ARGS.repeat
+    events = len(msgs)
+
+    seconds = best_of(lambda: replay(msgs), repeat)
+    seconds_many = best_of(
+        lambda: reduce_launch_graph_many(LaunchGraph(), msgs), repeat
+    )
+
+    graph = replay(msgs)
+
+    manager = LaunchGraphManager()
+    manager.dispatch_many(msgs)
+    recognitions = len(manager.get_all_recognitions())
+
+    return {
+        "events": events,
+        "scopes": graph.memory_usage()["scopes"],
+        "reduce": {"seconds": seconds, "events_per_sec": events / seconds},
+        "reduce_many": {
+            "seconds": seconds_many,
+            "events_per_sec": events / seconds_many,
+        },
+        "latency_ns": measure_latency(msgs, repeat),
+        "memory": measure_memory(msgs),
+        "iterate_tracker": measure_iterate_tracker(msgs, repeat),
+        "get_all_recognitions": {
+            "seconds": best_of(manager.get_all_recognitions, repeat),
+            "recognitions": recognitions,
+        },
+        "to_dict": {"seconds": best_of(graph.to_dict, repeat)},
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """返回超过阈值的回归"""
+    regressions = []
+    for scenario, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if previous is None or previous.get("events") != current["events"]:
+            continue
+        for (group, metric), higher_is_better in COMPARED_METRICS:
+            old = previous.get(group, {}).get(metric)
+            new = current[group][metric]
+            if not old:
+                continue
+            change = new / old - 1
+            if (-change if higher_is_better else change) > ARGS.tolerance:
+                regressions.append(
+                    f"{scenario}.{group}.{metric}: {old:.4g} -> {new:.4g} ({change:+.1%})"
+                )
+    return regressions
+
+
+def print_scenario(name: str, result: Dict[str, Any]) -> None:
+    latency = result["latency_ns"]
+    memory = result["memory"]
+    print(f"[{name}] {result['events']} events, {result['scopes']} scopes")
+    print(
+        f"  reduce            {result['reduce']['events_per_sec']:>12,.0f} events/s"
+        f"   many: {result['reduce_many']['events_per_sec']:,.0f} events/s"
+    )
+    print(
+        "  latency           "
+        + "  ".join(f"{k}={v / 1000:.1f}us" for k, v in latency.items())
+    )
+    print(
+        f"  memory            peak={memory['peak_bytes'] / 2**20:.1f}MiB"
+        f"  retained={memory['retained_bytes'] / 2**20:.1f}MiB"
+    )
+    print(
+        f"  tracker_walk      {result['iterate_tracker']['seconds'] * 1e6:.1f}us"
+        f" (depth {result['iterate_tracker']['depth']})"
+    )
+    print(
+        f"  get_all_recos     {result['get_all_recognitions']['seconds'] * 1000:.2f}ms"
+        f" ({result['get_all_recognitions']['recognitions']} recognitions)"
+    )
+    print(f"  to_dict           {result['to_dict']['seconds'] * 1000:.2f}ms\n")
+
+
+def main():
+    names = ARGS.scenario or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        _parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # 深层嵌套的 to_dict 是递归实现
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100_000))
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": ARGS.quick,
+            "seed": ARGS.seed,
+        },
+        "scenarios": {},
+    }
+
+    for name in names:
+        full, quick, generate = SCENARIOS[name]
+        msgs = generate(quick if ARGS.quick else full, random.Random(ARGS.seed))
+        result = run_scenario(name, msgs)
+        results["scenarios"][name] = result
+        print_scenario(name, result)
+
+    if ARGS.output:
+        with open(ARGS.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {ARGS.output}")
+
+    if ARGS.baseline:
+        with open(ARGS.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f))
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+截图环形缓冲区的 roi 检查：负坐标、完全超出截图与超出截图边界的 roi 都只保存与截图的交集
+
+Usage:
+    python tools/check_frame_buffer.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# MaaDebugger 在导入时解析命令行参数
+sys.argv = sys.argv[:1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from MaaDebugger.maafw.frame_buffer import FrameRingBuffer  # noqa: E402
+
+
+def make_frame(height: int = 8, width: int = 12) -> np.ndarray:
+    """每个像素的 B 通道为列号、G 通道为行号的 BGR 图像，便于核对裁剪区域"""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = np.arange(width)[None, :]
+    frame[..., 1] = np.arange(height)[:, None]
+    return frame
+
+
+def stored(roi) -> FrameRingBuffer:
+    frames = FrameRingBuffer(4, roi=roi)
+    frames.push(make_frame(), ts=1)
+    return frames
+
+
+def check_negative_roi():
+    # 截图外的负坐标部分被裁掉，而不是从右侧回绕
+    frames = stored((-5, -1, 8, 3))
+    result = frames.get(1)
+    assert result is not None, "frame was not stored"
+    _, image = result
+    assert image.shape == (2, 3, 3), image.shape
+    assert image[0, :, 0].tolist() == [0, 1, 2], image[0, :, 0]
+    assert image[:, 0, 1].tolist() == [0, 1], image[:, 0, 1]
+    frames.frame(1).encode("PNG")
+    print("OK: negative ROI is clamped to the screenshot")
+
+
+def check_outside_roi():
+    # 没有交集时不写入空帧，/frames 不会因编码空图像而出错
+    for roi in ((20, 0, 4, 4), (0, 10, 4, 4), (-10, -10, 5, 5)):
+        frames = stored(roi)
+        assert frames.newest == 0, (roi, frames.newest)
+        assert frames.get(1) is None and frames.frame(1) is None, roi
+    print("OK: ROI outside the screenshot stores nothing")
+
+
+def check_oversized_roi():
+    # 超出右下边界的部分被裁掉
+    frames = stored((9, 5, 100, 100))
+    frame = frames.frame(1)
+    assert frame is not None, "frame was not stored"
+    assert frame.size == (3, 3), frame.size
+    assert frame.encode("PNG")
+    frames = stored((0, 0, 100, 100))
+    _, image = frames.get(1)
+    assert np.array_equal(image, make_frame()), "whole screenshot expected"
+    print("OK: oversized ROI is clamped to the screenshot")
+
+
+def main():
+    check_negative_roi()
+    check_outside_roi()
+    check_oversized_roi()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
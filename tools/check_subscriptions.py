@@ -0,0 +1,129 @@
+"""
+订阅的检查：慢订阅者回调期间 reducer 线程仍能继续处理消息，
+BLOCK 策略的事件流等待消费者时，消费者仍可以访问 manager
+
+Usage:
+    python tools/check_subscriptions.py [--events 20000] [--delay 0.5] [--seed 0]
+"""
+
+import argparse
+import asyncio
+import faulthandler
+import random
+import sys
+import time
+from pathlib import Path
+from threading import Event, Thread
+
+from synthetic_streams import mixed_stream
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+_parser.add_argument("--events", type=int, default=20000)
+_parser.add_argument("--delay", type=float, default=0.5, help="seconds per callback")
+_parser.add_argument("--seed", type=int, default=0)
+ARGS = _parser.parse_args()
+
+# MaaDebugger 在导入时解析命令行参数
+sys.argv = sys.argv[:1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from MaaDebugger.maafw import LaunchGraphManager, OverflowPolicy  # noqa: E402
+
+
+def check_slow_subscriber():
+    msgs = mixed_stream(ARGS.events, random.Random(ARGS.seed))
+    half = len(msgs) // 2
+
+    manager = LaunchGraphManager()
+    entered, release = Event(), Event()
+    received = [0]
+
+    def slow(graph, batch):
+        received[0] += len(batch)
+        entered.set()
+        # 第一次回调一直阻塞到后半段消息处理完，之后每次耗时 delay
+        if not release.is_set():
+            release.wait(10)
+        else:
+            time.sleep(ARGS.delay)
+
+    manager.subscribe_batch(slow, max_hz=100)
+    manager.start()
+
+    for msg in msgs[:half]:
+        manager.post(msg)
+    if not entered.wait(5):
+        raise SystemExit("FAIL: subscriber was never called")
+
+    # 订阅者回调尚未返回，reducer 应当照常处理后半段消息
+    start = time.perf_counter()
+    for msg in msgs[half:]:
+        manager.post(msg)
+    idle = manager.wait_idle(timeout=5)
+    elapsed = time.perf_counter() - start
+    release.set()
+    if not idle:
+        raise SystemExit(
+            f"FAIL: reducer stalled while the subscriber was running "
+            f"({manager.queue_stats()})"
+        )
+    print(f"reducer drained {len(msgs) - half} events in {elapsed * 1e3:.1f} ms")
+
+    # 剩余消息合并后在下一次通知中送达
+    deadline = time.monotonic() + 5 + ARGS.delay
+    while received[0] < len(msgs) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    manager.stop()
+    if received[0] != len(msgs):
+        raise SystemExit(f"FAIL: subscriber received {received[0]}/{len(msgs)} events")
+    print(f"subscriber received all {len(msgs)} events")
+
+
+async def consume_blocking_stream(msgs) -> int:
+    manager = LaunchGraphManager()
+    manager.start()
+    received = 0
+
+    def produce():
+        # 分成多批放入，使 reducer 线程多次分发、填满事件流
+        for i in range(0, len(msgs), 1000):
+            for msg in msgs[i : i + 1000]:
+                manager.post(msg)
+            time.sleep(0.01)
+
+    async with manager.events(maxsize=1, overflow=OverflowPolicy.BLOCK) as stream:
+        producer = Thread(target=produce, daemon=True)
+        producer.start()
+        async for event in stream:
+            received += len(event.msgs)
+            # 等 reducer 线程填满队列并开始等待，再获取 manager 的锁
+            await asyncio.sleep(0.02)
+            manager.flush()
+            if received >= len(msgs):
+                break
+        producer.join()
+    manager.stop()
+    return received
+
+
+def check_blocking_stream():
+    msgs = mixed_stream(ARGS.events, random.Random(ARGS.seed))
+    # 死锁时事件循环本身被阻塞，只能由看门狗打印各线程的调用栈后退出
+    faulthandler.dump_traceback_later(30, exit=True)
+    received = asyncio.run(consume_blocking_stream(msgs))
+    faulthandler.cancel_dump_traceback_later()
+    if received != len(msgs):
+        raise SystemExit(f"FAIL: stream received {received}/{len(msgs)} events")
+    print(f"blocking stream received all {len(msgs)} events")
+
+
+def main():
+    check_slow_subscriber()
+    check_blocking_stream()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+将录制的事件导出为 Chrome Trace Event JSON（Perfetto / chrome://tracing）或 collapsed-stack 火焰图文本
+
+输入可以是事件日志目录（--journal）、会话文件（--record）或追踪文件（--trace），按文件内容识别。
+
+Usage:
+    python tools/export_trace.py journal_dir -o trace.json
+    python tools/export_trace.py session.maasession -o trace.json.gz       # gzip 压缩
+    python tools/export_trace.py MaaDebugger.trace -f collapsed -o trace.folded
+    python tools/export_trace.py journal_dir -f collapsed | flamegraph.pl > flame.svg
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+_parser.add_argument("input", type=Path)
+_parser.add_argument(
+    "-f", "--format", choices=("chrome", "collapsed"), default="chrome"
+)
+_parser.add_argument("-o", "--output", type=Path, default=None, help="default: stdout")
+_parser.add_argument("--name", default="MaaDebugger", help="process name in the trace")
+ARGS = _parser.parse_args()
+
+# MaaDebugger 在导入时解析命令行参数
+sys.argv = sys.argv[:1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from MaaDebugger.maafw.trace_export import (  # noqa: E402
+    TraceFormat,
+    export_trace,
+    iter_recorded_events,
+    open_output,
+    spans_from_events,
+)
+
+
+class _Counter:
+    def __init__(self, spans):
+        self.spans = spans
+        self.count = 0
+
+    def __iter__(self):
+        for span in self.spans:
+            self.count += 1
+            yield span
+
+
+def main():
+    try:
+        events = iter_recorded_events(ARGS.input)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    spans = _Counter(spans_from_events(events))
+    start = time.perf_counter()
+    out = open_output(ARGS.output) if ARGS.output else sys.stdout
+    try:
+        export_trace(spans, out, TraceFormat(ARGS.format), ARGS.name)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(
+        f"Exported {spans.count} spans in {time.perf_counter() - start:.2f}s.",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+差分校验：将消息流同时重放到 reduce_launch_graph 与基线版本的 reducer
+（baseline_launch_graph.py 中冻结的副本，与 src 中的实现不共用代码），确认两者得到完全相同的执行图；
+并确认活动作用域栈与逐层追踪定位到同一节点，reduce_launch_graph_many 分批应用得到相同的结果，
+以及预先计算的祖先字段与沿父节点逐层遍历的结果一致，
+以 Event 代替消息字典输入时得到相同的执行图。
+
+Usage:
+    python tools/launch_graph_diff.py                  # 使用内置的合成消息流
+    python tools/launch_graph_diff.py a.jsonl b.jsonl  # 重放录制的消息流（每行一条消息）
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import baseline_launch_graph as baseline
+from synthetic_streams import synthetic_streams
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+_parser.add_argument("streams", nargs="*", type=Path, help="JSONL message streams")
+_parser.add_argument("--seed", type=int, default=0)
+_parser.add_argument("--rounds", type=int, default=200)
+ARGS = _parser.parse_args()
+
+# MaaDebugger 在导入时解析命令行参数
+sys.argv = sys.argv[:1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from MaaDebugger.maafw.events import Event  # noqa: E402
+from MaaDebugger.maafw.launch_graph import (  # noqa: E402
+    GeneralStatus,
+    LaunchGraph,
+    Scope,
+    ScopeType,
+    find_immediate_pipeline_node,
+    find_root_pipeline_node,
+    get_nesting_depth,
+    get_parent_chain,
+    reduce_launch_graph,
+    reduce_launch_graph_many,
+)
+from tracker_walk import tracker_from_walk  # noqa: E402
+
+Msg = Dict[str, Any]
+
+# 另外校验任务状态与 Task.* 消息一致
+TASK_STATUS = {
+    "Task.Starting": GeneralStatus.RUNNING,
+    "Task.Succeeded": GeneralStatus.SUCCESS,
+    "Task.Failed": GeneralStatus.FAILED,
+}
+
+
+def load_stream(path: Path) -> List[Msg]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def check_ancestry(graph: LaunchGraph) -> None:
+    """将 O(1) 的祖先查询与沿父节点遍历的结果对比"""
+    for task in graph.childs:
+        for scope_id in range(len(task.arena)):
+            scope = Scope(task.arena, scope_id)
+            chain = get_parent_chain(scope)
+            pipelines = [s for s in chain if s.type == ScopeType.PIPELINE_NODE]
+            assert get_nesting_depth(scope) == len(pipelines), scope
+            assert find_root_pipeline_node(scope) == (
+                pipelines[-1] if pipelines else None
+            ), scope
+            above = [s for s in chain[1:] if s.type == ScopeType.PIPELINE_NODE]
+            assert find_immediate_pipeline_node(scope) == (
+                above[0] if above else None
+            ), scope
+
+
+def replay(msgs: List[Msg]) -> None:
+    by_stack = LaunchGraph()
+    by_baseline = baseline.LaunchGraph()
+    for i, msg in enumerate(msgs):
+        reduce_launch_graph(by_stack, msg)
+        baseline.reduce_launch_graph(by_baseline, msg)
+
+        assert by_stack.depth == by_baseline.depth, f"depth mismatch at msg #{i}: {msg}"
+        if msg.get("msg") in TASK_STATUS and by_stack.childs:
+            assert (
+                by_stack.childs[-1].status == TASK_STATUS[msg["msg"]]
+            ), f"task status mismatch at msg #{i}: {msg}"
+        if by_stack.depth > 0 and by_stack.childs:
+            expected = tracker_from_walk(by_stack, by_stack.childs[-1])
+            assert (
+                by_stack.stack[-1] == expected
+            ), f"tracker mismatch at msg #{i}: {msg}"
+
+    assert by_stack.to_dict() == by_baseline.to_dict(), "graph mismatch"
+    check_ancestry(by_stack)
+
+    by_batch = LaunchGraph()
+    for i in range(0, len(msgs), 97):
+        reduce_launch_graph_many(by_batch, msgs[i : i + 97])
+    assert by_batch.to_dict() == by_stack.to_dict(), "batch graph mismatch"
+
+    events = [Event.from_msg(msg) for msg in msgs]
+    by_event = reduce_launch_graph_many(
+        LaunchGraph(), [event for event in events if event is not None]
+    )
+    assert by_event.to_dict() == by_stack.to_dict(), "event graph mismatch"
+    for event, msg in zip(events, msgs):
+        assert event is None or event.to_msg() == msg, f"round trip mismatch: {msg}"
+
+
+def main():
+    if ARGS.streams:
+        streams = ((str(p), load_stream(p)) for p in ARGS.streams)
+    else:
+        streams = (
+            (f"synthetic #{i}", msgs)
+            for i, msgs in enumerate(synthetic_streams(ARGS.seed, ARGS.rounds))
+        )
+
+    total = 0
+    for name, msgs in streams:
+        replay(msgs)
+        total += len(msgs)
+        print(f"OK: {name} ({len(msgs)} msgs)")
+
+    print(f"All streams matched, {total} msgs in total.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+无界面回放 --record 录制的会话文件，统计 reducer 线程的吞吐与延迟
+
+Usage:
+    python tools/replay_session.py session.maasession                # 原始速度
+    python tools/replay_session.py session.maasession --speed 0      # 尽可能快
+    python tools/replay_session.py session.maasession --synthetic 100000 --rate 5000
+        # 先以每秒 5000 个事件的速率生成合成会话再回放
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from synthetic_streams import mixed_stream
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+_parser.add_argument("session", type=Path)
+_parser.add_argument("--speed", type=float, default=1.0, help="0 = as fast as possible")
+_parser.add_argument(
+    "--synthetic", type=int, default=0, help="write a synthetic session first"
+)
+_parser.add_argument("--rate", type=float, default=5000, help="events/s of --synthetic")
+_parser.add_argument("--seed", type=int, default=0)
+_parser.add_argument(
+    "--subscribers", type=int, default=1, help="batch subscribers to notify"
+)
+ARGS = _parser.parse_args()
+
+# MaaDebugger 在导入时解析命令行参数
+sys.argv = sys.argv[:1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from MaaDebugger.maafw import LaunchGraphManager  # noqa: E402
+from MaaDebugger.maafw.session import SessionRecorder, SessionReplayer  # noqa: E402
+
+
+def write_synthetic(path: Path, events: int, rate: float) -> None:
+    msgs = mixed_stream(events, random.Random(ARGS.seed))
+    interval = int(1e9 / rate)
+    origin = time.monotonic_ns()
+    for i, msg in enumerate(msgs):
+        msg["ts"] = origin + i * interval
+    recorder = SessionRecorder(path)
+    recorder.record_events(None, msgs)  # type: ignore[arg-type]
+    recorder.close()
+    print(f"Wrote {len(msgs)} synthetic events to {path} ({path.stat().st_size} bytes)")
+
+
+def main():
+    if ARGS.synthetic:
+        write_synthetic(ARGS.session, ARGS.synthetic, ARGS.rate)
+
+    manager = LaunchGraphManager()
+    notified = [0]
+    for _ in range(ARGS.subscribers):
+        manager.subscribe_batch(
+            lambda graph, msgs: notified.__setitem__(0, notified[0] + len(msgs))
+        )
+    manager.start()
+
+    replayer = SessionReplayer(ARGS.session, manager, speed=ARGS.speed)
+    replayer.run()
+    manager.wait_idle()
+    manager.stop()
+
+    stats = manager.queue_stats()
+    assert stats is not None
+    print(
+        f"{replayer.events} events in {replayer.elapsed:.2f}s "
+        f"({replayer.events / max(replayer.elapsed, 1e-9):.0f} events/s), "
+        f"{notified[0]} subscriber notifications"
+    )
+    print(
+        f"queue: max depth {stats['max_depth']}, {stats['full_waits']} full waits, "
+        f"post p99 {stats['push_ns']['p99'] / 1e3:.1f}us; "
+        f"reducer: {stats['batches']} batches, mean size {stats['batch_size']['mean']:.1f}, "
+        f"p99 {stats['reduce_ns']['p99'] / 1e3:.1f}us per batch"
+    )
+    print(f"graph: {manager.memory_usage()}")
+
+
+if __name__ == "__main__":
+    main()
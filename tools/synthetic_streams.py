@@ -0,0 +1,183 @@
+"""
+合成的 LaunchGraph 消息流，供 tools 下的校验与基准测试脚本使用
+"""
+
+import random
+from typing import Any, Dict, Iterator, List
+
+Msg = Dict[str, Any]
+
+
+class StreamBuilder:
+    """生成结构合法的合成消息流，覆盖 custom action/recognition 中的嵌套调用"""
+
+    def __init__(self, rng: random.Random, max_depth: int = 4) -> None:
+        self.rng = rng
+        self.max_depth = max_depth
+        self.msgs: List[Msg] = []
+        self.reco_id = 0
+        self.node_id = 0
+
+    def _end(self) -> str:
+        return self.rng.choice(("Succeeded", "Failed"))
+
+    def task(self) -> None:
+        self.msgs.append({"msg": "Task.Starting", "entry": "Entry", "task_id": 1})
+        for _ in range(self.rng.randint(1, 4)):
+            self.pipeline_node(0)
+        self.msgs.append({"msg": f"Task.{self._end()}", "entry": "Entry"})
+
+    def pipeline_node(self, level: int) -> None:
+        self.node_id += 1
+        name = f"Node{self.node_id}"
+        self.msgs.append(
+            {"msg": "PipelineNode.Starting", "name": name, "node_id": self.node_id}
+        )
+        for _ in range(self.rng.randint(1, 3)):
+            next_list = [f"Next{i}" for i in range(self.rng.randint(1, 4))]
+            self.msgs.append(
+                {"msg": "NextList.Starting", "name": name, "next_list": next_list}
+            )
+            for next_name in next_list:
+                self.recognition(next_name, level)
+            self.msgs.append({"msg": f"NextList.{self._end()}", "name": name})
+        self.action(name, level)
+        self.msgs.append({"msg": f"PipelineNode.{self._end()}", "name": name})
+
+    def recognition(self, name: str, level: int) -> None:
+        self.reco_id += 1
+        reco_id = self.reco_id
+        self.msgs.append(
+            {"msg": "Recognition.Starting", "name": name, "reco_id": reco_id}
+        )
+        self.nested(level)
+        self.msgs.append(
+            {"msg": f"Recognition.{self._end()}", "name": name, "reco_id": reco_id}
+        )
+
+    def action(self, name: str, level: int) -> None:
+        self.msgs.append({"msg": "Action.Starting", "name": name})
+        self.nested(level)
+        self.msgs.append({"msg": f"Action.{self._end()}", "name": name})
+
+    def nested(self, level: int) -> None:
+        """模拟 custom recognition/action 内部调用 ctx.run_*"""
+        if level >= self.max_depth or self.rng.random() > 0.3:
+            return
+        for _ in range(self.rng.randint(1, 2)):
+            kind = self.rng.choice(("reco", "act", "pipeline"))
+            if kind == "reco":
+                self.msgs.append({"msg": "RecognitionNode.Starting", "name": "Sub"})
+                self.recognition("Sub", level + 1)
+                self.msgs.append(
+                    {"msg": f"RecognitionNode.{self._end()}", "name": "Sub"}
+                )
+            elif kind == "act":
+                self.msgs.append({"msg": "ActionNode.Starting", "name": "Sub"})
+                self.action("Sub", level + 1)
+                self.msgs.append({"msg": f"ActionNode.{self._end()}", "name": "Sub"})
+            else:
+                self.pipeline_node(level + 1)
+
+
+def synthetic_streams(seed: int, rounds: int) -> Iterator[List[Msg]]:
+    rng = random.Random(seed)
+    for i in range(rounds):
+        builder = StreamBuilder(rng)
+        for _ in range(rng.randint(1, 3)):
+            builder.task()
+        msgs = builder.msgs
+        # 后半部分的消息流加入丢失、重复和未知消息，覆盖异常路径
+        if i >= rounds // 2:
+            mutated: List[Msg] = []
+            for msg in msgs:
+                r = rng.random()
+                if r < 0.05:
+                    continue
+                mutated.append(msg)
+                if r > 0.97:
+                    mutated.append(msg)
+                elif r > 0.95:
+                    mutated.append({"msg": "Unknown.Starting"})
+            msgs = mutated
+        yield msgs
+
+
+def flat_stream(nodes: int, rng: random.Random) -> List[Msg]:
+    """一个长时间运行的任务：nodes 个顺序执行的节点，没有嵌套"""
+    msgs: List[Msg] = [{"msg": "Task.Starting", "entry": "Entry", "task_id": 1}]
+    reco_id = 0
+    for node_id in range(1, nodes + 1):
+        name = f"Node{node_id}"
+        msgs.append({"msg": "PipelineNode.Starting", "name": name, "node_id": node_id})
+        next_list = [f"Next{i}" for i in range(rng.randint(1, 3))]
+        msgs.append({"msg": "NextList.Starting", "name": name, "next_list": next_list})
+        for next_name in next_list:
+            reco_id += 1
+            msgs.append(
+                {"msg": "Recognition.Starting", "name": next_name, "reco_id": reco_id}
+            )
+            msgs.append(
+                {"msg": "Recognition.Failed", "name": next_name, "reco_id": reco_id}
+            )
+        msgs.append({"msg": "NextList.Succeeded", "name": name})
+        msgs.append({"msg": "Action.Starting", "name": name})
+        msgs.append({"msg": "Action.Succeeded", "name": name})
+        msgs.append({"msg": "PipelineNode.Succeeded", "name": name})
+    msgs.append({"msg": "Task.Succeeded", "entry": "Entry"})
+    return msgs
+
+
+def deep_stream(depth: int) -> List[Msg]:
+    """depth 层嵌套的 RecognitionNode 链（custom recognition 逐层调用 ctx.run_recognition）"""
+    opening: List[Msg] = [
+        {"msg": "Task.Starting", "entry": "Entry", "task_id": 1},
+        {"msg": "PipelineNode.Starting", "name": "Entry", "node_id": 1},
+        {"msg": "NextList.Starting", "name": "Entry", "next_list": ["Deep"]},
+        {"msg": "Recognition.Starting", "name": "Deep", "reco_id": 1},
+    ]
+    closing: List[Msg] = [
+        {"msg": "Recognition.Succeeded", "name": "Deep", "reco_id": 1},
+        {"msg": "NextList.Succeeded", "name": "Entry"},
+        {"msg": "PipelineNode.Succeeded", "name": "Entry"},
+        {"msg": "Task.Succeeded", "entry": "Entry"},
+    ]
+    for level in range(depth):
+        name = f"Deep{level}"
+        reco_id = level + 2
+        opening.append({"msg": "RecognitionNode.Starting", "name": name})
+        opening.append(
+            {"msg": "Recognition.Starting", "name": name, "reco_id": reco_id}
+        )
+        closing.append(
+            {"msg": "Recognition.Succeeded", "name": name, "reco_id": reco_id}
+        )
+        closing.append({"msg": "RecognitionNode.Succeeded", "name": name})
+    return opening + closing[::-1]
+
+
+def wide_stream(width: int) -> List[Msg]:
+    """一个包含 width 个候选项的 NextList"""
+    next_list = [f"Next{i}" for i in range(width)]
+    msgs: List[Msg] = [
+        {"msg": "Task.Starting", "entry": "Entry", "task_id": 1},
+        {"msg": "PipelineNode.Starting", "name": "Entry", "node_id": 1},
+        {"msg": "NextList.Starting", "name": "Entry", "next_list": next_list},
+    ]
+    for reco_id, name in enumerate(next_list, 1):
+        msgs.append({"msg": "Recognition.Starting", "name": name, "reco_id": reco_id})
+        msgs.append({"msg": "Recognition.Failed", "name": name, "reco_id": reco_id})
+    msgs += [
+        {"msg": "NextList.Failed", "name": "Entry"},
+        {"msg": "PipelineNode.Failed", "name": "Entry"},
+        {"msg": "Task.Failed", "entry": "Entry"},
+    ]
+    return msgs
+
+
+def mixed_stream(events: int, rng: random.Random) -> List[Msg]:
+    """由 StreamBuilder 生成的多任务消息流，至少包含 events 条消息"""
+    builder = StreamBuilder(rng)
+    while len(builder.msgs) < events:
+        builder.task()
+    return builder.msgs
@@ -0,0 +1,44 @@
+"""
+将 --trace 生成的二进制追踪文件解码为 JSONL（每行一条消息）
+
+Usage:
+    python tools/trace_dump.py debug/MaaDebugger-xxx.trace [-o out.jsonl]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+_parser.add_argument("trace", type=Path)
+_parser.add_argument("-o", "--output", type=Path, default=None)
+ARGS = _parser.parse_args()
+
+# MaaDebugger 在导入时解析命令行参数
+sys.argv = sys.argv[:1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from MaaDebugger.maafw.tracer import read_trace  # noqa: E402
+
+
+def main():
+    out = open(ARGS.output, "w", encoding="utf-8") if ARGS.output else sys.stdout
+    events = dropped = 0
+    try:
+        for msg in read_trace(ARGS.trace):
+            if msg["msg"] == "Dropped":
+                dropped += msg["count"]
+            else:
+                events += 1
+            out.write(json.dumps(msg, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{events} events, {dropped} dropped.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
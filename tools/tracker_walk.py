@@ -0,0 +1,40 @@
+"""
+引入活动作用域栈之前的定位方式：从任务根部逐层追踪到当前节点，O(depth)
+
+只通过 Scope 的公开属性遍历，供 launch_graph_diff.py 与活动作用域栈的结果对比，
+以及 bench_reducer.py 测量逐层追踪的开销。导入前需先将 src 加入 sys.path。
+"""
+
+from typing import Optional
+
+from MaaDebugger.maafw.launch_graph import LaunchGraph, Scope, ScopeType
+
+
+def iterate_tracker(tracker: Optional[Scope]) -> Optional[Scope]:
+    """当前深度的下一个节点"""
+    if tracker is None:
+        return None
+    if tracker.type == ScopeType.PIPELINE_NODE:
+        return tracker.action or tracker.last_child
+    if tracker.type == ScopeType.RECO_NODE:
+        return tracker.reco_detail
+    if tracker.type == ScopeType.ACTION_NODE:
+        return tracker.action
+    if tracker.type in (ScopeType.NEXT_LIST, ScopeType.RECO, ScopeType.ACTION):
+        return tracker.last_child
+    return None
+
+
+def tracker_from_walk(current: LaunchGraph, task: Scope) -> Optional[Scope]:
+    """
+    从任务根部逐层追踪到当前节点
+
+    Returns:
+        当前深度的作用域，追踪失败时返回 None
+    """
+    tracker = task.last_child
+    for _ in range(1, current.depth):
+        tracker = iterate_tracker(tracker)
+        if tracker is None:
+            return None
+    return tracker